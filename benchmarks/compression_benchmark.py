@@ -0,0 +1,85 @@
+"""
+Compare storage codecs and levels on a synthetic price matrix shaped like stocks_historical_data.
+
+Usage:
+  python benchmarks/compression_benchmark.py [--symbols 1500] [--days 252] [--repeat 3]
+
+Reports, for every format/codec/level combination, the stored size and the best-of-N
+encode (serialize + compress) and decode (decompress + parse) times, all in memory.
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+import StorageCodecs as codecs
+import StorageSerialization as serialization
+
+def build_price_matrix(n_symbols: int, n_days: int, seed: int = 7) -> pd.DataFrame:
+  rng = np.random.default_rng(seed)
+  start_prices = rng.uniform(5, 500, size=n_symbols)
+  daily_returns = rng.normal(0, 0.02, size=(n_days, n_symbols))
+  prices = start_prices * np.exp(np.cumsum(daily_returns, axis=0))
+  # Providers return float32-derived closes (e.g. 123.45600128173828), which is what makes the CSV so wide
+  prices = np.round(prices, 2).astype('float32').astype('float64')
+
+  df = pd.DataFrame(prices, columns=[f"SYM{i:05d}" for i in range(n_symbols)])
+  df.insert(0, 'date', pd.bdate_range(end='2025-12-31', periods=n_days).strftime('%Y-%m-%d'))
+  return df
+
+def encode(df: pd.DataFrame, fmt: str, codec: str | None, level: int | None) -> bytes:
+  buffer = io.BytesIO()
+  if fmt == 'parquet':
+    serialization.write_parquet(df, buffer, compression=codec or 'none', compression_level=level)
+  else:
+    with codecs.compressing_writer(buffer, codec, level) as writer:
+      serialization.write_csv(df, writer)
+  return buffer.getvalue()
+
+def decode(payload: bytes, fmt: str, codec: str | None) -> pd.DataFrame:
+  if fmt == 'parquet':
+    return serialization.read_parquet(io.BytesIO(payload))
+  return serialization.read_csv(codecs.decompressing_reader(io.BytesIO(payload), codec))
+
+def best_of(repeat: int, fn) -> tuple[float, object]:
+  best, result = float('inf'), None
+  for _ in range(repeat):
+    start = time.perf_counter()
+    result = fn()
+    best = min(best, time.perf_counter() - start)
+  return best, result
+
+def main() -> None:
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument('--symbols', type=int, default=1500)
+  parser.add_argument('--days', type=int, default=252)
+  parser.add_argument('--repeat', type=int, default=3)
+  args = parser.parse_args()
+
+  df = build_price_matrix(args.symbols, args.days)
+  combos = [('csv', None, None), ('csv', 'gzip', 1), ('csv', 'gzip', 6), ('csv', 'gzip', 9)]
+  if codecs.zstandard is not None:
+    combos += [('csv', 'zstd', 1), ('csv', 'zstd', 3), ('csv', 'zstd', 9), ('csv', 'zstd', 19)]
+  else:
+    print("zstandard is not installed; skipping the zstd CSV rows")
+  combos += [('parquet', None, None), ('parquet', 'snappy', None), ('parquet', 'gzip', 6), ('parquet', 'zstd', 1), ('parquet', 'zstd', 3), ('parquet', 'zstd', 9)]
+
+  print(f"Matrix: {df.shape[0]} rows x {df.shape[1]} columns, best of {args.repeat} runs")
+  print(f"{'format':<8} {'codec':<7} {'level':>5} {'size (KB)':>10} {'ratio':>6} {'encode (ms)':>12} {'decode (ms)':>12}")
+  raw_size = None
+  for fmt, codec, level in combos:
+    encode_time, payload = best_of(args.repeat, lambda: encode(df, fmt, codec, level))
+    decode_time, decoded = best_of(args.repeat, lambda: decode(payload, fmt, codec))
+    if decoded.shape != df.shape:
+      raise ValueError(f"Round trip changed the shape for {fmt}/{codec}/{level}: {decoded.shape} != {df.shape}")
+
+    raw_size = raw_size or len(payload)
+    print(f"{fmt:<8} {codec or 'none':<7} {level if level is not None else '-':>5} {len(payload) / 1024:>10.1f} {raw_size / len(payload):>6.2f} {encode_time * 1000:>12.1f} {decode_time * 1000:>12.1f}")
+
+if __name__ == '__main__':
+  main()
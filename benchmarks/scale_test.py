@@ -0,0 +1,103 @@
+"""
+Find where the scenarios stop scaling: run them against a synthetic market (see src/SyntheticMarket.py) of growing size
+and report the wall time and the peak memory of each one.
+
+Usage:
+  python benchmarks/scale_test.py [--symbols 2000 10000 20000] [--days 252 1260] [--scenarios upsert-create upsert-update ...]
+
+For every symbols x days combination the bucket is seeded locally with the synthetic universe and its stored history
+(minus the newest symbols and the last trading days, so the update has new symbols and a stale tail to fill), then every
+scenario runs on a fresh copy of it with cold caches. The market injects NaNs, missing trading days and delistings.
+Time is measured on a plain run; peak memory on a second run under tracemalloc, which sees Python and numpy allocations
+(not Arrow's own allocator, so Parquet I/O buffers are not counted).
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import tracemalloc
+
+import pandas as pd
+
+from scenario_replay_benchmark import run_scenario # Also puts src/ on the path and fills the email settings
+
+import config
+from StorageLocalFsProvider import StorageLocalFsProvider
+from SyntheticMarket import SyntheticMarket
+
+# Label -> (scenario, whether the bucket starts with stored historical data)
+SCENARIOS = {
+  'upsert-create': ('upsert_historical_data', False),
+  'upsert-update': ('upsert_historical_data', True),
+  'last-closing-price': ('update_last_closing_price', True),
+  'pre-market': ('analyze_pre_market_prices', True),
+}
+SCREENERS = ['day_gainers', 'day_losers', 'most_actives', 'undervalued_large_caps', 'growth_technology_stocks']
+NEW_SYMBOLS_SHARE = 0.01 # Listed but not in the stored history yet
+STALE_TAIL_DAYS = 3 # Trading days missing at the end of the stored history
+
+def seed_bucket(storage_dir: str, cfg: dict, market: SyntheticMarket, with_history: bool) -> None:
+  storage = StorageLocalFsProvider(storage_dir)
+  bucket = cfg['s3_bucket']
+  storage.create(bucket, cfg['s3_all_stocks_csv_name'], pd.DataFrame({'symbol': market.symbols}))
+  with open(os.path.join(storage_dir, bucket, cfg['s3_screeners_file_name']), 'w') as f:
+    f.write('\n'.join(SCREENERS) + '\n')
+
+  if with_history:
+    stored_symbols = market.symbols[:len(market.symbols) - int(len(market.symbols) * NEW_SYMBOLS_SHARE)]
+    history = market.history(stored_symbols, end=market.calendar[-STALE_TAIL_DAYS])
+    storage.create(bucket, cfg['s3_historical_data_file_name'], history)
+
+def measure(cfg: dict, scenario: str, storage_dir: str) -> tuple[float, float]:
+  elapsed = run_scenario(cfg, scenario, storage_dir)
+  tracemalloc.start()
+  try:
+    run_scenario(cfg, scenario, storage_dir)
+    _, peak = tracemalloc.get_traced_memory()
+  finally:
+    tracemalloc.stop()
+  return elapsed, peak / 1024 ** 2
+
+def main() -> None:
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument('--symbols', type=int, nargs='+', default=[2_000, 10_000])
+  parser.add_argument('--days', type=int, nargs='+', default=[252, 1_260])
+  parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS))
+  parser.add_argument('--seed', type=int, default=7)
+  parser.add_argument('--end-date', default='2026-10-16', help="Last trading day of the synthetic market, 'YYYY-MM-DD'")
+  args = parser.parse_args()
+
+  results = []
+  for n_symbols in args.symbols:
+    for history_days in args.days:
+      market_params = {'n_symbols': n_symbols, 'history_days': history_days, 'seed': args.seed, 'end_date': args.end_date}
+      market = SyntheticMarket.get(**market_params)
+      cfg = {
+        **config.C,
+        'data_mode': 'synthetic',
+        'synthetic_market': market_params,
+        'storage_provider': 'local_fs',
+        'email_dry_run': True,
+        'skip_schedule_checks': True,
+        'hist_data_as_of_date': market.calendar[-1],
+        # Screeners cover a fixed share of the universe at every size
+        'symbols_per_screener': max(250, n_symbols // 10),
+        'hist_data_batch_size': 500,
+      }
+
+      for label in args.scenarios:
+        scenario, with_history = SCENARIOS[label]
+        seed_dir = tempfile.mkdtemp(prefix='scale_test_')
+        try:
+          seed_bucket(seed_dir, cfg, market, with_history)
+          elapsed, peak_mb = measure(cfg, scenario, seed_dir)
+        finally:
+          shutil.rmtree(seed_dir, ignore_errors=True)
+        results.append((n_symbols, history_days, label, elapsed, peak_mb))
+
+  print(f"\n{'symbols':>8} {'days':>6} {'scenario':<20} {'time (s)':>9} {'peak (MB)':>10}")
+  for n_symbols, history_days, label, elapsed, peak_mb in results:
+    print(f"{n_symbols:>8} {history_days:>6} {label:<20} {elapsed:>9.2f} {peak_mb:>10.1f}")
+
+if __name__ == '__main__':
+  main()
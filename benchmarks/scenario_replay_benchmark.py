@@ -0,0 +1,102 @@
+"""
+Time whole scenarios end to end, offline and reproducibly, against recorded provider responses and a local copy of the bucket.
+
+Usage:
+  # Once, with network access: run the scenarios live and record every provider response
+  python benchmarks/scenario_replay_benchmark.py --mode record --storage-dir ./bucket_copy --recordings-dir ./recordings
+  # Then as often as needed, offline
+  python benchmarks/scenario_replay_benchmark.py --storage-dir ./bucket_copy --recordings-dir ./recordings [--repeat 5] [--latency 0.05] [--profile 25]
+
+`--storage-dir` holds one directory per bucket (e.g. ./bucket_copy/stocks-stats/, as written by `aws s3 sync s3://stocks-stats ./bucket_copy/stocks-stats`).
+Every run works on a fresh copy of it with cold caches, so the scenarios' writes never leak into the next run.
+Emails are printed instead of sent and the market hours checks are skipped; `--as-of` pins the upsert's last trading day,
+which has to be the same when recording and replaying.
+"""
+import argparse
+import cProfile
+import os
+import pstats
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+# config.py reads the email settings from the environment; emails are only printed here
+for env_var in ('GMAIL_APP_USER', 'GMAIL_APP_PSW', 'EMAIL_TO'):
+  os.environ.setdefault(env_var, 'benchmark@example.com')
+
+import config
+import ScreenerProviderManager
+import StorageCache
+from ScenarioBuilder import ScenarioBuilder
+
+DEFAULT_SCENARIOS = ['analyze_pre_market_prices', 'update_last_closing_price', 'upsert_historical_data']
+
+def run_scenario(cfg: dict, scenario: str, storage_dir: str, profiler: cProfile.Profile = None) -> float:
+  with tempfile.TemporaryDirectory() as work_dir:
+    run_cfg = {
+      **cfg,
+      'storage_local_root_dir': shutil.copytree(storage_dir, os.path.join(work_dir, 'storage')),
+      'storage_cache_dir': os.path.join(work_dir, 'storage_cache'),
+      'excel_temp_file_path': os.path.join(work_dir, 'stocks_analysis.xlsx'),
+    }
+    # Cold start: nothing left over from the previous run
+    StorageCache._MEMORY_CACHE.clear()
+    ScreenerProviderManager._SCREENER_CACHE.clear()
+
+    handler = ScenarioBuilder(run_cfg).build(scenario)
+    start = time.perf_counter()
+    if profiler is not None:
+      profiler.enable()
+    try:
+      handler.handle_scenario()
+    finally:
+      if profiler is not None:
+        profiler.disable()
+    return time.perf_counter() - start
+
+def main() -> None:
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument('--mode', choices=['record', 'replay'], default='replay')
+  parser.add_argument('--storage-dir', required=True)
+  parser.add_argument('--recordings-dir', required=True)
+  parser.add_argument('--scenarios', nargs='+', default=DEFAULT_SCENARIOS)
+  parser.add_argument('--repeat', type=int, default=3)
+  parser.add_argument('--latency', type=float, default=0.0, help='Simulated seconds per replayed provider call')
+  parser.add_argument('--as-of', default=None, help="Last trading day filled by the upsert, 'YYYY-MM-DD'")
+  parser.add_argument('--profile', type=int, default=0, help='Print the N most expensive functions (cumulative time) of each scenario')
+  args = parser.parse_args()
+
+  cfg = {
+    **config.C,
+    'data_mode': args.mode,
+    'recordings_dir': args.recordings_dir,
+    'replay_latency_seconds': args.latency,
+    'storage_provider': 'local_fs',
+    'email_dry_run': True,
+    'skip_schedule_checks': True,
+    'hist_data_as_of_date': args.as_of,
+    # Replayed calls cost no quota, so the pool never waits; recording keeps the live quotas
+    'stock_data_rate_limits': config.C['stock_data_rate_limits'] if args.mode == 'record' else {provider: {'requests_per_minute': 1_000_000, 'burst': 1_000} for provider in config.C['stock_data_rate_limits']},
+  }
+  # Recording runs each scenario once; replaying more often only gives better timings
+  repeat = 1 if args.mode == 'record' else args.repeat
+
+  results = []
+  for scenario in args.scenarios:
+    profiler = cProfile.Profile() if args.profile else None
+    timings = [run_scenario(cfg, scenario, args.storage_dir, profiler) for _ in range(repeat)]
+    results.append((scenario, min(timings), statistics.median(timings)))
+    if profiler is not None:
+      print(f"\n{scenario}: top {args.profile} functions by cumulative time over {repeat} runs")
+      pstats.Stats(profiler).sort_stats('cumulative').print_stats(args.profile)
+
+  print(f"\n{args.mode}, {repeat} run(s) per scenario, {args.latency * 1000:.0f} ms simulated latency per provider call")
+  print(f"{'scenario':<28} {'best (s)':>10} {'median (s)':>11}")
+  for scenario, best, median in results:
+    print(f"{scenario:<28} {best:>10.3f} {median:>11.3f}")
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,79 @@
+import random
+import threading
+import time
+from typing import Any, Callable
+
+# Errors worth retrying as they are: the provider (or the network) failed, not the symbols in the batch.
+# Matched by class name so the optional HTTP clients (requests, curl_cffi, yfinance) do not have to be imported here
+TRANSIENT_ERROR_NAMES = {'YFRateLimitError', 'Timeout', 'ConnectTimeout', 'ReadTimeout', 'ConnectionError', 'ChunkedEncodingError', 'RemoteDisconnected'}
+TRANSIENT_ERROR_MARKERS = ('429', 'too many requests', 'rate limit', 'timed out', 'temporarily unavailable', '502', '503', '504')
+
+def is_transient_error(error: Exception) -> bool:
+  if isinstance(error, (ConnectionError, TimeoutError)):
+    return True
+  if any(cls.__name__ in TRANSIENT_ERROR_NAMES for cls in type(error).__mro__):
+    return True
+  message = str(error).lower()
+  return any(marker in message for marker in TRANSIENT_ERROR_MARKERS)
+
+class BatchRetryEngine:
+  """
+  Runs `fetch(batch)` and recovers as much of the batch as it can:
+  - transient errors are retried on the same batch with exponential backoff and full jitter, up to `max_attempts` tries;
+  - any other error is blamed on the symbols, so the batch is split in halves (recursively) until the offending symbols are isolated.
+  Every extra request (retry or half) spends one unit of `retry_budget`, shared by all the batches of a run (and their threads),
+  so a bad run costs at most that many requests on top of one per batch; each request still goes through the provider pool's rate limits.
+  """
+
+  def __init__(self, retry_budget: int, max_attempts: int = 3, base_delay_seconds: float = 1, max_delay_seconds: float = 30, is_transient: Callable[[Exception], bool] = is_transient_error):
+    if retry_budget < 0 or max_attempts < 1:
+      raise ValueError("The 'retry_budget' of a batch retry engine must be >= 0 and its 'max_attempts' >= 1.")
+
+    self.retry_budget = retry_budget
+    self.max_attempts = max_attempts
+    self.base_delay_seconds = base_delay_seconds
+    self.max_delay_seconds = max_delay_seconds
+    self.is_transient = is_transient
+
+    self.retries_used = 0
+    self.lock = threading.Lock()
+
+  def run(self, batch: list, fetch: Callable[[list], Any]) -> list[tuple[list, Any, Exception | None]]:
+    """One (sub_batch, result, error) triple per piece the batch ended up in, in symbol order; exactly one of result and error is None"""
+    result, error = self.__fetch_with_backoff(batch, fetch)
+    if error is None:
+      return [(batch, result, None)]
+
+    # Bisecting cannot fix the provider, and a single symbol cannot be split any further
+    if self.is_transient(error) or len(batch) == 1 or not self.__spend(2):
+      return [(batch, None, error)]
+
+    middle = len(batch) // 2
+    print(f"Splitting the batch starting with {batch[0]} ({len(batch)} symbols) after: {repr(error)}")
+    return self.run(batch[:middle], fetch) + self.run(batch[middle:], fetch)
+
+  #region Private methods
+  def __fetch_with_backoff(self, batch: list, fetch: Callable[[list], Any]) -> tuple[Any, Exception | None]:
+    for attempt in range(self.max_attempts):
+      try:
+        return fetch(batch), None
+      except Exception as e:
+        error = e
+
+      if not self.is_transient(error) or attempt == self.max_attempts - 1 or not self.__spend(1):
+        break
+
+      delay = random.uniform(0, min(self.max_delay_seconds, self.base_delay_seconds * 2 ** attempt))
+      print(f"Transient error on the batch starting with {batch[0]}, retrying in {delay:.1f} seconds: {repr(error)}")
+      time.sleep(delay)
+
+    return None, error
+
+  def __spend(self, requests: int) -> bool:
+    with self.lock:
+      if self.retries_used + requests > self.retry_budget:
+        return False
+      self.retries_used += requests
+      return True
+
+  #endregion
@@ -4,11 +4,13 @@ from email.mime.text import MIMEText
 import smtplib
 
 class Emailer:
-  def __init__(self, user, pwd, host='smtp.gmail.com', port=465) -> None:
+  def __init__(self, user, pwd, host='smtp.gmail.com', port=465, dry_run=False) -> None:
     self.__user = user
     self.__pwd = pwd
     self.__host = host # Default to Gmail SMTP server
     self.__port = port # Default to SSL port
+    # Print the email instead of sending it (offline runs and benchmarks)
+    self.dry_run = dry_run
     
     self._to = None
     self._from = None
@@ -54,6 +56,10 @@ class Emailer:
       self._email.attach(MIMEApplication(attachment.read(), Name=self._attachment_file_name))
 
   def send(self):
+    if self.dry_run:
+      print(f"Dry run, not sending email '{self._subject}' to {self._to} ({len(self._email.as_string())} bytes)\n")
+      return
+
     try:
       server = smtplib.SMTP_SSL(self.__host, self.__port)
       server.ehlo()
@@ -0,0 +1,116 @@
+from collections import defaultdict
+from datetime import datetime
+import zoneinfo
+
+import pandas as pd
+from pandas.tseries.holiday import AbstractHolidayCalendar, GoodFriday, Holiday, USLaborDay, USMartinLutherKingJr, USMemorialDay, USPresidentsDay, USThanksgivingDay, nearest_workday, sunday_to_monday
+from pandas.tseries.offsets import CustomBusinessDay
+
+from StorageSerialization import DATE_FORMAT
+
+class NyseHolidayCalendar(AbstractHolidayCalendar):
+  """NYSE full-day closures; a one-off closure missing from here is fetched (and comes back empty) on every upsert, so add new ones as they happen"""
+  rules = [
+    # A Saturday New Year's Day is not observed on the Friday before: NYSE trades on Dec 31
+    Holiday('New Years Day', month=1, day=1, observance=sunday_to_monday),
+    USMartinLutherKingJr,
+    USPresidentsDay,
+    GoodFriday,
+    USMemorialDay,
+    Holiday('Juneteenth', month=6, day=19, start_date='2022-01-01', observance=nearest_workday),
+    Holiday('Independence Day', month=7, day=4, observance=nearest_workday),
+    USLaborDay,
+    USThanksgivingDay,
+    Holiday('Christmas Day', month=12, day=25, observance=nearest_workday),
+    # One-off closures
+    Holiday('Hurricane Sandy', year=2012, month=10, day=29),
+    Holiday('Hurricane Sandy', year=2012, month=10, day=30),
+    Holiday('President Bush Day of Mourning', year=2018, month=12, day=5),
+    Holiday('President Carter Day of Mourning', year=2025, month=1, day=9),
+  ]
+
+TRADING_DAY = CustomBusinessDay(calendar=NyseHolidayCalendar())
+
+def trading_days(start: str, end: str) -> list[str]:
+  """Trading days in [start, end], as 'YYYY-MM-DD' strings"""
+  return pd.date_range(start, end, freq=TRADING_DAY).strftime(DATE_FORMAT).tolist()
+
+def last_completed_trading_day(now: datetime = None) -> str:
+  """Today if it is a trading day and the market has closed (4:00 p.m. ET), otherwise the trading day before"""
+  now = now or datetime.now(zoneinfo.ZoneInfo("America/New_York"))
+  today = pd.Timestamp(now.date())
+  if now.hour >= 16 and TRADING_DAY.is_on_offset(today):
+    return today.strftime(DATE_FORMAT)
+  return (today - TRADING_DAY).strftime(DATE_FORMAT)
+
+class HistDataGapDetector:
+  """
+  Finds, per symbol, the date ranges missing from the stored historical data matrix ('date' column plus one column per symbol):
+  - new symbols: not a column yet, so their whole window is missing;
+  - missing trading days: rows absent between the matrix's first and last dates, missing for every symbol;
+  - stale tail: trading days after the matrix's last date up to `as_of`;
+  - holes: NaN cells of a symbol, one range per run of consecutive NaN rows.
+  Symbols with the same missing range are then coalesced into shared, batch-sized requests.
+  """
+
+  def __init__(self, batch_size: int):
+    if batch_size < 1:
+      raise ValueError("The 'batch_size' of the gap detector must be a positive integer.")
+    self.batch_size = batch_size
+
+  def detect(self, hd_df: pd.DataFrame, symbols: list[str], as_of: str) -> dict[str, list[tuple[str, str]]]:
+    """Missing (start, end) date ranges, both ends included, per symbol of `symbols`; symbols without gaps are left out"""
+    dates = hd_df['date'].tolist()
+    first_date, end_date = dates[0], max(as_of, dates[-1])
+    calendar = trading_days(first_date, end_date)
+    stored_dates = set(dates)
+    # Rows missing from the matrix (inside it or after its last date) are missing for every symbol already in it
+    shared_ranges = self.__to_ranges([day for day in calendar if day not in stored_dates], calendar)
+
+    existing = [symbol for symbol in symbols if symbol in hd_df.columns]
+    nan_mask = hd_df[existing].isna()
+    holed = set(nan_mask.columns[nan_mask.any()])
+
+    gaps = {}
+    for symbol in symbols:
+      if symbol not in hd_df.columns:
+        gaps[symbol] = [(first_date, end_date)]
+      elif symbol in holed:
+        hole_days = hd_df.loc[nan_mask[symbol].to_numpy(), 'date'].tolist()
+        gaps[symbol] = sorted(shared_ranges + self.__to_ranges(hole_days, dates))
+      elif shared_ranges:
+        gaps[symbol] = shared_ranges
+
+    return gaps
+
+  def plan_requests(self, gaps: dict[str, list[tuple[str, str]]]) -> list[tuple[str, str, list[str]]]:
+    """(start, end, symbols) requests: one per distinct date range, holding every symbol missing it, split into batch-sized chunks"""
+    symbols_by_range = defaultdict(list)
+    for symbol, ranges in gaps.items():
+      for date_range in ranges:
+        symbols_by_range[date_range].append(symbol)
+
+    requests = []
+    for (start, end), symbols in sorted(symbols_by_range.items()):
+      for i in range(0, len(symbols), self.batch_size):
+        requests.append((start, end, symbols[i:i + self.batch_size]))
+    return requests
+
+  #region Private methods
+  def __to_ranges(self, days: list[str], calendar: list[str]) -> list[tuple[str, str]]:
+    """Collapse `days` into (start, end) runs of consecutive entries of `calendar`"""
+    if not days:
+      return []
+
+    position = {day: i for i, day in enumerate(calendar)}
+    ranges = []
+    start = previous = days[0]
+    for day in days[1:]:
+      if position[day] != position[previous] + 1:
+        ranges.append((start, previous))
+        start = day
+      previous = day
+    ranges.append((start, previous))
+    return ranges
+
+  #endregion
@@ -1,27 +1,36 @@
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from functools import partial
 import sys
-import time
+from typing import Callable
 import zoneinfo
 
+import numpy as np
 import pandas as pd
 
+from BatchRetryEngine import BatchRetryEngine
 from CustomExceptions import NanValuesInHistoricalData, DiffDateRangesBetweenDataframes
 from Emailer import Emailer
-from StockDataProviderManager import StockDataProviderManager
+from HistDataGapDetector import HistDataGapDetector, last_completed_trading_day
+from HistDataStore import HistDataStore
+from StockDataProviderPool import StockDataProviderPool
 from StorageProviderManager import StorageProviderManager
 
 class HistDataManager:
-  def __init__(self, storage_manager: StorageProviderManager, emailer: Emailer, yahoo_finance_data_manager: StockDataProviderManager, yahoo_query_data_manager: StockDataProviderManager, cfg: dict):
+  def __init__(self, storage_manager: StorageProviderManager, hist_data_store: HistDataStore, emailer: Emailer, stock_data_pool: StockDataProviderPool, cfg: dict):
     self.s3_mgr = storage_manager
+    self.hd_store = hist_data_store
     self.emailer = emailer
-    self.yfinance_manager = yahoo_finance_data_manager
-    self.yquery_manager = yahoo_query_data_manager
+    self.data_pool = stock_data_pool
     # TODO once config is defined, validate it here and create class attributes
     self.cfg = cfg
 
     self.__hd_df = None
     self.infos = []
     self.warnings = []
+    # One per NaN validation (batches are validated on the fetch workers); upsert returns them merged
+    self.nan_reports = []
 
     self.in_update_mode = None
 
@@ -37,6 +46,9 @@ class HistDataManager:
 
   #region Checks
   def __validate_time_frame_for_upsert(self) -> None:
+    if self.cfg['skip_schedule_checks']:
+      return
+
     # Get current time in New York timezone (accounts for DST automatically)
     ny_tz = zoneinfo.ZoneInfo("America/New_York")
     now_ny = datetime.now(ny_tz)
@@ -64,134 +76,164 @@ class HistDataManager:
       print(warning_msg)
       self.warnings.append(warning_msg)
   
-  def __check_for_columns_with_multiple_nans(self, df: pd.DataFrame) -> pd.DataFrame:
-    # If a column has more than 1 Nan value, remove the symbol from the dataframe and log a warning
-    cols_with_multiple_nans = df.columns[df.isna().sum() > 1].tolist()
-    if cols_with_multiple_nans:
-      self.paw(f"\t\tColumns with more than 1 NaN value found: {cols_with_multiple_nans}. Removing them from the historical data.")
-
-      for symbol in cols_with_multiple_nans:
-        df.drop(columns=[symbol], inplace=True)
-
-    return df
-
-  def __check_for_non_last_row_nans(self, df: pd.DataFrame) -> pd.DataFrame:
-    # Check if there are NaN values in rows other than the last row
-    non_last_rows = df.iloc[:-1]
-    cols_with_nans_in_non_last_rows = non_last_rows.columns[non_last_rows.isna().any()].tolist()
-    if cols_with_nans_in_non_last_rows:
-      self.paw(f"\t\tColumns with NaN values in non-last rows found: {cols_with_nans_in_non_last_rows}. Removing them from the historical data.")
-
-      for symbol in cols_with_nans_in_non_last_rows:
-        df.drop(columns=[symbol], inplace=True)
+  def __validate_nans(self, df: pd.DataFrame, label: str, subset: list[str] = None) -> tuple[pd.DataFrame, dict]:
+    """
+    One pass over a single NaN mask classifies every symbol column, then columns are dropped and repaired in bulk:
+    NaNs before the last row cannot be repaired and drop the column; a NaN only in the last row is repaired with the
+    symbol's regularMarketPrice from one batched lookup, or drops the column when there is none.
+    Returns the validated dataframe and a report of what was dropped (per reason) and repaired; a report with findings is also summarized in a single warning, which the emails include.
+    Only the `subset` columns are checked when given; the others are kept as they are.
+    """
+    checked = df if subset is None else df[subset]
+    report = {'label': label, 'rows': len(df), 'columns': len(checked.columns), 'multiple_nans': [], 'non_last_row_nans': [], 'repaired': {}, 'unrepaired': {}}
+    if df.empty:
+      return df, report
 
-    return df
+    mask = checked.isna().to_numpy()
+    if not mask.any():
+      return df, report
 
-  def __check_for_last_row_nans(self, df: pd.DataFrame) -> list:
-    last_row = df.iloc[-1]
-    cols_with_nan_in_last_row = last_row[last_row.isna()].index.tolist()
-    if cols_with_nan_in_last_row:
-      self.paw(f"\t\tColumns with NaN values in last row found: {cols_with_nan_in_last_row}.")
+    columns = checked.columns.to_numpy()
+    if 'date' in checked.columns and mask[:, checked.columns.get_loc('date')].any():
+      raise NanValuesInHistoricalData(f"{label} has rows without a date.")
 
-    return cols_with_nan_in_last_row
+    nan_counts = mask.sum(axis=0)
+    non_last_row = mask[:-1].any(axis=0)
+    report['multiple_nans'] = columns[nan_counts > 1].tolist()
+    report['non_last_row_nans'] = columns[non_last_row & (nan_counts == 1)].tolist()
+    to_repair = columns[mask[-1] & ~non_last_row].tolist()
 
-  def __attempt_fix_last_row_nans(self, cols_with_nan_in_last_row: list, stock_data_mgr: StockDataProviderManager, df: pd.DataFrame) -> pd.DataFrame:
-    # For each column with NaN in the last row, use tickers' info to look at their data
-    tickers_info = stock_data_mgr.get_stocks_info(cols_with_nan_in_last_row)
-    for symbol in cols_with_nan_in_last_row:
+    repaired_prices = pd.Series(dtype=float)
+    if to_repair:
       try:
-        price_data = tickers_info[symbol]
-        if 'regularMarketPrice' in price_data and price_data['regularMarketPrice'] is not None:
-          df.at[df.index[-1], symbol] = price_data['regularMarketPrice']
-          print(f"\tSuccessfully fixed NaN for symbol {symbol} in the last row using regularMarketPrice: {price_data['regularMarketPrice']}")
-        else:
-          # Remove the symbol from the dataframe since we couldn't get its price
-          self.paw(f"\tFailed to fix NaN for symbol {symbol} in the last row: no valid regularMarketPrice found in price data: {price_data}. Removing it from historical data.")
-          df.drop(columns=[symbol], inplace=True)
-
+        tickers_info = self.data_pool.get_stocks_info(to_repair)
       except Exception as e:
-        # Remove the symbol from the dataframe since something went wrong
-        self.paw(f"\tException occurred while trying to fix NaN for symbol {symbol} in the last row: {repr(e)}. Removing it from historical data.")
-        print(str(e))
-        df.drop(columns=[symbol], inplace=True)
-
-    return df
+        tickers_info = {symbol: repr(e) for symbol in to_repair}
+
+      quoted = [tickers_info.get(symbol) for symbol in to_repair]
+      prices = pd.to_numeric(pd.Series([info.get('regularMarketPrice') if isinstance(info, dict) else None for info in quoted], index=to_repair, dtype=object), errors='coerce').astype(float)
+      repaired = np.isfinite(prices.to_numpy())
+      repaired_prices = prices[repaired]
+      report['repaired'] = repaired_prices.to_dict()
+      report['unrepaired'] = {symbol: info for symbol, info, ok in zip(to_repair, quoted, repaired) if not ok}
+
+    dropped = [*report['multiple_nans'], *report['non_last_row_nans'], *report['unrepaired']]
+    if dropped:
+      df = df.drop(columns=dropped)
+    if not repaired_prices.empty:
+      df.loc[df.index[-1], repaired_prices.index] = repaired_prices.to_numpy()
+
+    self.__warn_nan_report(report)
+    return df, report
+
+  def __warn_nan_report(self, report: dict) -> None:
+    parts = []
+    if report['multiple_nans']:
+      parts.append(f"dropped {len(report['multiple_nans'])} columns with more than 1 NaN value: {report['multiple_nans']}")
+    if report['non_last_row_nans']:
+      parts.append(f"dropped {len(report['non_last_row_nans'])} columns with a NaN value in a non-last row: {report['non_last_row_nans']}")
+    if report['unrepaired']:
+      parts.append(f"dropped {len(report['unrepaired'])} columns whose last-row NaN had no valid regularMarketPrice: {report['unrepaired']}")
+    if report['repaired']:
+      parts.append(f"fixed the last-row NaN of {len(report['repaired'])} columns with their regularMarketPrice: {list(report['repaired'])}")
+    self.paw(f"\t\tNaN values in {report['label']} ({report['rows']} rows x {report['columns']} columns): " + "; ".join(parts) + ".")
+
+  def __merged_nan_report(self) -> dict:
+    """Every NaN report of this upsert in one: the symbols dropped (all of them, and per reason) and the repaired ones with their price"""
+    merged = {'dropped': [], 'multiple_nans': [], 'non_last_row_nans': [], 'repaired': {}, 'unrepaired': {}, 'unlisted': []}
+    for report in self.nan_reports:
+      merged['unlisted'] += report.get('unlisted', [])
+      merged['multiple_nans'] += report['multiple_nans']
+      merged['non_last_row_nans'] += report['non_last_row_nans']
+      merged['repaired'].update(report['repaired'])
+      merged['unrepaired'].update(report['unrepaired'])
+    merged['dropped'] = [*merged['multiple_nans'], *merged['non_last_row_nans'], *merged['unrepaired'], *merged['unlisted']]
+    return merged
 
-  def __check_for_nans_in_df(self, df: pd.DataFrame) -> None:
-    if df.isna().any().any():
-      cols_with_nans = df.columns[df.isna().any()].tolist()
-      self.paw(f"\tThe dataframe still contains NaN values after attempting to fix them. Columns with NaNs: {cols_with_nans}.")
-      raise NanValuesInHistoricalData(f"The dataframe still contains NaN values after attempting to fix them. Columns with NaNs: {cols_with_nans}")
-    
   #endregion
 
   #region Others
-  def __fetch_hist_data(self, stock_data_mgr: StockDataProviderManager, batch: list) -> pd.DataFrame:
-    df = None
-    if self.in_update_mode:
-      start_date, end_date = self.__hd_df['date'].min(), self.__hd_df['date'].max()
-      # Add a buffer of 2 days on each side to account for data providers cutoffs; only doing this on update mode as I have an inner join later
-      start_date = (pd.to_datetime(start_date) - pd.Timedelta(days=2)).strftime('%Y-%m-%d')
-      end_date = (pd.to_datetime(end_date) + pd.Timedelta(days=2)).strftime('%Y-%m-%d')
-      df = stock_data_mgr.get_historical_data(batch, start=start_date, end=end_date)
-    else:
-      df = stock_data_mgr.get_historical_data(batch, period='1y') # '1mo' for 1 month
+  def __fetch_hist_data(self, batch: list) -> pd.DataFrame:
+    # Create mode only; update mode fetches just the gaps (see __fill_gaps)
+    df = self.data_pool.get_historical_data(batch, period='1y') # '1mo' for 1 month
 
-    df = self.__check_for_columns_with_multiple_nans(df)
-    df = self.__check_for_non_last_row_nans(df)
-    last_row_nans_stocks = self.__check_for_last_row_nans(df)
-    df = self.__attempt_fix_last_row_nans(last_row_nans_stocks, stock_data_mgr, df)
+    df, report = self.__validate_nans(df, f"the batch that started with symbol {batch[0]}")
+    self.nan_reports.append(report)
 
-    # Since the three methods above may have removed some columns, check if the dataframe is empty
+    # The validation may have removed every symbol column
     if df.empty:
       self.paw("The historical data dataframe is empty after removing columns with multiple NaNs or NaNs in non-last rows. No data to process.")
-      return df #early return
 
-    self.__check_for_nans_in_df(df)
     return df
   
-  def __aggregate_hd_dataframes(self, base_df: pd.DataFrame, new_df: pd.DataFrame) -> None:
-    agg_df = pd.merge(base_df, new_df, on='date', how='inner')
-    if self.in_update_mode:
-      orig_start_date, orig_end_date = self.__hd_df['date'].min(), self.__hd_df['date'].max()
+  def __fetch_batches(self, stocks_batches: list) -> list[tuple[list, pd.DataFrame | None, Exception | None]]:
+    """
+    Fetch every batch with up to `hist_data_fetch_workers` batches in flight; the provider pool still paces the requests.
+    A failed batch is retried (transient errors) or split until the failing symbols are isolated, so it may come back in several pieces.
+    Returns one (symbols, dataframe, error) triple per piece, in batch order, so callers handle results and errors exactly as if they had fetched them one by one.
+    """
+    pieces_per_batch = self.__run_batches([(batch, self.__fetch_hist_data) for batch in stocks_batches])
+    return [piece for pieces in pieces_per_batch for piece in pieces]
+
+  def __run_batches(self, jobs: list[tuple[list, Callable[[list], pd.DataFrame]]]) -> list[list[tuple[list, pd.DataFrame | None, Exception | None]]]:
+    """Run each (batch, fetch) job through one shared retry engine; returns the pieces of every job, in job order"""
+    retry_engine = BatchRetryEngine(
+      retry_budget=self.cfg['hist_data_retry_budget'],
+      max_attempts=self.cfg['hist_data_retry_max_attempts'],
+      base_delay_seconds=self.cfg['hist_data_retry_base_delay_seconds'],
+    )
+    with ThreadPoolExecutor(max_workers=self.cfg['hist_data_fetch_workers']) as executor:
+      futures = [executor.submit(retry_engine.run, batch, fetch) for batch, fetch in jobs]
+      results = [future.result() for future in futures]
+
+    if retry_engine.retries_used:
+      self.pai(f"\tUsed {retry_engine.retries_used}/{retry_engine.retry_budget} extra historical data requests on retries and split batches")
+    return results
+
+  def __aggregate_hd_dataframes(self, batch_dfs: list[tuple[str, pd.DataFrame]]) -> pd.DataFrame | None:
+    """
+    Inner-join every batch on a shared date index with a single concat.
+    The reference date range is the most common one among the batches; it is checked once per batch and batches that do not cover it are reported and left out.
+    Returns None when nothing is left to join.
+    """
+    indexed_dfs = [(label, df.set_index('date')) for label, df in batch_dfs]
+    if indexed_dfs:
+      ref_start_date, ref_end_date = Counter((df.index.min(), df.index.max()) for _, df in indexed_dfs).most_common(1)[0][0]
     else:
-      orig_start_date, orig_end_date = base_df['date'].min(), base_df['date'].max()
+      return None
 
-    agg_start_date, agg_end_date = agg_df['date'].min(), agg_df['date'].max()
+    # The inner join keeps the reference range only if every frame has both of its end dates
+    aligned_dfs = []
+    for label, df in indexed_dfs:
+      if ref_start_date in df.index and ref_end_date in df.index:
+        aligned_dfs.append(df)
+      else:
+        E = DiffDateRangesBetweenDataframes(f"{label} ranges from {df.index.min()} to {df.index.max()} and does not cover the historical data range ({ref_start_date} to {ref_end_date}).")
+        self.paw(f"Error: {repr(E)}. {label} will be skipped.")
 
-    if orig_start_date != agg_start_date or orig_end_date != agg_end_date:
-      raise DiffDateRangesBetweenDataframes(f"The aggregated dataframe has a different date range ({agg_start_date} to {agg_end_date}) than the original historical data ({orig_start_date} to {orig_end_date}).")
-    
-    return agg_df
-  
-  def __wait_if_less_than_x_seconds(self, start_time: float, wait_seconds: int = 62) -> None:
-    elapsed_time = time.time() - start_time
-    if elapsed_time < wait_seconds:
-      print(f"Waiting {wait_seconds - elapsed_time} seconds to avoid Yahoo Query API rate limits")
-      time.sleep(wait_seconds - elapsed_time)
+    if not aligned_dfs:
+      return None
+
+    agg_df = pd.concat(aligned_dfs, axis=1, join='inner').sort_index()
+    agg_df.index.name = 'date'
+    return agg_df.reset_index()
 
   #endregion
 
   #region Update
   def __get_current_historical_data(self) -> pd.DataFrame:
-    hd_df = self.s3_mgr.read(bucket_name=self.cfg['s3_bucket'], bucket_key=self.cfg['s3_historical_data_csv_name'])
-    self.pai(f"\tSuccessfully read historical data from {self.cfg['s3_historical_data_csv_name']} in bucket {self.cfg['s3_bucket']}")
+    hd_df = self.hd_store.read()
+    self.pai(f"\tSuccessfully read historical data from {self.cfg['s3_historical_data_file_name']} in bucket {self.cfg['s3_bucket']}")
     self.pai(f"\tIt has {hd_df.shape[0]} rows and {hd_df.shape[1]} columns")
     start_date, end_date = hd_df['date'].min(), hd_df['date'].max()
     self.pai(f"\tIt ranges from {start_date} to {end_date}")
     return hd_df
   
-  def __get_stocks_to_update(self) -> list[str]:
-    ''' Get the list of stocks that are in the stocks list but not in the historical data dataframe '''
+  def __get_stocks_list(self) -> list[str]:
     stocks_list_ground_truth = self.s3_mgr.read(bucket_name=self.cfg['s3_bucket'], bucket_key=self.cfg['s3_all_stocks_csv_name'])['symbol'].tolist()
     self.__check_for_list_uniqueness(stocks_list_ground_truth, self.cfg['s3_all_stocks_csv_name'])
     self.pai(f"\tGathered {len(stocks_list_ground_truth)} stocks from {self.cfg['s3_all_stocks_csv_name']}")
-
-    # For all the stocks in the stocks list, check if they are in the historical data dataframe
-    missing_stocks = [stock for stock in stocks_list_ground_truth if stock not in self.__hd_df.columns]
-    self.pai(f"\tFound {len(missing_stocks)} missing stocks in historical data")
-
-    return missing_stocks
+    return stocks_list_ground_truth
   
   def __send_successful_update_email(self) -> None:
     body = f"The historical data was successfully updated.\n\n"
@@ -212,64 +254,99 @@ class HistDataManager:
     )
     self.emailer.send()
 
-  def __fetch_hist_data_on_update(self, stocks_batches: list) -> pd.DataFrame:
-    if not stocks_batches or len(stocks_batches) == 0:
-      raise ValueError("No stock batches provided to fetch historical data.")
-    
-    agg_df = self.__hd_df.copy()
-    self.pai(f"\t\tAt first, agg_df has {agg_df.shape[0]} rows and {agg_df.shape[1]} columns")
-    start_time = time.time()
-    alternate = 1  # 1 for yfinance, -1 for yahooquery
-
-    for batch_index, batch in enumerate(stocks_batches):
-      if (batch_index + 1) % 6 == 0:
-        # To avoid hitting API rate limits, we will make sure we don't do more than 6 requests per minute
-        self.__wait_if_less_than_x_seconds(start_time, wait_seconds=62)
-        start_time = time.time()
-
-      try:
-        stock_data_mgr = self.yfinance_manager if alternate == 1 else self.yquery_manager
-        df = self.__fetch_hist_data(stock_data_mgr, batch)
-        alternate *= -1  # Switch between 1 and -1
-
-        if df.empty:
-          self.pai(f"\tNo historical data returned for batch {batch_index + 1}/{len(stocks_batches)}. Skipping this batch.")
-        else:
-          # For debugging purposes
-          # print(df.head())
-          # Aggregate the new data with the existing historical data
-          agg_df = self.__aggregate_hd_dataframes(agg_df, df)
-          print(f"\t\tAfter processing batch {batch_index + 1}/{len(stocks_batches)}, agg_df has {agg_df.shape[0]} rows and {agg_df.shape[1]} columns")
-      except NanValuesInHistoricalData as E:
-        msg = f"Error: {repr(E)}. Batch {batch_index + 1}/{len(stocks_batches)} (starting with stock {batch[0]}) will be skipped."
-        self.paw(msg)
-      except DiffDateRangesBetweenDataframes as E:
-        msg = f"Error: {repr(E)}. Batch {batch_index + 1}/{len(stocks_batches)} (starting with stock {batch[0]}) will be skipped."
-        self.paw(msg)
-      except Exception as E:
-        msg = f"An unexpected error occurred while trying to get historical data for the batch that started with symbol {batch[0]} and ended with symbol {batch[-1]}. Error details: {repr(E)}. We are skipping this batch."
-        self.paw(msg)
+  def __fetch_gap(self, start_date: str, end_date: str, batch: list) -> pd.DataFrame:
+    # Providers treat 'end' as exclusive, so ask for the day after and keep only the requested range
+    end_exclusive = (pd.to_datetime(end_date) + pd.Timedelta(days=1)).strftime('%Y-%m-%d')
+    df = self.data_pool.get_historical_data(batch, start=start_date, end=end_exclusive)
+    if df.empty:
+      return df
+    return df[(df['date'] >= start_date) & (df['date'] <= end_date)]
 
+  def __fill_gaps(self, requests: list[tuple[str, str, list[str]]]) -> pd.DataFrame:
+    """
+    Fetch only the missing cells and write them into the stored matrix; new rows and new symbols are added, stored values are never overwritten.
+    The window keeps its length (the oldest rows make room for the new ones) and fetched symbols left with NaNs go through the usual checks.
+    Only the fetched columns are merged and checked. Stored symbols that are no longer listed are dropped once a new trading day is added,
+    since they have no value for it and a NaN before the last row would break the next upsert's checks; they are listed in the NaN report as 'unlisted'.
+    """
+    stored_df = self.__hd_df.set_index('date')
+    pieces_per_request = self.__run_batches([(batch, partial(self.__fetch_gap, start_date, end_date)) for start_date, end_date, batch in requests])
+
+    filled_dfs, failed_ranges = [], []
+    for (start_date, end_date, _), pieces in zip(requests, pieces_per_request):
+      for batch, df, fetch_error in pieces:
+        if fetch_error is not None:
+          self.paw(f"Could not fetch {start_date} to {end_date} for the batch that started with symbol {batch[0]} and ended with symbol {batch[-1]}. Error details: {repr(fetch_error)}. Skipping it.")
+          if any(symbol in stored_df.columns for symbol in batch):
+            failed_ranges.append((start_date, end_date))
+        elif not df.empty:
+          filled_dfs.append(df.set_index('date'))
+
+    if not filled_dfs:
+      raise ValueError("No historical data was fetched for any of the gaps.")
+
+    # First non-NaN value per date and symbol across every piece, then stored values win over fetched ones
+    fills_df = pd.concat(filled_dfs).groupby(level=0).first()
+    new_symbols = [symbol for symbol in fills_df.columns if symbol not in stored_df.columns]
+    not_returned = sorted({symbol for _, _, batch in requests for symbol in batch if symbol not in stored_df.columns} - set(new_symbols))
+    if not_returned:
+      self.paw(f"\t\tNo historical data returned for new symbols: {not_returned}. They were not added.")
+    fetched_stored = [symbol for symbol in fills_df.columns if symbol in stored_df.columns]
+    dates = stored_df.index.union(fills_df.index)
+    agg_df = stored_df.reindex(dates)
+    agg_df[fetched_stored] = agg_df[fetched_stored].fillna(fills_df[fetched_stored].reindex(dates))
+    agg_df = pd.concat([agg_df, fills_df[new_symbols].reindex(dates)], axis=1)
+
+    # A new row is only kept if the requested symbols already stored could be fetched for it; otherwise the next upsert finds that gap again
+    requested = list(dict.fromkeys(symbol for _, _, batch in requests for symbol in batch))
+    requested_stored = [symbol for symbol in requested if symbol in stored_df.columns]
+    new_rows = ~agg_df.index.isin(stored_df.index)
+    incomplete_rows = new_rows & agg_df[requested_stored].isna().all(axis=1).to_numpy()
+    for start_date, end_date in failed_ranges:
+      incomplete_rows |= new_rows & (agg_df.index >= start_date) & (agg_df.index <= end_date)
+    # Every listed symbol is requested for the new trading days, so the stored ones that were not are no longer listed
+    unlisted = [symbol for symbol in stored_df.columns if symbol not in requested] if (new_rows & ~incomplete_rows).any() else []
+    if unlisted:
+      self.paw(f"\t\tDropped {len(unlisted)} stored symbols that are no longer in {self.cfg['s3_all_stocks_csv_name']} and have no values for the new trading days: {unlisted}")
+    agg_df = agg_df[~incomplete_rows].drop(columns=unlisted).iloc[-len(stored_df):]
+    agg_df.index.name = 'date'
+    agg_df = agg_df.reset_index()
+
+    agg_df, report = self.__validate_nans(agg_df, "the updated historical data", subset=['date', *requested_stored, *new_symbols])
+    report['unlisted'] = unlisted
+    self.nan_reports.append(report)
+    self.pai(f"\tAdded {len(new_symbols)} symbols and {int(new_rows.sum() - incomplete_rows.sum())} trading days to the historical data")
     return agg_df
 
+  def __report_folded_deltas(self, folded_deltas: int) -> None:
+    if folded_deltas:
+      self.pai(f"\tFolded {folded_deltas} daily closing price deltas into {self.cfg['s3_historical_data_file_name']}")
+
   def __update(self) -> None:
     """
-    Compare the list of stocks in the stocks list with the columns in the historical data dataframe.
-    For any stocks that are missing in the historical data, fetch their historical data and append it to the existing dataframe.
+    Compare the stocks list and the trading calendar with the historical data dataframe.
+    Only the missing cells are fetched: new symbols, trading days missing from the matrix or after its last date, and NaN holes.
     """
     self.__hd_df = self.__get_current_historical_data()
-    stocks_to_process = self.__get_stocks_to_update()
+    stocks_list = self.__get_stocks_list()
+    as_of = self.cfg['hist_data_as_of_date'] or last_completed_trading_day()
+    gap_detector = HistDataGapDetector(self.cfg['hist_data_batch_size'])
+    gaps = gap_detector.detect(self.__hd_df, stocks_list, as_of)
     # TODO keep track of whether or not the historical data was changed; if not, do not send email and do not upload to S3
-    if len(stocks_to_process) == 0:
-      self.pai("\tNo missing stocks found. Historical data is up to date.")
+    if not gaps:
+      self.pai(f"\tNo gaps found up to {as_of}. Historical data is up to date.")
+      # The frame read above already has the daily closing deltas merged in; folding them writes it once
+      self.__report_folded_deltas(self.hd_store.compact(self.__hd_df))
       return
-    
-    batch_size = 20
-    batches = [stocks_to_process[i:i + batch_size] for i in range(0, len(stocks_to_process), batch_size)]
 
-    self.__hd_df = self.__fetch_hist_data_on_update(batches)
-    self.s3_mgr.create(bucket_name=self.cfg['s3_bucket'], bucket_key=self.cfg['s3_historical_data_csv_name'], data=self.__hd_df)
-    self.pai(f"\tSuccessfully updated historical data to {self.cfg['s3_historical_data_csv_name']} in bucket {self.cfg['s3_bucket']}")
+    requests = gap_detector.plan_requests(gaps)
+    missing_stocks = [symbol for symbol in gaps if symbol not in self.__hd_df.columns]
+    self.pai(f"\tFound {len(missing_stocks)} missing stocks and {len(gaps) - len(missing_stocks)} stocks with missing days up to {as_of}; fetching them in {len(requests)} requests")
+
+    self.__hd_df = self.__fill_gaps(requests)
+    # A single write of the filled matrix, which also folds the daily closing deltas it was read with
+    self.__report_folded_deltas(self.hd_store.write(self.__hd_df))
+    self.pai(f"\tSuccessfully updated historical data to {self.cfg['s3_historical_data_file_name']} in bucket {self.cfg['s3_bucket']}")
     self.pai(f"\tIt now has {self.__hd_df.shape[0]} rows and {self.__hd_df.shape[1]} columns")
     self.__send_successful_update_email()
 
@@ -281,28 +358,21 @@ class HistDataManager:
       raise ValueError("No stock batches provided to fetch historical data.")
 
     dataframes = []
-    start_time = time.time()
-    alternate = 1  # 1 for yfinance, -1 for yahooquery
-
-    # TODO create a class that handles this alternation setup (created issue: https://github.com/muelitas/stocksStats/issues/6)
-    for batch_index, batch in enumerate(stocks_batches):
-      if (batch_index + 1) % 6 == 0:
-        # To avoid hitting API rate limits, we will make sure we don't do more than 6 requests per minute
-        self.__wait_if_less_than_x_seconds(start_time, wait_seconds=62)
-        start_time = time.time()
 
+    # The provider pool picks the provider for each batch and waits only when every provider is out of quota
+    fetched = self.__fetch_batches(stocks_batches)
+    for batch_index, (batch, df, fetch_error) in enumerate(fetched):
       try:
-        stock_data_mgr = self.yfinance_manager if alternate == 1 else self.yquery_manager
-        df = self.__fetch_hist_data(stock_data_mgr, batch)
-        alternate *= -1  # Switch between 1 and -1
+        if fetch_error is not None:
+          raise fetch_error
 
         if df.empty:
-          self.pai(f"\tNo historical data returned for batch {batch_index + 1}/{len(stocks_batches)}. Skipping this batch.")
+          self.pai(f"\tNo historical data returned for batch {batch_index + 1}/{len(fetched)}. Skipping this batch.")
         else:
           # For debugging purposes
           # print(df.head())
-          dataframes.append(df)
-          print(f"\tSuccessfully fetched historical data for batch {batch_index + 1}/{len(stocks_batches)}.")
+          dataframes.append((f"Batch {batch_index + 1}/{len(fetched)} (starting with stock {batch[0]})", df))
+          print(f"\tSuccessfully fetched historical data for batch {batch_index + 1}/{len(fetched)}.")
       except NanValuesInHistoricalData as E:
         msg = f"Error: {repr(E)}. The batch that started with symbol {batch[0]} and ended with symbol {batch[-1]} will be skipped."
         self.paw(msg)
@@ -310,18 +380,11 @@ class HistDataManager:
         msg = f"An unexpected error occurred while trying to get historical data for the batch that started with symbol {batch[0]} and ended with symbol {batch[-1]}. Error details: {repr(E)}. We are skipping this batch."
         self.paw(msg)
 
-    if len(dataframes) == 0:
+    # Join all dataframes on their dates at once to combine all stocks with shared dates
+    combined_df = self.__aggregate_hd_dataframes(dataframes)
+    if combined_df is None:
       raise ValueError("No historical data was fetched for any of the stock batches.")
 
-    # Merge all dataframes on the 'date' column to combine all stocks with shared dates
-    combined_df = None
-    if len(dataframes) == 1:
-      combined_df = dataframes[0]
-    else:
-      combined_df = dataframes[0]  # Start with the first dataframe
-      for df in dataframes[1:]:
-        combined_df = self.__aggregate_hd_dataframes(combined_df, df)
-
     return combined_df
 
   def __send_successful_create_email(self) -> None:
@@ -348,17 +411,71 @@ class HistDataManager:
     self.__check_for_list_uniqueness(stocks_to_process, self.cfg['s3_all_stocks_csv_name'])
     self.pai(f"\tGathered {len(stocks_to_process)} stocks from {self.cfg['s3_all_stocks_csv_name']}")
 
-    batch_size = 20
+    batch_size = self.cfg['hist_data_batch_size']
     batches = [stocks_to_process[i:i + batch_size] for i in range(0, len(stocks_to_process), batch_size)]
 
     self.__hd_df = self.__fetch_hist_data_on_create(batches)
-    self.s3_mgr.create(bucket_name=self.cfg['s3_bucket'], bucket_key=self.cfg['s3_historical_data_csv_name'], data=self.__hd_df)
-    self.pai(f"\tSuccessfully created historical data to {self.cfg['s3_historical_data_csv_name']} in bucket {self.cfg['s3_bucket']}")
+    self.hd_store.write(self.__hd_df)
+    self.pai(f"\tSuccessfully created historical data to {self.cfg['s3_historical_data_file_name']} in bucket {self.cfg['s3_bucket']}")
     self.pai(f"\tIt now has {self.__hd_df.shape[0]} rows and {self.__hd_df.shape[1]} columns")
     self.__send_successful_create_email()
 
   #endregion
 
+  #region Migrate
+  def __send_migration_email(self, error: Exception | None = None) -> None:
+    if error is None:
+      subject = "Historical Data Migrated to Parquet"
+      body = "The historical data was successfully migrated to Parquet.\n\n"
+    else:
+      subject = "Failed to migrate historical data to Parquet"
+      body = f"An error occurred while trying to migrate the historical data to Parquet.\n\nError details:\n{repr(error)}\n\n"
+
+    if self.infos:
+      body += "Infos:\n"
+      for info in self.infos:
+        body += f"- {info}\n"
+
+    if self.warnings:
+      body += "\n\nWarnings:\n"
+      for warning in self.warnings:
+        body += f"- {warning}\n"
+
+    self.emailer.set_email_params(
+      to=self.cfg['email_to'], 
+      subject=subject, 
+      body=body
+    )
+    self.emailer.send()
+
+  def migrate_to_parquet(self) -> None:
+    """One-shot copy of the legacy CSV historical data into the Parquet object that every other scenario reads."""
+    try:
+      bucket, csv_key, parquet_key = self.cfg['s3_bucket'], self.cfg['s3_historical_data_csv_name'], self.cfg['s3_historical_data_file_name']
+      if self.s3_mgr.check_existence(bucket_name=bucket, bucket_key=parquet_key):
+        self.pai(f"{parquet_key} already exists in bucket {bucket}. Nothing to migrate.")
+        return
+
+      csv_df = self.s3_mgr.read(bucket_name=bucket, bucket_key=csv_key)
+      self.pai(f"\tRead {csv_key}: {csv_df.shape[0]} rows and {csv_df.shape[1]} columns")
+      self.s3_mgr.create(bucket_name=bucket, bucket_key=parquet_key, data=csv_df)
+
+      # Read it back to make sure the typed copy holds exactly the same data
+      parquet_df = self.s3_mgr.read(bucket_name=bucket, bucket_key=parquet_key)
+      try:
+        pd.testing.assert_frame_equal(csv_df, parquet_df, check_dtype=False)
+      except AssertionError as E:
+        raise ValueError(f"The Parquet copy does not match {csv_key}: {E}")
+
+      self.pai(f"\tSuccessfully migrated {csv_key} to {parquet_key} in bucket {bucket}. {csv_key} was left untouched.")
+      self.__send_migration_email()
+    except Exception as E:
+      self.paw(f"An error occurred while migrating historical data to Parquet: {repr(E)}")
+      self.__send_migration_email(E)
+      # No need to raise the error since we will be sending an email
+
+  #endregion
+
   #region Upsert
   def __send_failed_upsert_email(self, error: Exception, in_update_mode: bool | None) -> None:
     mode = "update" if in_update_mode else "create" if in_update_mode == False else "upsert"
@@ -385,14 +502,15 @@ class HistDataManager:
 
     self.emailer.send()
 
-  def upsert(self):
+  def upsert(self) -> dict:
+    """Create or update the historical data; returns the NaN report of the symbols dropped and repaired along the way, also when it failed"""
     try:
       self.__validate_time_frame_for_upsert()
-      all_stocks_file_exists = self.s3_mgr.check_existence(bucket_name=self.cfg['s3_bucket'], bucket_key=self.cfg['s3_all_stocks_csv_name'])
-      if not all_stocks_file_exists:
+      keys_existence = self.s3_mgr.check_existence_many(bucket_name=self.cfg['s3_bucket'], bucket_keys=[self.cfg['s3_all_stocks_csv_name'], self.cfg['s3_historical_data_file_name']])
+      if not keys_existence[self.cfg['s3_all_stocks_csv_name']]:
         raise ValueError(f"The stocks list file '{self.cfg['s3_all_stocks_csv_name']}' does not exist in bucket '{self.cfg['s3_bucket']}'. Cannot upsert historical data without the stocks csv file.")
 
-      self.in_update_mode = self.s3_mgr.check_existence(bucket_name=self.cfg['s3_bucket'], bucket_key=self.cfg['s3_historical_data_csv_name'])
+      self.in_update_mode = keys_existence[self.cfg['s3_historical_data_file_name']]
       # TODO after checking existence, check if the historical data file is empty or corrupted; if so, set in_update_mode to False
 
       if self.in_update_mode:
@@ -406,5 +524,7 @@ class HistDataManager:
       self.__send_failed_upsert_email(E, self.in_update_mode)
       # No need to raise the error since we will be sending an email
 
+    return self.__merged_nan_report()
+
   #endregion
 
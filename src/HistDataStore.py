@@ -0,0 +1,104 @@
+import pandas as pd
+
+from StorageProviderManager import StorageProviderManager
+import StorageSerialization as serialization
+
+class HistDataStore:
+  """
+  The historical data is stored as a base snapshot plus one small delta object per closing day.
+  Daily closes only write their delta; readers get the merged view and `compact` folds the deltas back into the snapshot.
+  """
+
+  def __init__(self, storage_manager: StorageProviderManager, cfg: dict):
+    self.storage_mgr = storage_manager
+    self.bucket = cfg['s3_bucket']
+    self.base_key = cfg['s3_historical_data_file_name']
+    self.deltas_prefix = cfg['s3_historical_data_deltas_prefix']
+
+  def list_delta_keys(self) -> list[str]:
+    # Delta keys embed the date as YYYY-MM-DD, so sorting the keys sorts them chronologically
+    return sorted(self.storage_mgr.list_keys(bucket_name=self.bucket, prefix=self.deltas_prefix))
+
+  def read(self) -> pd.DataFrame:
+    """Base snapshot with every pending delta applied"""
+    base_df = self.storage_mgr.read(bucket_name=self.bucket, bucket_key=self.base_key)
+    delta_keys = self.list_delta_keys()
+    if not delta_keys:
+      return base_df
+
+    delta_dfs = [self.storage_mgr.read(bucket_name=self.bucket, bucket_key=key) for key in delta_keys]
+    return self.__merge(base_df, delta_dfs)
+
+  def read_history(self, symbols: list[str] = None, start: str = None, end: str = None) -> pd.DataFrame:
+    """
+    Same view as `read()` restricted to the 'date' column plus `symbols` (None for all) and to dates in [start, end].
+    Only the requested slice of the base snapshot is read; the deltas are one row each and are read whole.
+    """
+    delta_keys = self.list_delta_keys()
+    base_df = self.storage_mgr.read_history(bucket_name=self.bucket, bucket_key=self.base_key, symbols=symbols, start=start, end=end)
+    if not delta_keys:
+      return base_df
+
+    delta_dfs = [self.storage_mgr.read(bucket_name=self.bucket, bucket_key=key) for key in delta_keys]
+    # The window's first date depends on the whole base, so read its dates (a single small column) to find it
+    base_dates = self.storage_mgr.read_history(bucket_name=self.bucket, bucket_key=self.base_key, symbols=[])['date']
+    all_dates = sorted(set(base_dates).union(*(delta_df['date'] for delta_df in delta_dfs)))
+    window_start = all_dates[-len(base_dates)]
+
+    delta_dfs = [serialization.project_history(delta_df, symbols, start, end) for delta_df in delta_dfs]
+    merged_df = pd.concat([base_df, *delta_dfs], join='inner', ignore_index=True)
+    merged_df = merged_df.drop_duplicates(subset='date', keep='last').sort_values('date', ignore_index=True)
+    return merged_df[merged_df['date'] >= window_start].reset_index(drop=True)
+
+  def write(self, df: pd.DataFrame) -> int:
+    """
+    Replace the base snapshot. `df` is expected to come from `read()`, so the pending deltas are already part of it and are removed.
+    Returns how many deltas were removed.
+    """
+    delta_keys = self.list_delta_keys()
+    self.storage_mgr.create(bucket_name=self.bucket, bucket_key=self.base_key, data=df)
+    self.__delete_deltas(delta_keys)
+    return len(delta_keys)
+
+  def append_delta(self, row: dict) -> str:
+    """Store one day of closing prices ({'date': 'YYYY-MM-DD', symbol: price, ...}); writing the same date again replaces that day's delta"""
+    if 'date' not in row:
+      raise ValueError("The delta row must have a 'date' entry.")
+
+    delta_key = f"{self.deltas_prefix}{row['date']}.parquet"
+    self.storage_mgr.create(bucket_name=self.bucket, bucket_key=delta_key, data=pd.DataFrame([row]))
+    return delta_key
+
+  def compact(self, merged_df: pd.DataFrame = None) -> int:
+    """
+    Fold the pending deltas into the base snapshot with a single write; returns how many deltas were folded.
+    `merged_df` is the view a caller already got from `read()`, which includes the deltas: it is written as is instead of reading and merging everything again.
+    """
+    delta_keys = self.list_delta_keys()
+    if not delta_keys:
+      return 0
+
+    if merged_df is None:
+      base_df = self.storage_mgr.read(bucket_name=self.bucket, bucket_key=self.base_key)
+      delta_dfs = [self.storage_mgr.read(bucket_name=self.bucket, bucket_key=key) for key in delta_keys]
+      merged_df = self.__merge(base_df, delta_dfs)
+
+    # Write the snapshot before deleting anything so a failure in between only leaves already-applied (idempotent) deltas behind
+    self.storage_mgr.create(bucket_name=self.bucket, bucket_key=self.base_key, data=merged_df)
+    self.__delete_deltas(delta_keys)
+    return len(delta_keys)
+
+  #region Private methods
+  def __merge(self, base_df: pd.DataFrame, delta_dfs: list[pd.DataFrame]) -> pd.DataFrame:
+    # join='inner': a symbol missing from a delta was dropped by that day's close, same as dropping its column from the full matrix
+    merged_df = pd.concat([base_df, *delta_dfs], join='inner', ignore_index=True)
+    merged_df = merged_df.drop_duplicates(subset='date', keep='last').sort_values('date', ignore_index=True)
+
+    # Every daily close used to drop the oldest row, so the window keeps the base snapshot's length
+    return merged_df.iloc[-len(base_df):].reset_index(drop=True)
+
+  def __delete_deltas(self, delta_keys: list[str]) -> None:
+    for key in delta_keys:
+      self.storage_mgr.delete(bucket_name=self.bucket, bucket_key=key)
+
+  #endregion
@@ -0,0 +1,22 @@
+import threading
+
+from curl_cffi import requests as curl_requests # Already a dependency of both yfinance and yahooquery
+from yahooquery.session_management import initialize_session
+
+# Module-level so warm Lambda invocations keep their open (keep-alive) connections, cookies and consent: key -> session
+_SESSIONS = {}
+_LOCK = threading.Lock()
+
+def yahooquery_session(pool_size: int):
+  """Asynchronous session (up to `pool_size` requests in flight) over one curl_cffi session; its cookie/consent setup runs once"""
+  return _get_or_create(('yahooquery', pool_size), lambda: initialize_session(asynchronous=True, max_workers=pool_size))
+
+def yfinance_session():
+  """curl_cffi session shared by every yfinance call (yfinance keeps its cookie and crumb on whichever session it is given)"""
+  return _get_or_create(('yfinance',), lambda: curl_requests.Session(impersonate='chrome'))
+
+def _get_or_create(key: tuple, create):
+  with _LOCK:
+    if key not in _SESSIONS:
+      _SESSIONS[key] = create()
+    return _SESSIONS[key]
@@ -0,0 +1,39 @@
+import bisect
+import threading
+
+# Bucket upper bounds in seconds, growing by 1.5x from 50 ms to about 5 minutes; slower requests land in the last (unbounded) bucket
+DEFAULT_BUCKET_BOUNDS = tuple(0.05 * 1.5 ** i for i in range(22))
+
+class LatencyHistogram:
+  """Thread-safe histogram of request latencies with fixed, log-spaced buckets; percentiles are reported as their bucket's upper bound"""
+
+  def __init__(self, bucket_bounds: tuple[float, ...] = DEFAULT_BUCKET_BOUNDS):
+    if not bucket_bounds or list(bucket_bounds) != sorted(bucket_bounds):
+      raise ValueError("The 'bucket_bounds' of a latency histogram must be a non-empty, ascending sequence.")
+
+    self.bucket_bounds = tuple(bucket_bounds)
+    self.counts = [0] * (len(self.bucket_bounds) + 1)
+    self.count = 0
+    self.lock = threading.Lock()
+
+  def record(self, seconds: float) -> None:
+    with self.lock:
+      self.counts[bisect.bisect_left(self.bucket_bounds, seconds)] += 1
+      self.count += 1
+
+  def percentile(self, percentile: float) -> float | None:
+    """Upper bound of the bucket holding the `percentile`-th (0-100) latency; None if nothing was recorded"""
+    if not 0 <= percentile <= 100:
+      raise ValueError(f"The percentile must be between 0 and 100, got {percentile}.")
+
+    with self.lock:
+      if self.count == 0:
+        return None
+
+      rank = max(1, percentile / 100 * self.count)
+      seen = 0
+      for i, bucket_count in enumerate(self.counts):
+        seen += bucket_count
+        if seen >= rank:
+          # The overflow bucket has no upper bound, report the largest one we have
+          return self.bucket_bounds[min(i, len(self.bucket_bounds) - 1)]
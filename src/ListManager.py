@@ -2,19 +2,18 @@ import sys
 import time
 
 import pandas as pd
- # TODO include screeners logic in Stock Data Providers or create its own module (created issue: https://github.com/muelitas/stocksStats/issues/5)
-from yahooquery import Screener
-from StockDataProviderManager import StockDataProviderManager
+from ScreenerProviderManager import ScreenerProviderManager
+from StockDataProviderPool import StockDataProviderPool
 from StorageProviderManager import StorageProviderManager
 
 from Emailer import Emailer
 
 class ListManager:
-  def __init__(self, storage_manager: StorageProviderManager, emailer: Emailer, yahoo_finance_data_manager: StockDataProviderManager, yahoo_query_data_manager: StockDataProviderManager, cfg: dict):
+  def __init__(self, storage_manager: StorageProviderManager, emailer: Emailer, stock_data_pool: StockDataProviderPool, screener_manager: ScreenerProviderManager, cfg: dict):
     self.s3_mgr = storage_manager
     self.emailer = emailer
-    self.yfinance_manager = yahoo_finance_data_manager
-    self.yquery_manager = yahoo_query_data_manager
+    self.data_pool = stock_data_pool
+    self.screener_mgr = screener_manager
     # TODO once config is defined, validate it here and create class attributes
     self.cfg = cfg
 
@@ -68,40 +67,35 @@ class ListManager:
 
     # If stocks list is greater than 100, raise a warning
     if len(stocks_list) > 100:
-      warning_msg = f"Warning: The list in {self.cfg['s3_currently_invested_stocks_txt_name']} contains more than 100 entries. Consider alternating between APIs."
+      warning_msg = f"Warning: The list in {self.cfg['s3_currently_invested_stocks_txt_name']} contains more than 100 entries. Consider raising the providers' rate limits in the config."
       print(warning_msg)
       self.warnings.append(warning_msg)
 
-    batch_size = 20
-    batches = [stocks_list[i:i + batch_size] for i in range(0, len(stocks_list), batch_size)]
-
     stocks_and_info = []
     stocks_set = set()
-    # TODO Same here, we would benefit from a class that handles multiple stock data providers usage (so it helps prevent hitting rate limits) (created issue: https://github.com/muelitas/stocksStats/issues/6)
     print(f"Getting stocks from Currently Invested list")
-    for i, batch in enumerate(batches):
-      print(f"\tProcessing batch {i + 1} of {len(batches)}")
-      tickers_info = self.yquery_manager.get_stocks_info(batch)
-      for symbol in batch:
-        info = tickers_info.get(symbol, {})
-        if 'marketCap' not in info:
-          print(f"\t\tSkipping symbol {symbol} as it has no marketCap info")
-          continue
-
-        if symbol in stocks_set:
-          continue  # Skip duplicates
-
-        stocks_set.add(symbol)
-        stock_data = {
-            'symbol': symbol,
-            'marketCap': info['marketCap'],
-            'exchange': info['exchange'] if 'exchange' in info else 'N/A',
-            'fullExchangeName': info['fullExchangeName'] if 'fullExchangeName' in info else 'N/A',
-            'hasPreMarketData': info['preMarketPrice'] is not None if 'preMarketPrice' in info else False,
-            'screener': 'N/A'
-        }
-
-        stocks_and_info.append(stock_data)
+    # The provider manager splits the list into request-sized chunks and fetches them in parallel
+    tickers_info = self.data_pool.get_stocks_info(stocks_list)
+    for symbol in stocks_list:
+      info = tickers_info.get(symbol, {})
+      if 'marketCap' not in info:
+        print(f"\t\tSkipping symbol {symbol} as it has no marketCap info")
+        continue
+
+      if symbol in stocks_set:
+        continue  # Skip duplicates
+
+      stocks_set.add(symbol)
+      stock_data = {
+          'symbol': symbol,
+          'marketCap': info['marketCap'],
+          'exchange': info['exchange'] if 'exchange' in info else 'N/A',
+          'fullExchangeName': info['fullExchangeName'] if 'fullExchangeName' in info else 'N/A',
+          'hasPreMarketData': info['preMarketPrice'] is not None if 'preMarketPrice' in info else False,
+          'screener': 'N/A'
+      }
+
+      stocks_and_info.append(stock_data)
 
     print(f"\tTotal unique Currently Invested stocks: {len(stocks_and_info)}")
     # Make the list a dataframe
@@ -113,42 +107,37 @@ class ListManager:
     stocks_list = self.s3_mgr.read(bucket_name=self.cfg['s3_bucket'], bucket_key=self.cfg['s3_otc_stocks_txt_name'])
     self.__check_for_list_uniqueness(stocks_list, self.cfg['s3_otc_stocks_txt_name'])
 
-    # Use Ticker from yahooquery to get more info about each stock
-    batch_size = 20
-    batches = [stocks_list[i:i + batch_size] for i in range(0, len(stocks_list), batch_size)]
-
+    # Use the stock data providers to get more info about each stock
     stocks_and_info = []
     stocks_set = set()
     stocks_below_market_cap_threshold = []
     print(f"Getting stocks from OTC Markets list")
-    # TODO create a class that handles multiple stock data providers usage (so it helps prevent hitting rate limits) and implement it here (created issue: https://github.com/muelitas/stocksStats/issues/6)
-    for i, batch in enumerate(batches):
-      print(f"\tProcessing batch {i + 1} of {len(batches)}")
-      tickers_info = self.yquery_manager.get_stocks_info(batch)
-      for symbol in batch:
-        info = tickers_info.get(symbol, {})
-        if 'marketCap' not in info:
-          print(f"\t\tSkipping symbol {symbol} as it has no marketCap info")
-          continue
-
-        if symbol in stocks_set:
-          continue  # Skip duplicates
-
-        if info['marketCap'] < self.cfg['market_cap_threshold']:
-          # print(f"\t\tSymbol {symbol} has marketCap {info['marketCap']} which is below the threshold of {self.cfg['market_cap_threshold']}")
-          stocks_below_market_cap_threshold.append(symbol)
-
-        stocks_set.add(symbol)
-        stock_data = {
-            'symbol': symbol,
-            'marketCap': info['marketCap'],
-            'exchange': info['exchange'] if 'exchange' in info else 'N/A',
-            'fullExchangeName': info['fullExchangeName'] if 'fullExchangeName' in info else 'N/A',
-            'hasPreMarketData': info['preMarketPrice'] is not None if 'preMarketPrice' in info else False,
-            'screener': 'N/A'
-        }
-
-        stocks_and_info.append(stock_data)
+    # The provider manager splits the list into request-sized chunks and fetches them in parallel
+    tickers_info = self.data_pool.get_stocks_info(stocks_list)
+    for symbol in stocks_list:
+      info = tickers_info.get(symbol, {})
+      if 'marketCap' not in info:
+        print(f"\t\tSkipping symbol {symbol} as it has no marketCap info")
+        continue
+
+      if symbol in stocks_set:
+        continue  # Skip duplicates
+
+      if info['marketCap'] < self.cfg['market_cap_threshold']:
+        # print(f"\t\tSymbol {symbol} has marketCap {info['marketCap']} which is below the threshold of {self.cfg['market_cap_threshold']}")
+        stocks_below_market_cap_threshold.append(symbol)
+
+      stocks_set.add(symbol)
+      stock_data = {
+          'symbol': symbol,
+          'marketCap': info['marketCap'],
+          'exchange': info['exchange'] if 'exchange' in info else 'N/A',
+          'fullExchangeName': info['fullExchangeName'] if 'fullExchangeName' in info else 'N/A',
+          'hasPreMarketData': info['preMarketPrice'] is not None if 'preMarketPrice' in info else False,
+          'screener': 'N/A'
+      }
+
+      stocks_and_info.append(stock_data)
 
     print(f"\tThese {len(stocks_below_market_cap_threshold)} stocks were below market cap threshold ({self.cfg['market_cap_threshold']}): {stocks_below_market_cap_threshold}")
     print(f"\tTotal unique OTC stocks: {len(stocks_and_info)}")
@@ -164,47 +153,28 @@ class ListManager:
     screeners = self.s3_mgr.read(bucket_name=self.cfg['s3_bucket'], bucket_key=self.cfg['s3_screeners_file_name'])
 
     stocks = []
-    _stocks_set = set()
-    no_market_cap_stocks = []
     print(f"Getting stocks from screeners (NYSE and NASDAQ)")
-    for screener_name in screeners:
-      s = Screener() # TODO include screeners logic in Stock Data Providers or create its own module (created issue: https://github.com/muelitas/stocksStats/issues/5)
-      result = s.get_screeners(screener_name, count=self.cfg['symbols_per_screener'])
-      if result[screener_name] == 'No screener records found. Check if scrIds and marketRegion combination are correct':
-        print(f"\tSkipping screener {screener_name} as it returned no records")
-        continue
-
-      for idx, i in enumerate(result[screener_name]['quotes']):
-        if 'symbol' not in i:
-          print(f"\tSkipping entry {idx} as it has no symbol")
-          continue
-        
-        if 'marketCap' not in i:
-          no_market_cap_stocks.append(i['symbol'])
-          # print(f"\tSkipping entry {idx} ({i['symbol']}) as it has no marketCap")
-          continue
-
-        if i['marketCap'] < self.cfg['market_cap_threshold']:
-            continue
-        
-        if i['symbol'] in _stocks_set:
-          continue  # Skip duplicates
-
-        _stocks_set.add(i['symbol'])
-        stock_data = {
-          'symbol': i['symbol'],
-          'marketCap': i['marketCap'],
-          'exchange': i['exchange'] if 'exchange' in i else 'N/A',
-          'fullExchangeName': i['fullExchangeName'] if i['fullExchangeName'] is not None else 'N/A',
-          'hasPreMarketData': i['preMarketPrice'] is not None if 'preMarketPrice' in i else False,
-          'screener': screener_name
-        }
-
-        stocks.append(stock_data)
+    # All screeners in one parallel round, already deduplicated and filtered by market cap
+    screened_stocks = self.screener_mgr.get_screened_stocks(
+      screeners,
+      count=self.cfg['symbols_per_screener'],
+      min_market_cap=self.cfg['market_cap_threshold'],
+      fields=['marketCap', 'exchange', 'fullExchangeName', 'preMarketPrice']
+    )
+    for symbol, i in screened_stocks.items():
+      stock_data = {
+        'symbol': symbol,
+        'marketCap': i['marketCap'],
+        'exchange': i['exchange'] if 'exchange' in i else 'N/A',
+        'fullExchangeName': i['fullExchangeName'] if i.get('fullExchangeName') is not None else 'N/A',
+        'hasPreMarketData': i['preMarketPrice'] is not None if 'preMarketPrice' in i else False,
+        'screener': i['screener']
+      }
+
+      stocks.append(stock_data)
 
     # Make the list a dataframe
     stocks_df = pd.DataFrame(stocks)
-    print(f"\tThese {len(no_market_cap_stocks)} stocks had no market cap info (skipped): {no_market_cap_stocks}")
     print(f"\tTotal unique NYSE and NASDAQ stocks: {stocks_df.shape[0]}")
     return stocks_df
 
@@ -0,0 +1,134 @@
+from collections import OrderedDict
+from datetime import datetime, time as dtime
+import os
+import pickle
+import tempfile
+import threading
+import time
+import zoneinfo
+
+MARKET_PHASES = ('pre', 'regular', 'post', 'closed')
+
+# Module-level so warm Lambda invocations (i.e. the other scenarios of the same morning) reuse it: (provider, field set, symbol) -> (phase, fetched at, value)
+_MEMORY_CACHE = OrderedDict()
+_LOCK = threading.Lock()
+
+def market_phase(now: datetime = None) -> str:
+  """US equities session for `now` (default: current time): 'pre' 4:00-9:30, 'regular' 9:30-16:00, 'post' 16:00-20:00 ET on weekdays, otherwise 'closed'"""
+  now_ny = (now or datetime.now(zoneinfo.ZoneInfo("America/New_York"))).astimezone(zoneinfo.ZoneInfo("America/New_York"))
+  if now_ny.weekday() > 4:
+    return 'closed'
+
+  current_time = now_ny.time()
+  if dtime(4, 0) <= current_time < dtime(9, 30):
+    return 'pre'
+  elif dtime(9, 30) <= current_time < dtime(16, 0):
+    return 'regular'
+  elif dtime(16, 0) <= current_time < dtime(20, 0):
+    return 'post'
+  return 'closed'
+
+class QuoteCache:
+  """
+  LRU cache of per-symbol quote/info lookups, keyed by (provider, field set, symbol) and optionally backed by a pickle file in `cache_dir`.
+  An entry is served only during the market phase it was fetched in and for at most that phase's TTL, so e.g. last night's quotes are never used pre-market.
+  """
+
+  def __init__(self, ttl_seconds_by_phase: dict, max_entries: int = 20_000, cache_dir: str = None):
+    missing_phases = [phase for phase in MARKET_PHASES if phase not in ttl_seconds_by_phase]
+    if missing_phases:
+      raise ValueError(f"The quote cache needs a TTL for every market phase; missing: {missing_phases}")
+    if max_entries <= 0:
+      raise ValueError("The 'max_entries' of the quote cache must be a positive integer.")
+
+    self.ttl_seconds_by_phase = ttl_seconds_by_phase
+    self.max_entries = max_entries
+    self.file_path = None
+    if cache_dir:
+      os.makedirs(cache_dir, exist_ok=True)
+      self.file_path = os.path.join(cache_dir, 'quotes.pkl')
+      self.__load()
+
+  def get_many(self, provider: str, field_set: str, symbols: list) -> dict:
+    """symbol -> cached value for the symbols with a fresh entry; the rest are simply absent"""
+    phase, now = market_phase(), time.time()
+    ttl_seconds = self.ttl_seconds_by_phase[phase]
+    hits = {}
+    with _LOCK:
+      for symbol in symbols:
+        key = (provider, field_set, symbol)
+        entry = _MEMORY_CACHE.get(key)
+        if entry is None:
+          continue
+
+        entry_phase, fetched_at, value = entry
+        if entry_phase != phase or now - fetched_at >= ttl_seconds:
+          del _MEMORY_CACHE[key]
+          continue
+
+        _MEMORY_CACHE.move_to_end(key)
+        hits[symbol] = _copy_value(value)
+
+    return hits
+
+  def put_many(self, provider: str, field_set: str, values: dict) -> None:
+    if not values:
+      return
+
+    phase, now = market_phase(), time.time()
+    with _LOCK:
+      for symbol, value in values.items():
+        key = (provider, field_set, symbol)
+        _MEMORY_CACHE[key] = (phase, now, _copy_value(value))
+        _MEMORY_CACHE.move_to_end(key)
+
+      # Least recently used first
+      while len(_MEMORY_CACHE) > self.max_entries:
+        _MEMORY_CACHE.popitem(last=False)
+
+      self.__save()
+
+  def clear(self) -> None:
+    with _LOCK:
+      _MEMORY_CACHE.clear()
+      if self.file_path and os.path.exists(self.file_path):
+        os.remove(self.file_path)
+
+  #region Private methods
+  def __load(self) -> None:
+    if not os.path.exists(self.file_path):
+      return
+
+    try:
+      with open(self.file_path, 'rb') as f:
+        entries = pickle.load(f)
+    except Exception as e:
+      print(f"Warning: Could not load the quote cache from {self.file_path}, ignoring it: {repr(e)}")
+      return
+
+    with _LOCK:
+      # Entries already in memory are at least as fresh as the ones on disk; the disk ones go in front, oldest first
+      for key, entry in reversed(entries):
+        if key not in _MEMORY_CACHE:
+          _MEMORY_CACHE[key] = entry
+          _MEMORY_CACHE.move_to_end(key, last=False)
+
+  def __save(self) -> None:
+    if not self.file_path:
+      return
+
+    # Written to a temporary file and renamed so a concurrent reader never loads a half-written cache
+    try:
+      fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.file_path), prefix='.tmp-')
+      with os.fdopen(fd, 'wb') as f:
+        pickle.dump(list(_MEMORY_CACHE.items()), f, protocol=pickle.HIGHEST_PROTOCOL)
+      os.replace(tmp_path, self.file_path)
+    except OSError as e:
+      # A full or read-only /tmp should never fail a scenario, the quotes are still cached in memory
+      print(f"Warning: Could not write the quote cache to {self.file_path}: {repr(e)}")
+
+  #endregion
+
+def _copy_value(value):
+  # Callers may mutate what they get back (e.g. info dicts), so never hand out the cached object itself
+  return dict(value) if isinstance(value, dict) else value
@@ -0,0 +1,55 @@
+import gzip
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+
+class RecordingStore:
+  """
+  Provider responses recorded as one gzip-compressed pickle per call, under `recordings_dir/namespace/`.
+  A call is identified by its method and its arguments, so replaying the same scenario asks for the same files.
+  """
+
+  def __init__(self, recordings_dir: str, namespace: str):
+    if not recordings_dir or not namespace:
+      raise ValueError("The 'recordings_dir' and 'namespace' of a recording store must be non-empty strings.")
+
+    self.dir = os.path.join(recordings_dir, namespace)
+    os.makedirs(self.dir, exist_ok=True)
+
+  def save(self, method: str, params: dict, response) -> None:
+    self.__write(self.__path(method, params), gzip.compress(pickle.dumps(response, protocol=pickle.HIGHEST_PROTOCOL), compresslevel=6))
+
+  def load(self, method: str, params: dict):
+    file_path = self.__path(method, params)
+    if not os.path.exists(file_path):
+      raise LookupError(f"No recorded response for {method}({params}) in {self.dir}. Record the scenario again with the current code and inputs.")
+
+    with open(file_path, 'rb') as f:
+      return pickle.loads(gzip.decompress(f.read()))
+
+  def save_manifest(self, manifest: dict) -> None:
+    self.__write(os.path.join(self.dir, 'manifest.json'), json.dumps(manifest, indent=2, sort_keys=True).encode('utf-8'))
+
+  def load_manifest(self) -> dict:
+    file_path = os.path.join(self.dir, 'manifest.json')
+    if not os.path.exists(file_path):
+      return {}
+    with open(file_path, 'r') as f:
+      return json.load(f)
+
+  #region Private methods
+  def __path(self, method: str, params: dict) -> str:
+    # Symbol lists keep their order: the managers split and send them deterministically, so the order is part of the call
+    digest = hashlib.sha1(json.dumps(params, sort_keys=True, default=str).encode('utf-8')).hexdigest()[:16]
+    return os.path.join(self.dir, f"{method}-{digest}.pkl.gz")
+
+  def __write(self, file_path: str, payload: bytes) -> None:
+    # Concurrent chunks of a call record in parallel, so write to a temporary file and rename it
+    fd, tmp_path = tempfile.mkstemp(dir=self.dir, prefix='.tmp-')
+    with os.fdopen(fd, 'wb') as f:
+      f.write(payload)
+    os.replace(tmp_path, file_path)
+
+  #endregion
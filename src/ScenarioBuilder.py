@@ -0,0 +1,88 @@
+from Emailer import Emailer
+from HistDataManager import HistDataManager
+from HistDataStore import HistDataStore
+from ListManager import ListManager
+from QuoteCache import QuoteCache
+from ScenarioHandler import ScenarioHandler
+from ScreenerProviders import ScreenerProviders
+from ScreenerProviderManager import ScreenerProviderManager
+from StockDataProviders import StockDataProviders
+from StockDataProviderManager import StockDataProviderManager
+from StockDataProviderPool import StockDataProviderPool
+from StocksManager import StocksManager
+from StorageCache import StorageCache
+from StorageProviders import StorageProviders
+from StorageProviderManager import StorageProviderManager
+
+DATA_MODES = ('live', 'record', 'replay', 'synthetic')
+
+class ScenarioBuilder:
+  """Wires the managers of a scenario from the config; 'data_mode' and 'storage_provider' swap the live backends for offline ones"""
+
+  def __init__(self, cfg: dict):
+    if cfg['data_mode'] not in DATA_MODES:
+      raise ValueError(f"Invalid data_mode: {cfg['data_mode']}. Valid modes are: {DATA_MODES}")
+    self.cfg = cfg
+
+  def build(self, scenario: str) -> ScenarioHandler:
+    storage_manager = self.__build_storage_manager()
+    stock_data_pool = self.__build_stock_data_pool()
+    screener_manager = self.__build_screener_manager()
+    emailer = Emailer(self.cfg['email_user'], self.cfg['email_pwd'], dry_run=self.cfg['email_dry_run'])
+
+    hist_data_store = HistDataStore(storage_manager, self.cfg)
+
+    list_manager = ListManager(storage_manager, emailer, stock_data_pool, screener_manager, self.cfg)
+    hist_data_manager = HistDataManager(storage_manager, hist_data_store, emailer, stock_data_pool, self.cfg)
+    # TODO refactor StocksManager logic; OOP; break it into multiple classes; rename maybe to StatsManager or MetricsManager (created issue: https://github.com/muelitas/stocksStats/issues/8)
+    stocks_manager = StocksManager(storage_manager, hist_data_store, emailer, stock_data_pool, screener_manager, self.cfg)
+
+    return ScenarioHandler(scenario, list_manager, hist_data_manager, stocks_manager)
+
+  #region Private methods
+  def __build_storage_manager(self) -> StorageProviderManager:
+    storage_cache = StorageCache(self.cfg['storage_cache_dir'], self.cfg['storage_cache_max_bytes'], self.cfg['storage_cache_memory_max_bytes'])
+    # Every manager shares this storage manager, so each object is downloaded and parsed at most once per invocation
+    invocation_cache = {}
+    provider = StorageProviders(self.cfg['storage_provider'])
+    if provider == StorageProviders.LOCAL_FS:
+      return StorageProviderManager(provider, cache=storage_cache, invocation_cache=invocation_cache, root_dir=self.cfg['storage_local_root_dir'])
+    return StorageProviderManager(provider, cache=storage_cache, invocation_cache=invocation_cache, compression=self.cfg['storage_compression'], compression_level=self.cfg['storage_compression_level'], max_concurrency=self.cfg['storage_max_concurrency'])
+
+  def __build_stock_data_pool(self) -> StockDataProviderPool:
+    # Recorded calls are matched by their symbols, so record, replay (and synthetic) runs skip the quote cache: what it serves would change which calls are made
+    quote_cache = None
+    if self.cfg['data_mode'] == 'live':
+      quote_cache = QuoteCache(self.cfg['quote_cache_ttl_seconds'], max_entries=self.cfg['quote_cache_max_entries'], cache_dir=self.cfg['quote_cache_dir'])
+
+    managers = {}
+    if self.cfg['data_mode'] == 'synthetic':
+      synthetic_manager = StockDataProviderManager(StockDataProviders.SYNTHETIC, **self.cfg['synthetic_market'])
+      return StockDataProviderPool({StockDataProviders.SYNTHETIC: synthetic_manager}, self.cfg['stock_data_rate_limits'], hedging=self.cfg['stock_data_hedging'])
+
+    sources = (StockDataProviders.YAHOO_FINANCE, StockDataProviders.YAHOO_QUERY)
+    if self.cfg['data_mode'] != 'live':
+      # Which provider serves a call depends on quota and timing; with a single one, a replay makes exactly the calls that were recorded
+      sources = (StockDataProviders(self.cfg['recorded_stock_data_provider']),)
+
+    for source in sources:
+      if self.cfg['data_mode'] == 'record':
+        managers[source] = StockDataProviderManager(StockDataProviders.RECORDING, source=source, recordings_dir=self.cfg['recordings_dir'], pool_size=self.cfg['stock_data_http_pool_size'])
+      elif self.cfg['data_mode'] == 'replay':
+        managers[source] = StockDataProviderManager(StockDataProviders.REPLAY, source=source, recordings_dir=self.cfg['recordings_dir'], latency_seconds=self.cfg['replay_latency_seconds'])
+      else:
+        managers[source] = StockDataProviderManager(source, quote_cache=quote_cache, pool_size=self.cfg['stock_data_http_pool_size'])
+
+    return StockDataProviderPool(managers, self.cfg['stock_data_rate_limits'], hedging=self.cfg['stock_data_hedging'])
+
+  def __build_screener_manager(self) -> ScreenerProviderManager:
+    source = ScreenerProviders.YAHOO_QUERY
+    if self.cfg['data_mode'] == 'record':
+      return ScreenerProviderManager(ScreenerProviders.RECORDING, cache_ttl_seconds=self.cfg['screener_cache_ttl_seconds'], source=source, recordings_dir=self.cfg['recordings_dir'])
+    elif self.cfg['data_mode'] == 'replay':
+      return ScreenerProviderManager(ScreenerProviders.REPLAY, cache_ttl_seconds=self.cfg['screener_cache_ttl_seconds'], source=source, recordings_dir=self.cfg['recordings_dir'], latency_seconds=self.cfg['replay_latency_seconds'])
+    elif self.cfg['data_mode'] == 'synthetic':
+      return ScreenerProviderManager(ScreenerProviders.SYNTHETIC, cache_ttl_seconds=self.cfg['screener_cache_ttl_seconds'], **self.cfg['synthetic_market'])
+    return ScreenerProviderManager(source, cache_ttl_seconds=self.cfg['screener_cache_ttl_seconds'])
+
+  #endregion
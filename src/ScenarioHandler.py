@@ -13,6 +13,7 @@ class ScenarioHandler:
     self.valid_scenario_keys = [
       "upsert_stocks_list", # TODO run it on the first saturday of every month
       "upsert_historical_data", # TODO run it on the first sunday of every month
+      "migrate_historical_data_to_parquet", # One-shot: every other scenario already reads the Parquet object, so run it right after deploying, before any scheduled scenario (see README)
       # TODO create a scenario in which I can check/validate historical data, maybe run it on the second and fourth sunday of every month
       "update_last_closing_price", # Runs on weekdays at 6:30pm
       "analyze_pre_market_prices", # Runs on weekdays at 6:24am
@@ -30,6 +31,8 @@ class ScenarioHandler:
       self.list_manager.upsert()
     elif self.scenario == "upsert_historical_data":
       self.hist_data_manager.upsert()
+    elif self.scenario == "migrate_historical_data_to_parquet":
+      self.hist_data_manager.migrate_to_parquet()
     elif self.scenario == "update_last_closing_price":
       self.stocks_manager.update_last_closing_price()
     elif self.scenario == "analyze_pre_market_prices":
@@ -0,0 +1,24 @@
+from ScreenerProviders import ScreenerProviders
+from ScreenerProviderInterface import ScreenerProvider as iScreenerProvider
+from ScreenerRecordingProvider import ScreenerRecordingProvider
+from ScreenerReplayProvider import ScreenerReplayProvider
+from ScreenerSyntheticProvider import ScreenerSyntheticProvider
+from ScreenerYahooQueryProvider import ScreenerYahooQueryProvider
+
+class ScreenerFactory:
+  """Factory class to create screener providers"""
+
+  @staticmethod
+  def create_provider(provider: ScreenerProviders, **kwargs) -> iScreenerProvider:
+    if provider == ScreenerProviders.YAHOO_QUERY:
+      return ScreenerYahooQueryProvider(**kwargs)
+    elif provider == ScreenerProviders.RECORDING:
+      # kwargs: source (the real provider to record), recordings_dir, plus the source provider's own arguments
+      source, recordings_dir = kwargs.pop('source'), kwargs.pop('recordings_dir')
+      return ScreenerRecordingProvider(ScreenerFactory.create_provider(source, **kwargs), source, recordings_dir)
+    elif provider == ScreenerProviders.REPLAY:
+      return ScreenerReplayProvider(**kwargs)
+    elif provider == ScreenerProviders.SYNTHETIC:
+      return ScreenerSyntheticProvider(**kwargs)
+    else:
+      raise ValueError(f"Unsupported screener provider: {provider}")
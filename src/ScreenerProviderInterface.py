@@ -0,0 +1,9 @@
+from abc import ABC, abstractmethod
+
+class ScreenerProvider(ABC):
+    """Abstract base class for screener providers"""
+
+    @abstractmethod
+    def get_screeners(self, screener_names: list[str], count: int) -> dict[str, list[dict]]:
+        """Quotes of every screener, keyed by screener name; a screener that returned no records maps to an empty list"""
+        pass
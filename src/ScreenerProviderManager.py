@@ -0,0 +1,80 @@
+import time
+
+from ScreenerFactory import ScreenerFactory
+from ScreenerProviders import ScreenerProviders
+
+# Module-level so warm Lambda invocations reuse fresh results too: (provider, screener name, count) -> (fetched at, quotes)
+_SCREENER_CACHE = {}
+
+class ScreenerProviderManager:
+  """Main class that uses the factory and provides a unified interface"""
+
+  def __init__(self, provider: ScreenerProviders, cache_ttl_seconds: float = 0, **provider_kwargs):
+    self.provider_type = provider
+    self.provider = ScreenerFactory.create_provider(provider, **provider_kwargs)
+    # Screener results are reused for this long; 0 disables the cache
+    self.cache_ttl_seconds = cache_ttl_seconds
+
+  def get_screeners(self, screener_names: list[str], count: int) -> dict[str, list[dict]]:
+    try:
+      screeners, missing_names = {}, []
+      now = time.monotonic()
+      for screener_name in screener_names:
+        cached = _SCREENER_CACHE.get((self.provider_type, screener_name, count))
+        if cached is not None and now - cached[0] < self.cache_ttl_seconds:
+          screeners[screener_name] = cached[1]
+        else:
+          missing_names.append(screener_name)
+
+      if missing_names:
+        # Everything not cached goes out in a single (parallel) round
+        fetched = self.provider.get_screeners(missing_names, count)
+        fetched_at = time.monotonic()
+        for screener_name, quotes in fetched.items():
+          # Empty results are usually transient errors, so they are retried next time instead of cached
+          if quotes:
+            _SCREENER_CACHE[(self.provider_type, screener_name, count)] = (fetched_at, quotes)
+        screeners.update(fetched)
+
+      return {screener_name: screeners.get(screener_name, []) for screener_name in screener_names}
+    except Exception as e:
+      raise e
+
+  def get_screened_stocks(self, screener_names: list[str], count: int, min_market_cap: float = None, fields: list[str] = None) -> dict[str, dict]:
+    """
+    Quotes of every screener merged into symbol -> quote; when a symbol is in several screeners, the first one wins.
+    Quotes without a symbol or a marketCap, or below `min_market_cap`, are left out. `fields` masks each quote down to those keys
+    (missing ones stay missing); 'symbol' and 'screener' (the screener it came from) are always kept.
+    """
+    try:
+      stocks = {}
+      no_symbol_count, no_market_cap_symbols, below_threshold_count = 0, [], 0
+      for screener_name, quotes in self.get_screeners(screener_names, count).items():
+        for quote in quotes:
+          if 'symbol' not in quote:
+            no_symbol_count += 1
+            continue
+
+          if 'marketCap' not in quote:
+            no_market_cap_symbols.append(quote['symbol'])
+            continue
+
+          if min_market_cap is not None and quote['marketCap'] < min_market_cap:
+            below_threshold_count += 1
+            continue
+
+          if quote['symbol'] in stocks:
+            continue  # Skip duplicates
+
+          stock = quote if fields is None else {field: quote[field] for field in fields if field in quote}
+          stocks[quote['symbol']] = {**stock, 'symbol': quote['symbol'], 'screener': screener_name}
+
+      if no_symbol_count:
+        print(f"\tSkipped {no_symbol_count} screener entries with no symbol")
+      print(f"\tThese {len(no_market_cap_symbols)} stocks had no market cap info (skipped): {no_market_cap_symbols}")
+      if min_market_cap is not None:
+        print(f"\tSkipped {below_threshold_count} screener entries below the market cap threshold ({min_market_cap})")
+
+      return stocks
+    except Exception as e:
+      raise e
@@ -0,0 +1,9 @@
+from enum import Enum
+
+class ScreenerProviders(Enum):
+  YAHOO_QUERY = "yahooquery"
+  # Offline benchmarking: RECORDING wraps a real provider ('source') and saves its responses, REPLAY serves them back
+  RECORDING = "recording"
+  REPLAY = "replay"
+  # Scale tests: seeded random-walk market of any size (see SyntheticMarket)
+  SYNTHETIC = "synthetic"
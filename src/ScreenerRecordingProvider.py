@@ -0,0 +1,17 @@
+from RecordingStore import RecordingStore
+from ScreenerProviderInterface import ScreenerProvider as iScreenerProvider
+from ScreenerProviders import ScreenerProviders
+
+class ScreenerRecordingProvider(iScreenerProvider):
+  """Wraps a real screener provider and records every screener it returns (see ScreenerReplayProvider to serve them back offline)"""
+
+  def __init__(self, source_provider: iScreenerProvider, source: ScreenerProviders, recordings_dir: str):
+    self.source_provider = source_provider
+    self.store = RecordingStore(recordings_dir, f"screener-{source.value}")
+
+  def get_screeners(self, screener_names: list[str], count: int) -> dict[str, list[dict]]:
+    screeners = self.source_provider.get_screeners(screener_names, count)
+    # One recording per screener, so a replay does not depend on which screeners were already cached when the call was made
+    for screener_name, quotes in screeners.items():
+      self.store.save('get_screener', {'screener_name': screener_name, 'count': count}, quotes)
+    return screeners
@@ -0,0 +1,24 @@
+import time
+
+from RecordingStore import RecordingStore
+from ScreenerProviderInterface import ScreenerProvider as iScreenerProvider
+from ScreenerProviders import ScreenerProviders
+
+class ScreenerReplayProvider(iScreenerProvider):
+  """Serves the screeners recorded by ScreenerRecordingProvider, offline, after `latency_seconds` of simulated network time per call"""
+
+  def __init__(self, source: ScreenerProviders, recordings_dir: str, latency_seconds: float = 0.0):
+    if latency_seconds < 0:
+      raise ValueError("The 'latency_seconds' of a replay provider cannot be negative.")
+
+    self.store = RecordingStore(recordings_dir, f"screener-{source.value}")
+    self.latency_seconds = latency_seconds
+
+  def get_screeners(self, screener_names: list[str], count: int) -> dict[str, list[dict]]:
+    if not screener_names:
+      return {}
+
+    # The live provider fetches all the screeners of a call in one parallel round, so a call costs one latency
+    if self.latency_seconds:
+      time.sleep(self.latency_seconds)
+    return {screener_name: self.store.load('get_screener', {'screener_name': screener_name, 'count': count}) for screener_name in screener_names}
@@ -0,0 +1,11 @@
+from ScreenerProviderInterface import ScreenerProvider as iScreenerProvider
+from SyntheticMarket import SyntheticMarket
+
+class ScreenerSyntheticProvider(iScreenerProvider):
+  """Screeners over the same seeded SyntheticMarket as StockDataSyntheticProvider (given the same arguments)"""
+
+  def __init__(self, **market_params):
+    self.market = SyntheticMarket.get(**market_params)
+
+  def get_screeners(self, screener_names: list[str], count: int) -> dict[str, list[dict]]:
+    return {screener_name: self.market.screener(screener_name, count) for screener_name in screener_names}
@@ -0,0 +1,30 @@
+from yahooquery import Screener
+
+from ScreenerProviderInterface import ScreenerProvider as iScreenerProvider
+
+class ScreenerYahooQueryProvider(iScreenerProvider):
+  def __init__(self, max_workers: int = 8):
+    self.max_workers = max_workers
+    # One asynchronous Screener (one HTTP session) for the provider's lifetime; all requested screeners are fetched in parallel over it.
+    # Created on first use, since setting it up already talks to Yahoo and most scenarios never need it
+    self.screener = None
+
+  def get_screeners(self, screener_names: list[str], count: int) -> dict[str, list[dict]]:
+    if not screener_names:
+      return {}
+
+    if self.screener is None:
+      self.screener = Screener(asynchronous=True, max_workers=self.max_workers)
+
+    result = self.screener.get_screeners(list(screener_names), count=count)
+    screeners = {}
+    for screener_name in screener_names:
+      data = result.get(screener_name)
+      # yahooquery reports errors (e.g. 'No screener records found. Check if scrIds and marketRegion combination are correct') as strings
+      if not isinstance(data, dict) or 'quotes' not in data:
+        print(f"\tScreener {screener_name} returned no records: {data}")
+        screeners[screener_name] = []
+      else:
+        screeners[screener_name] = data['quotes']
+
+    return screeners
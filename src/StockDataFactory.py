@@ -1,5 +1,8 @@
 from StockDataProviders import StockDataProviders
 from StockDataProviderInterface import StockDataProvider as iStockDataProvider
+from StockDataRecordingProvider import StockDataRecordingProvider
+from StockDataReplayProvider import StockDataReplayProvider
+from StockDataSyntheticProvider import StockDataSyntheticProvider
 from StockDataYahooFinanceProvider import StockDataYahooFinanceProvider
 from StockDataYahooQueryProvider import StockDataYahooQueryProvider
 
@@ -7,10 +10,18 @@ class StockDataFactory:
   """Factory class to create stock data providers"""
   
   @staticmethod
-  def create_provider(api_type: StockDataProviders) -> iStockDataProvider:
+  def create_provider(api_type: StockDataProviders, **kwargs) -> iStockDataProvider:
     if api_type == StockDataProviders.YAHOO_FINANCE:
-      return StockDataYahooFinanceProvider()
+      return StockDataYahooFinanceProvider(**kwargs)
     elif api_type == StockDataProviders.YAHOO_QUERY:
-      return StockDataYahooQueryProvider()
+      return StockDataYahooQueryProvider(**kwargs)
+    elif api_type == StockDataProviders.RECORDING:
+      # kwargs: source (the real provider to record), recordings_dir, plus the source provider's own arguments
+      source, recordings_dir = kwargs.pop('source'), kwargs.pop('recordings_dir')
+      return StockDataRecordingProvider(StockDataFactory.create_provider(source, **kwargs), source, recordings_dir)
+    elif api_type == StockDataProviders.REPLAY:
+      return StockDataReplayProvider(**kwargs)
+    elif api_type == StockDataProviders.SYNTHETIC:
+      return StockDataSyntheticProvider(**kwargs)
     else:
       raise ValueError(f"Unsupported API type: {api_type}")
\ No newline at end of file
@@ -3,6 +3,10 @@ import pandas as pd
 
 class StockDataProvider(ABC):
     """Abstract base class for stock data providers"""
+
+    # Request limits of the provider's multi-symbol calls (get_stocks_info, get_current_prices); StockDataProviderManager chunks and dispatches by them
+    max_symbols_per_request: int = 20
+    max_concurrent_requests: int = 1
     
     @abstractmethod
     def get_historical_data(self, symbols: list, period: str = None, start: str = None, end: str = None) -> pd.DataFrame:
@@ -1,12 +1,19 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
 from StockDataProviders import StockDataProviders
 import pandas as pd
+from QuoteCache import QuoteCache
 from StockDataFactory import StockDataFactory
 
 class StockDataProviderManager:
   """Main class that uses the factory and provides a unified interface"""
   
-  def __init__(self, provider: StockDataProviders):
-    self.provider = StockDataFactory.create_provider(provider)
+  def __init__(self, provider: StockDataProviders, quote_cache: QuoteCache = None, **provider_kwargs):
+    self.provider_type = provider
+    self.provider = StockDataFactory.create_provider(provider, **provider_kwargs)
+    # Recently fetched prices/infos, shared by every manager (and scenario) holding the same cache
+    self.quote_cache = quote_cache
 
   def get_historical_data(self, symbols: list, period: str = None, start: str = None, end: str = None, **kwargs) -> pd.DataFrame:
     try:
@@ -14,20 +21,64 @@ class StockDataProviderManager:
     except Exception as e:
       raise e
   
-  def get_current_prices(self, symbols: list) -> dict:  
+  def get_current_prices(self, symbols: list, before_request: Callable[[], None] = None) -> dict:
     try:
-      return self.provider.get_current_prices(symbols)
+      return self.__get_through_cache('price', self.provider.get_current_prices, symbols, before_request)
     except Exception as e:
       raise e
     
-  def get_stock_info(self, symbol: str) -> dict:
+  def get_stock_info(self, symbol: str, before_request: Callable[[], None] = None) -> dict:
     try:
-      return self.provider.get_stock_info(symbol)
+      # Same field set as get_stocks_info, so either call serves the other's cached entries
+      return self.__get_through_cache('info', self.provider.get_stocks_info, [symbol], before_request).get(symbol, {})
     except Exception as e:
       raise e
     
-  def get_stocks_info(self, symbols: list) -> dict:
+  def get_stocks_info(self, symbols: list, before_request: Callable[[], None] = None) -> dict:
     try:
-      return self.provider.get_stocks_info(symbols)
+      return self.__get_through_cache('info', self.provider.get_stocks_info, symbols, before_request)
     except Exception as e:
-      raise e
\ No newline at end of file
+      raise e
+
+  def chunk_symbols(self, symbols: list) -> list[list]:
+    """Split `symbols` (deduplicated, order kept) into chunks of at most the provider's `max_symbols_per_request`"""
+    unique_symbols = list(dict.fromkeys(symbols))
+    size = self.provider.max_symbols_per_request
+    return [unique_symbols[i:i + size] for i in range(0, len(unique_symbols), size)]
+
+  def __get_through_cache(self, field_set: str, fetch: Callable[[list], dict], symbols: list, before_request: Callable[[], None] = None) -> dict:
+    """Serve what the quote cache has, fetch only the rest, and cache the lookups that succeeded (missing values are retried next time)"""
+    if self.quote_cache is None:
+      return self.__dispatch_chunks(fetch, symbols, before_request)
+
+    cached = self.quote_cache.get_many(self.provider_type.value, field_set, symbols)
+    missing_symbols = [symbol for symbol in symbols if symbol not in cached]
+    if not missing_symbols:
+      return cached
+
+    fetched = self.__dispatch_chunks(fetch, missing_symbols, before_request)
+    # yahooquery reports unknown symbols as strings and failures come back as {} or None; none of those are worth caching
+    valid = {symbol: value for symbol, value in fetched.items() if value is not None and value != {} and not isinstance(value, str)}
+    self.quote_cache.put_many(self.provider_type.value, field_set, valid)
+    return {**cached, **fetched}
+
+  def __dispatch_chunks(self, fetch: Callable[[list], dict], symbols: list, before_request: Callable[[], None] = None) -> dict:
+    """
+    Fetch the chunks with up to the provider's `max_concurrent_requests` in flight and merge their symbol -> value dicts.
+    `before_request` runs right before each chunk's request (the provider pool uses it to charge one token per chunk).
+    """
+    def fetch_chunk(chunk: list) -> dict:
+      if before_request is not None:
+        before_request()
+      return fetch(chunk)
+
+    chunks = self.chunk_symbols(symbols)
+    if len(chunks) <= 1:
+      return fetch_chunk(chunks[0]) if chunks else {}
+
+    merged = {}
+    with ThreadPoolExecutor(max_workers=min(self.provider.max_concurrent_requests, len(chunks))) as executor:
+      for result in executor.map(fetch_chunk, chunks):
+        merged.update(result)
+
+    return merged
\ No newline at end of file
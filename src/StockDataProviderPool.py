@@ -0,0 +1,176 @@
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait as wait_futures
+import threading
+import time
+
+import pandas as pd
+
+from LatencyHistogram import LatencyHistogram
+from StockDataProviderManager import StockDataProviderManager
+from StockDataProviders import StockDataProviders
+from TokenBucket import TokenBucket
+
+# Module-level so every pool built in a process (one per scenario, and per warm Lambda invocation) shares its threads: max workers -> executor
+_HEDGE_EXECUTORS = {}
+_LOCK = threading.Lock()
+
+class StockDataProviderPool:
+  """
+  Dispatches every request to whichever stock data provider has quota left, according to one token bucket per provider.
+  Same interface as StockDataProviderManager; `providers` restricts a call to some of the pooled providers.
+
+  Historical data requests are hedged when `hedging` is given ({'percentile': 95, 'min_samples': 5, 'max_workers': 8}): a batch that fails,
+  comes back empty, or runs past its provider's latency percentile is sent to another provider too, and the first valid result wins.
+  """
+
+  def __init__(self, managers: dict[StockDataProviders, StockDataProviderManager], rate_limits: dict, hedging: dict = None):
+    if not managers:
+      raise ValueError("The provider pool needs at least one stock data provider manager.")
+
+    self.managers = managers
+    self.buckets = {}
+    for provider in managers:
+      if provider.value not in rate_limits:
+        raise ValueError(f"No rate limit configured for stock data provider '{provider.value}'.")
+      limits = rate_limits[provider.value]
+      self.buckets[provider] = TokenBucket(limits['requests_per_minute'] / 60, limits.get('burst', 1))
+
+    self.lock = threading.Lock()
+
+    self.hedging = hedging
+    self.latencies = {provider: LatencyHistogram() for provider in managers}
+    # Hedged calls outlive the request that gave up on them, so they run on a shared executor rather than on the caller's thread
+    self.executor = _hedge_executor(hedging.get('max_workers', 8)) if hedging is not None else None
+
+  def acquire(self, cost: float = 1, providers: list[StockDataProviders] = None) -> StockDataProviders:
+    """Block until one of `providers` (all of them by default) has `cost` tokens, take them, and return that provider"""
+    candidates = providers or list(self.managers)
+    unknown = [provider for provider in candidates if provider not in self.managers]
+    if unknown:
+      raise ValueError(f"Stock data providers not in the pool: {unknown}")
+
+    while True:
+      with self.lock:
+        # Most spare capacity first, so the load spreads across the providers instead of draining one of them
+        waits = []
+        for provider in sorted(candidates, key=lambda p: self.buckets[p].available(), reverse=True):
+          wait = self.buckets[provider].try_acquire(cost)
+          if wait == 0:
+            return provider
+          waits.append(wait)
+
+      wait = min(waits)
+      print(f"Waiting {wait:.1f} seconds for stock data provider quota")
+      time.sleep(wait)
+
+  def get_historical_data(self, symbols: list, period: str = None, start: str = None, end: str = None, providers: list[StockDataProviders] = None, **kwargs) -> pd.DataFrame:
+    provider = self.acquire(providers=providers)
+    if self.hedging is None:
+      return self.__timed_historical_data(provider, symbols, period=period, start=start, end=end, **kwargs)
+
+    candidates = providers or list(self.managers)
+    fallbacks = [candidate for candidate in candidates if candidate != provider]
+    def fetch(on_provider: StockDataProviders):
+      return self.executor.submit(self.__timed_historical_data, on_provider, symbols, period=period, start=start, end=end, **kwargs)
+    in_flight = {fetch(provider): provider}
+    first_error, empty_df = None, None
+
+    while in_flight:
+      # Only a lone request on a provider with enough history gets a latency deadline; otherwise it is only hedged when it fails
+      deadline = self.__hedge_threshold(provider) if fallbacks and len(in_flight) == 1 else None
+      done, _ = wait_futures(in_flight, timeout=deadline, return_when=FIRST_COMPLETED)
+
+      if not done:
+        # Too slow: hedge only with quota that is available right now, waiting for quota would defeat the purpose
+        hedge = self.__try_acquire(fallbacks)
+        if hedge is not None:
+          print(f"{provider.value} passed its p{self.hedging.get('percentile', 95)} latency ({deadline:.1f}s), hedging {len(symbols)} symbols on {hedge.value}")
+          fallbacks.remove(hedge)
+          in_flight[fetch(hedge)] = hedge
+        done, _ = wait_futures(in_flight, return_when=FIRST_COMPLETED)
+
+      for future in done:
+        finished = in_flight.pop(future)
+        try:
+          df = future.result()
+        except Exception as e:
+          first_error = first_error or e
+          print(f"Historical data request on {finished.value} failed: {repr(e)}")
+          continue
+        if df is None:
+          print(f"Historical data request on {finished.value} returned nothing")
+        elif not df.empty:
+          return df
+        else:
+          empty_df = df
+
+      # Nothing valid yet; fail over to the next provider unless another request is still in flight
+      if not in_flight and fallbacks:
+        provider = self.acquire(providers=[fallbacks.pop(0)])
+        print(f"Failing over {len(symbols)} symbols to {provider.value}")
+        in_flight[fetch(provider)] = provider
+
+    # Every provider answered without data (e.g. a range with no trading days): that is the answer, not an error to retry
+    if empty_df is not None:
+      return empty_df
+    if first_error is not None:
+      raise first_error
+    raise ValueError(f"No stock data provider returned historical data for the {len(symbols)} symbols starting with {symbols[0]}.")
+
+  def get_current_prices(self, symbols: list, providers: list[StockDataProviders] = None) -> dict:
+    provider = self.__pick(symbols, providers)
+    # The manager splits the symbols into chunks of one HTTP request each (see max_symbols_per_request); each chunk costs one token
+    return self.managers[provider].get_current_prices(symbols, before_request=lambda: self.acquire(providers=[provider]))
+
+  def get_stock_info(self, symbol: str, providers: list[StockDataProviders] = None) -> dict:
+    provider = self.__pick([symbol], providers)
+    return self.managers[provider].get_stock_info(symbol, before_request=lambda: self.acquire(providers=[provider]))
+
+  def get_stocks_info(self, symbols: list, providers: list[StockDataProviders] = None) -> dict:
+    provider = self.__pick(symbols, providers)
+    # The manager splits the symbols into chunks of one HTTP request each (see max_symbols_per_request); each chunk costs one token
+    return self.managers[provider].get_stocks_info(symbols, before_request=lambda: self.acquire(providers=[provider]))
+
+  #region Private methods
+  def __timed_historical_data(self, provider: StockDataProviders, symbols: list, **kwargs) -> pd.DataFrame:
+    started = time.monotonic()
+    df = self.managers[provider].get_historical_data(symbols, **kwargs)
+    # Failures are left out so fast errors do not pull the percentiles (and the hedging threshold) down
+    self.latencies[provider].record(time.monotonic() - started)
+    return df
+
+  def __hedge_threshold(self, provider: StockDataProviders) -> float | None:
+    if self.latencies[provider].count < self.hedging.get('min_samples', 5):
+      return None
+    return self.latencies[provider].percentile(self.hedging.get('percentile', 95))
+
+  def __try_acquire(self, providers: list[StockDataProviders]) -> StockDataProviders | None:
+    """Take one token from the first of `providers` that has one, without waiting"""
+    with self.lock:
+      for provider in providers:
+        if self.buckets[provider].try_acquire() == 0:
+          return provider
+    return None
+
+  def __pick(self, symbols: list, providers: list[StockDataProviders] = None) -> StockDataProviders:
+    """The provider that can serve all of `symbols` soonest, without taking any of its quota"""
+    candidates = providers or list(self.managers)
+    unknown = [provider for provider in candidates if provider not in self.managers]
+    if unknown:
+      raise ValueError(f"Stock data providers not in the pool: {unknown}")
+
+    def score(provider: StockDataProviders) -> tuple:
+      # One token per chunk: 500 symbols cost 500 tokens on a provider that takes one symbol per request but 4 on one that takes 150
+      cost = len(self.managers[provider].chunk_symbols(symbols))
+      bucket = self.buckets[provider]
+      # Then the fewest requests, then the most spare quota so the load spreads across the providers
+      return (bucket.seconds_until(cost), cost, -bucket.available())
+
+    return min(candidates, key=score)
+
+  #endregion
+
+def _hedge_executor(max_workers: int) -> ThreadPoolExecutor:
+  with _LOCK:
+    if max_workers not in _HEDGE_EXECUTORS:
+      _HEDGE_EXECUTORS[max_workers] = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='stock-data-hedge')
+    return _HEDGE_EXECUTORS[max_workers]
@@ -2,4 +2,9 @@ from enum import Enum
 
 class StockDataProviders(Enum):
   YAHOO_FINANCE = "yfinance"
-  YAHOO_QUERY = "yahooquery"
\ No newline at end of file
+  YAHOO_QUERY = "yahooquery"
+  # Offline benchmarking: RECORDING wraps a real provider ('source') and saves its responses, REPLAY serves them back
+  RECORDING = "recording"
+  REPLAY = "replay"
+  # Scale tests: seeded random-walk market of any size (see SyntheticMarket)
+  SYNTHETIC = "synthetic"
\ No newline at end of file
@@ -0,0 +1,41 @@
+import pandas as pd
+
+from RecordingStore import RecordingStore
+from StockDataProviderInterface import StockDataProvider as iStockDataProvider
+from StockDataProviders import StockDataProviders
+
+class StockDataRecordingProvider(iStockDataProvider):
+  """Wraps a real provider and records every response it returns (see StockDataReplayProvider to serve them back offline)"""
+
+  def __init__(self, source_provider: iStockDataProvider, source: StockDataProviders, recordings_dir: str):
+    self.source_provider = source_provider
+    self.store = RecordingStore(recordings_dir, source.value)
+    # Same chunking as the wrapped provider, so the recorded calls are the ones a live run makes
+    self.max_symbols_per_request = source_provider.max_symbols_per_request
+    self.max_concurrent_requests = source_provider.max_concurrent_requests
+    self.store.save_manifest({
+      'source': source.value,
+      'max_symbols_per_request': self.max_symbols_per_request,
+      'max_concurrent_requests': self.max_concurrent_requests,
+    })
+
+  def get_historical_data(self, symbols: list, period: str = None, start: str = None, end: str = None) -> pd.DataFrame:
+    params = {'symbols': list(symbols), 'period': period, 'start': start, 'end': end}
+    return self.__record('get_historical_data', params, self.source_provider.get_historical_data(symbols, period=period, start=start, end=end))
+
+  def get_current_prices(self, symbols: list) -> dict:
+    return self.__record('get_current_prices', {'symbols': list(symbols)}, self.source_provider.get_current_prices(symbols))
+
+  def get_stock_info(self, symbol: str) -> dict:
+    return self.__record('get_stock_info', {'symbol': symbol}, self.source_provider.get_stock_info(symbol))
+
+  def get_stocks_info(self, symbols: list) -> dict:
+    return self.__record('get_stocks_info', {'symbols': list(symbols)}, self.source_provider.get_stocks_info(symbols))
+
+  #region Private methods
+  def __record(self, method: str, params: dict, response):
+    # Errors are not recorded: a replay of a failed call fails with a missing recording instead
+    self.store.save(method, params, response)
+    return response
+
+  #endregion
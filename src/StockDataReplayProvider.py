@@ -0,0 +1,41 @@
+import time
+
+import pandas as pd
+
+from RecordingStore import RecordingStore
+from StockDataProviderInterface import StockDataProvider as iStockDataProvider
+from StockDataProviders import StockDataProviders
+
+class StockDataReplayProvider(iStockDataProvider):
+  """Serves the responses recorded by StockDataRecordingProvider, offline, after `latency_seconds` of simulated network time per call"""
+
+  def __init__(self, source: StockDataProviders, recordings_dir: str, latency_seconds: float = 0.0):
+    if latency_seconds < 0:
+      raise ValueError("The 'latency_seconds' of a replay provider cannot be negative.")
+
+    self.store = RecordingStore(recordings_dir, source.value)
+    self.latency_seconds = latency_seconds
+    # Chunk exactly like the recorded provider did, otherwise the calls would not match the recordings
+    manifest = self.store.load_manifest()
+    self.max_symbols_per_request = manifest.get('max_symbols_per_request', self.max_symbols_per_request)
+    self.max_concurrent_requests = manifest.get('max_concurrent_requests', self.max_concurrent_requests)
+
+  def get_historical_data(self, symbols: list, period: str = None, start: str = None, end: str = None) -> pd.DataFrame:
+    return self.__replay('get_historical_data', {'symbols': list(symbols), 'period': period, 'start': start, 'end': end})
+
+  def get_current_prices(self, symbols: list) -> dict:
+    return self.__replay('get_current_prices', {'symbols': list(symbols)})
+
+  def get_stock_info(self, symbol: str) -> dict:
+    return self.__replay('get_stock_info', {'symbol': symbol})
+
+  def get_stocks_info(self, symbols: list) -> dict:
+    return self.__replay('get_stocks_info', {'symbols': list(symbols)})
+
+  #region Private methods
+  def __replay(self, method: str, params: dict):
+    if self.latency_seconds:
+      time.sleep(self.latency_seconds)
+    return self.store.load(method, params)
+
+  #endregion
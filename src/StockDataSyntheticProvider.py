@@ -0,0 +1,26 @@
+import pandas as pd
+
+from StockDataProviderInterface import StockDataProvider as iStockDataProvider
+from SyntheticMarket import SyntheticMarket
+
+class StockDataSyntheticProvider(iStockDataProvider):
+  """Prices and quotes of a seeded SyntheticMarket (see its arguments), for scale tests without any network"""
+
+  # Large chunks and many of them in flight: the point is to load the code around the provider, not the provider
+  max_symbols_per_request = 500
+  max_concurrent_requests = 8
+
+  def __init__(self, **market_params):
+    self.market = SyntheticMarket.get(**market_params)
+
+  def get_historical_data(self, symbols: list, period: str = None, start: str = None, end: str = None) -> pd.DataFrame:
+    return self.market.history(symbols, period=period, start=start, end=end)
+
+  def get_current_prices(self, symbols: list) -> dict:
+    return {symbol: self.market.quote(symbol).get('regularMarketPrice') for symbol in symbols}
+
+  def get_stock_info(self, symbol: str) -> dict:
+    return self.market.quote(symbol)
+
+  def get_stocks_info(self, symbols: list) -> dict:
+    return {symbol: self.market.quote(symbol) for symbol in symbols}
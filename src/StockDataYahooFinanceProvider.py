@@ -1,13 +1,30 @@
+import threading
+
 import pandas as pd
+import HttpSessions
 from StockDataProviderInterface import StockDataProvider as iStockDataProvider
 import yfinance as yf
 
+# yf.download collects its results in module-level state, so two downloads running at once would mix each other's symbols
+_DOWNLOAD_LOCK = threading.Lock()
+
 class StockDataYahooFinanceProvider(iStockDataProvider):
+  # yf.Tickers fetches .info with one HTTP request per symbol, so a chunk holds a single symbol: the pool charges one token per chunk
+  # and that token has to stand for one real request, or the configured requests_per_minute would be exceeded by the chunk size
+  max_symbols_per_request = 1
+  max_concurrent_requests = 4
+
+  def __init__(self, pool_size: int = 8):
+    # Download threads per yf.download call, all on the shared session
+    self.pool_size = pool_size
+
   def get_historical_data(self, symbols: list, period: str = None, start: str = None, end: str = None) -> pd.DataFrame:
     if period:
-      data = yf.download(symbols, period=period, group_by='ticker')
+      with _DOWNLOAD_LOCK:
+        data = yf.download(symbols, period=period, group_by='ticker', threads=self.pool_size, session=HttpSessions.yfinance_session())
     elif start and end:
-      data = yf.download(symbols, start=start, end=end, group_by='ticker')
+      with _DOWNLOAD_LOCK:
+        data = yf.download(symbols, start=start, end=end, group_by='ticker', threads=self.pool_size, session=HttpSessions.yfinance_session())
     else:
       raise ValueError("Either 'period' or both 'start' and 'end' must be provided.")
     
@@ -15,7 +32,7 @@ class StockDataYahooFinanceProvider(iStockDataProvider):
     return self._format_historical_data(data, symbols)
   
   def get_current_prices(self, symbols: list) -> dict:
-    tickers = yf.Tickers(' '.join(symbols))
+    tickers = yf.Tickers(' '.join(symbols), session=HttpSessions.yfinance_session())
     prices = {}
     for symbol in symbols:
       try:
@@ -26,11 +43,11 @@ class StockDataYahooFinanceProvider(iStockDataProvider):
     return prices
   
   def get_stock_info(self, symbol: str) -> dict:
-    ticker = yf.Ticker(symbol)
+    ticker = yf.Ticker(symbol, session=HttpSessions.yfinance_session())
     return ticker.info
   
   def get_stocks_info(self, symbols: list) -> dict:
-    tickers = yf.Tickers(' '.join(symbols))
+    tickers = yf.Tickers(' '.join(symbols), session=HttpSessions.yfinance_session())
     info_dict = {}
     for symbol in symbols:
       try:
@@ -43,19 +60,11 @@ class StockDataYahooFinanceProvider(iStockDataProvider):
     return info_dict
   
   def _format_historical_data(self, h_data, symbols) -> pd.DataFrame:
-    # h_data is a multi-index DataFrame when multiple symbols are provided
-    # We will reformat it to have Date as index and each symbol's Close price as a column
-    df_list = []
-    for ticker in symbols:
-      df_ticker = h_data[ticker][['Close']].copy()
-      df_ticker.rename(columns={'Close': ticker}, inplace=True)
-      df_ticker.reset_index(inplace=True)
-      df_list.append(df_ticker)
-
-    # Now let's merge all dataframes in df_list on the Date column
-    df_merged = df_list[0]
-    for df in df_list[1:]:
-      df_merged = pd.merge(df_merged, df, on='Date', how='outer')
+    # h_data has (ticker, price field) MultiIndex columns (group_by='ticker') and one row per Date shared by every ticker
+    # One cross-section takes every ticker's Close at once (Date stays the index), then the columns are put in `symbols` order
+    df_merged = h_data.xs('Close', axis=1, level=1)[symbols]
+    df_merged.columns.name = None
+    df_merged = df_merged.reset_index()
 
     df_merged['Date'] = pd.to_datetime(df_merged['Date']).dt.strftime('%Y-%m-%d')
     # Change the column name 'Date' to 'date' to maintain consistency
@@ -1,42 +1,71 @@
-from datetime import datetime, timezone
+from contextlib import contextmanager
+import queue
+
 import pandas as pd
+import HttpSessions
 from StockDataProviderInterface import StockDataProvider as iStockDataProvider
 from yahooquery import Ticker
 
+# Idle Ticker objects on the shared session; each fetched its crumb once when it was created, so they are reused (across warm invocations too) instead of rebuilt per call
+_IDLE_TICKERS = queue.SimpleQueue()
+
 class StockDataYahooQueryProvider(iStockDataProvider):
+  # A single asynchronous Ticker starts failing above ~190 symbols
+  max_symbols_per_request = 150
+  max_concurrent_requests = 4
+
+  def __init__(self, pool_size: int = 8):
+    # Concurrent requests (and pooled connections) of the shared asynchronous session
+    self.pool_size = pool_size
+
   def get_historical_data(self, symbols: list, period: str = None, start: str = None, end: str = None) -> pd.DataFrame:
-    tickers = Ticker(symbols, asynchronous=True)
-    if period:
-      data = tickers.history(period=period)
-    elif start and end:
-      data = tickers.history(start=start, end=end)
-    else:
+    if not period and not (start and end):
       raise ValueError("Either 'period' or both 'start' and 'end' must be provided.")
+
+    with self.__borrow_ticker(symbols) as tickers:
+      if period:
+        data = tickers.history(period=period)
+      else:
+        data = tickers.history(start=start, end=end)
     
     # Format to your standard structure
     return self._format_historical_data(data)
     
   def get_current_prices(self, symbols: list) -> dict:
-    tickers = Ticker(symbols, asynchronous=True)
+    # One fetch for every symbol; if it fails, every symbol falls back to the missing value below
+    try:
+      with self.__borrow_ticker(symbols) as tickers:
+        price = tickers.price
+    except Exception as e:
+      print(f"Warning: Could not retrieve prices for {len(symbols)} symbols: {repr(e)}")
+      price = {}
+
     prices = {}
     for symbol in symbols:
       try:
-        price_data = tickers.price.get(symbol, {})
+        price_data = price.get(symbol, {})
         prices[symbol] = price_data.get('regularMarketPrice')
       except:
         prices[symbol] = None
     return prices
   
   def get_stock_info(self, symbol: str) -> dict:
-    ticker = Ticker(symbol)
-    return ticker.price.get(symbol, {})
+    with self.__borrow_ticker([symbol]) as ticker:
+      return ticker.price.get(symbol, {})
   
   def get_stocks_info(self, symbols: list) -> dict:
-    tickers = Ticker(symbols, asynchronous=True)
+    # One fetch for every symbol; if it fails, every symbol falls back to the missing value below
+    try:
+      with self.__borrow_ticker(symbols) as tickers:
+        price = tickers.price
+    except Exception as e:
+      print(f"Warning: Could not retrieve prices for {len(symbols)} symbols: {repr(e)}")
+      price = {}
+
     info_dict = {}
     for symbol in symbols:
       try:
-        info_dict[symbol] = tickers.price[symbol]
+        info_dict[symbol] = price[symbol]
       except:
         # Print warning
         print(f"Warning: Could not retrieve info for {symbol}")
@@ -45,16 +74,31 @@ class StockDataYahooQueryProvider(iStockDataProvider):
     return info_dict
   
   def _format_historical_data(self, data) -> pd.DataFrame:
-    # Your existing formatting logic
     df_formatted = data.reset_index()
-    df_formatted = df_formatted[['date', 'symbol', 'adjclose']]
+    # Rows without a date cannot be placed in the matrix (and factorize would give them the code -1, which take() maps to the last date)
+    df_formatted = df_formatted.loc[df_formatted['date'].notna(), ['date', 'symbol', 'adjclose']]
 
     # Yahoo Query API sometimes returns the 'date' column as a mix of datetime.date and datetime.datetime objects, let's alleviate that!
-    for idx, row in df_formatted.iterrows():
-      if isinstance(row['date'], datetime):
-        df_formatted.at[idx, 'date'] = row['date'].date()
+    # Both render as 'YYYY-MM-DD...' (a datetime in its own timezone), so the first 10 characters are the trading day.
+    # Only the distinct values (one per trading day, not one per symbol and day) are rendered, then mapped back through the factorize codes
+    codes, unique_dates = pd.factorize(df_formatted['date'])
+    df_formatted['date'] = pd.Index(unique_dates).astype(str).str[:10].take(codes)
 
+    # 'YYYY-MM-DD' strings sort chronologically, so the pivot's index comes out in date order
     df_formatted = df_formatted.pivot(index='date', columns='symbol', values='adjclose')
     df_formatted.reset_index(inplace=True)
-    df_formatted['date'] = pd.to_datetime(df_formatted['date']).dt.strftime('%Y-%m-%d')
-    return df_formatted
\ No newline at end of file
+    return df_formatted
+
+  @contextmanager
+  def __borrow_ticker(self, symbols: list):
+    """An idle Ticker pointed at `symbols` (a new one only when every existing one is in use), returned to the idle queue afterwards"""
+    try:
+      ticker = _IDLE_TICKERS.get_nowait()
+      ticker.symbols = symbols
+    except queue.Empty:
+      ticker = Ticker(symbols, session=HttpSessions.yahooquery_session(self.pool_size))
+
+    try:
+      yield ticker
+    finally:
+      _IDLE_TICKERS.put(ticker)
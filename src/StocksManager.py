@@ -1,21 +1,27 @@
 from datetime import date, timedelta, datetime, time
-import io
 import math
 import os
 import pytz
 import sys
 
-import boto3
-import botocore
 import pandas as pd
-from yahooquery import Screener, Ticker
 
 from Emailer import Emailer
+from HistDataStore import HistDataStore
+from ScreenerProviderManager import ScreenerProviderManager
+from StockDataProviderPool import StockDataProviderPool
+from StorageProviderManager import StorageProviderManager
+
+# Calendar days of history loaded up front: enough to always include the last trading day, even after a long weekend
+RECENT_HISTORY_DAYS = 14
 
 class StocksManager:
-  def __init__(self, s3_client: boto3.client, emailer: Emailer, cfg: dict):
-    self.s3_client = s3_client
+  def __init__(self, storage_manager: StorageProviderManager, hist_data_store: HistDataStore, emailer: Emailer, stock_data_pool: StockDataProviderPool, screener_manager: ScreenerProviderManager, cfg: dict):
+    self.s3_mgr = storage_manager
+    self.hd_store = hist_data_store
     self.emailer = emailer
+    self.data_pool = stock_data_pool
+    self.screener_mgr = screener_manager
     # TODO once config is defined, validate it here and create class attributes
     self.cfg = cfg
 
@@ -38,28 +44,6 @@ class StocksManager:
     self.infos.append(msg)
 
   #region Checks
-  def __check_s3_object_exists(self, bucket_name, key):
-    """
-    Checks if an object exists in an S3 bucket.
-
-    Args:
-        bucket_name (str): The name of the S3 bucket.
-        key (str): The key (path) of the object in the S3 bucket.
-
-    Returns:
-        bool: True if the object exists, False otherwise.
-    """
-    try:
-        self.s3_client.head_object(Bucket=bucket_name, Key=key)
-        return True
-    except botocore.exceptions.ClientError as e:
-        if e.response['Error']['Code'] == "404":
-            return False
-        else:
-            # Handle other potential errors (e.g., permissions)
-            print(f"An error occurred: {e}")
-            raise e
-        
   def __check_closing_prices_are_equal(self, closing_prices_sum: float) -> None:
     stocks_in_hd = self.__hdata.columns[self.__hdata.columns != 'date'].tolist()
     last_row = self.__hdata.iloc[-1]
@@ -99,52 +83,35 @@ class StocksManager:
     
     return last_closing_prices, closing_prices_sum
 
-  def __get_hist_data_from_s3(self, obj_key: str) -> None:
-    response = self.s3_client.get_object(Bucket=self.cfg['s3_bucket'], Key=obj_key)
-    body = response['Body'].read().decode('utf-8')
-    df = pd.read_csv(io.StringIO(body))
+  def __get_hist_data_from_s3(self) -> None:
+    # Only the recent rows of every symbol: enough for the symbol universe and the last close; full columns are read per group when needed
+    # Base snapshot merged with the pending daily closing deltas; raises FileNotFoundError if there is no historical data yet
+    start = (date.today() - timedelta(days=RECENT_HISTORY_DAYS)).strftime('%Y-%m-%d')
+    df = self.hd_store.read_history(start=start)
+    if df.empty:
+      self.paw(f"The historical data has no rows since {start}; reading all of it instead.")
+      df = self.hd_store.read()
     start_date, end_date = df['date'].min(), df['date'].max()
 
-    self.pai("Successfully downloaded the historical data.")
+    self.pai("Successfully downloaded the recent historical data.")
     self.pai(f"It has {df.shape[0]} rows and {df.shape[1]} columns")
     self.pai(f"It ranges from {start_date} to {end_date}")
     self.__hdata = df
   
   def __get_screeners_list_from_s3(self) -> list:
-    response = self.s3_client.get_object(Bucket=self.cfg['s3_bucket'], Key=self.cfg['s3_screeners_file_name'])
-    body = response['Body'].read().decode('utf-8')
-    screeners_list = body.splitlines()
+    screeners_list = self.s3_mgr.read(bucket_name=self.cfg['s3_bucket'], bucket_key=self.cfg['s3_screeners_file_name'])
     return screeners_list
   
-  # NOTE :This method is different than the one in ListManager since here I need more info about the stocks (consider merging both methods later and adding fields masking)
   def __get_stocks_list_from_screeners(self) -> dict:
     screeners = self.__get_screeners_list_from_s3()
 
-    stocks = {}
-    # TODO add these attrs to the config file
-    symbols_per_screener_limit = 250 # 250 seems to be the max you can get
-    market_cap_threshold = 2_000_000_000  # $2 billion
-
-    for screener_name in screeners:
-      s = Screener()
-      result = s.get_screeners(screener_name, count=symbols_per_screener_limit)
-      if result[screener_name] == 'No screener records found. Check if scrIds and marketRegion combination are correct':
-        print(f"\tSkipping screener {screener_name} as it returned no records")
-        continue
-
-      for idx, i in enumerate(result[screener_name]['quotes']):
-        if 'symbol' not in i:
-          print(f"\tSkipping entry {idx} as it has no symbol")
-          continue
-
-        if 'marketCap' not in i:
-          print(f"\tSkipping entry {idx} ({i['symbol']}) as it has no marketCap")
-          continue
-
-        if i['marketCap'] < market_cap_threshold:
-            continue
-
-        stocks[i['symbol']] = i
+    # Same screener round as ListManager (and cached with it), masked to the fields the stats need
+    stocks = self.screener_mgr.get_screened_stocks(
+      screeners,
+      count=self.cfg['symbols_per_screener'],
+      min_market_cap=self.cfg['stats_market_cap_threshold'],
+      fields=['marketCap', 'regularMarketPrice', 'preMarketPrice']
+    )
 
     self.pai(f"Screeners returned {len(stocks)} unique stocks.")
     return stocks
@@ -158,16 +125,17 @@ class StocksManager:
       self.pai("All stocks in the historical data are present in the screeners list.")
       return
 
-    # Lets get the info for the missing stocks using Ticker
+    # Lets get the info for the missing stocks from whichever provider has quota left
     self.pai(f"There are {len(missing_stocks)} stocks in the historical data that are not in the screeners list: {missing_stocks}")
-    # TODO if more than 190 tickers, need to split the list and do multiple calls, create a class that handles this (created issue: https://github.com/muelitas/stocksStats/issues/6)
-    tickers = Ticker(list(missing_stocks), asynchronous=True)
+    # Lists of any size are fine: the provider manager splits them into chunks the provider accepts
+    tickers_info = self.data_pool.get_stocks_info(list(missing_stocks))
     for symbol in missing_stocks:
-      info = tickers.price.get(symbol, {})
-      if info:
+      info = tickers_info.get(symbol, {})
+      # yahooquery returns an error string instead of a dict for unknown symbols
+      if info and isinstance(info, dict):
         stocks_from_screeners[symbol] = info
       else:
-        msg = f"Could not find info for stock {symbol} using Ticker. Removing it from historical data."
+        msg = f"Could not find info for stock {symbol} using the stock data providers. Removing it from historical data."
         self.paw(msg)
 
         # Remove the stock from the historical data dataframe self.__hdata
@@ -210,14 +178,10 @@ class StocksManager:
   #endregion
 
   #region LastClosePriz
-  def __add_last_closing_price_to_historical_data(self, closing_prices: dict) -> None:
+  def __add_last_closing_price_to_historical_data(self, closing_prices: dict) -> dict:
     # Print the last three rows of the historical data, for the first 5 columns
-    self.pai("First 3 rows of historical data (before update):")
-    self.pai(self.__hdata.iloc[-3:, :5].to_string(index=False))
-
-    # Print the first three rows of the historical data, for the first 5 columns
     self.pai("Last 3 rows of historical data (before update):")
-    self.pai(self.__hdata.iloc[:3, :5].to_string(index=False))
+    self.pai(self.__hdata.iloc[-3:, :5].to_string(index=False))
 
     # We want to add a new row to the historical data with the last closing prices
     today = date.today().strftime('%Y-%m-%d')
@@ -226,26 +190,19 @@ class StocksManager:
     for symbol in stocks_in_hd:
       new_row[symbol] = closing_prices.get(symbol)
 
-    df = pd.concat([self.__hdata, pd.DataFrame([new_row])], ignore_index=True)
-
-    # Remove the first row to keep the size of the historical data the same
-    df = df.iloc[1:, :]
-  
-    self.__hdata = df
-    # Print the last three rows of the historical data, for the first 5 columns
-    self.pai("First 3 rows of historical data (after update):")
-    self.pai(self.__hdata.iloc[:3, :5].to_string(index=False))
+    # The oldest row is dropped when the delta is merged, so only the recent rows are kept here
+    self.__hdata = pd.concat([self.__hdata, pd.DataFrame([new_row])], ignore_index=True)
 
     # Print the last three rows of the historical data, for the first 5 columns
     self.pai("Last 3 rows of historical data (after update):")
     self.pai(self.__hdata.iloc[-3:, :5].to_string(index=False))
-
-    # Print the shape of the dataframe
-    start_date, end_date = df['date'].min(), df['date'].max()
-    self.pai(f"Now, the historical data has {df.shape[0]} rows and {df.shape[1]} columns")
-    self.pai(f"The historical data date range is from {start_date} to {end_date}")
+    self.pai(f"The new row has {len(new_row) - 1} symbols, for {today}")
+    return new_row
 
   def __update_last_closing_price_checks(self) -> None:
+    if self.cfg['skip_schedule_checks']:
+      return
+
     # Check if today is a weekday
     if date.today().weekday() > 4: # Mon-Fri are 0-4
       raise ValueError("Today is not a weekday. Cannot update last closing prices on weekends.")
@@ -255,17 +212,13 @@ class StocksManager:
     if not (time(13, 30) <= current_time <= time(23, 30)):
       raise ValueError("Current time is not between 1:30 PM and 11:30 PM Pacific Time. Cannot update last closing prices outside of this time range.")
     
-    # Check if historical data exists
-    if not self.__check_s3_object_exists(self.cfg['s3_bucket'], self.cfg['s3_historical_data_csv_name']):
-      raise FileNotFoundError(f"The historical data file {self.cfg['s3_historical_data_csv_name']} does not exist in bucket {self.cfg['s3_bucket']}. Cannot update last closing prices.")
-      
-  def __upload_new_historical_data_to_s3(self, df: pd.DataFrame) -> None:
-    csv_buffer = io.StringIO()
-    df.to_csv(csv_buffer, index=False)
-    self.s3_client.put_object(Bucket=self.cfg['s3_bucket'], Key=self.cfg['s3_historical_data_csv_name'], Body=csv_buffer.getvalue())
-    csv_buffer.close()
-    self.pai("Successfully uploaded the updated historical data.")
-    self.pai(f"It now has {df.shape[0]} rows and {df.shape[1]} columns")
+    # The historical data existence is checked by the GET in __get_hist_data_from_s3 itself (no extra HEAD round trip)
+
+  def __upload_closing_prices_delta(self, new_row: dict) -> None:
+    # Only today's row is written; it is folded into the full snapshot by the next upsert_historical_data
+    delta_key = self.hd_store.append_delta(new_row)
+    self.pai(f"Successfully uploaded today's closing prices to {delta_key}.")
+    self.pai(f"It has {len(new_row) - 1} symbols")
 
   def __send_last_closing_price_update_email(self) -> None:
     body = f"The last closing prices were successfully processed.\n\n"
@@ -294,14 +247,14 @@ class StocksManager:
     2. For each stock in the historical data file, get the last closing price from Yahoo Query
     2.1 Use the screeners first, if not found, use Ticker
     2.2 If still not found, log a warning and move on to the next
-    3. Update the last closing price in the historical data file
+    3. Store the last closing prices as today's delta of the historical data
     '''
     try:
       # Run checks
       self.__update_last_closing_price_checks()
       
       # Download historical data
-      self.__get_hist_data_from_s3(self.cfg['s3_historical_data_csv_name'])
+      self.__get_hist_data_from_s3()
       
       # Get stocks, and their financial data, from screeners
       stocks_and_info = self.__get_stocks_list_from_screeners()
@@ -318,10 +271,10 @@ class StocksManager:
         self.__send_last_closing_price_update_email()
         return
       
-      self.__add_last_closing_price_to_historical_data(closing_prices)
+      new_row = self.__add_last_closing_price_to_historical_data(closing_prices)
 
-      # Update the historical data in S3
-      self.__upload_new_historical_data_to_s3(self.__hdata)
+      # Store today's closing prices as a delta object in S3
+      self.__upload_closing_prices_delta(new_row)
       self.__send_last_closing_price_update_email()
 
     except Exception as e:
@@ -437,8 +390,8 @@ class StocksManager:
 
     return grouped
 
-  def __process_pre_market_data(self, grouped_stocks_and_info: dict) -> dict:
-    stocks_in_hd = self.__hdata.columns[self.__hdata.columns != 'date'].tolist()
+  def __process_pre_market_data(self, grouped_stocks_and_info: dict, group_hdata: pd.DataFrame) -> dict:
+    stocks_in_hd = group_hdata.columns[group_hdata.columns != 'date'].tolist()
     key_error_failed_symbols, key_err_msg = [], None
     processed = {
         '1-day': {},
@@ -457,7 +410,7 @@ class StocksManager:
 
         price_data = grouped_stocks_and_info[ticker]
         # Get the column with the name of 'ticker' in the historical data dataframe
-        h_data = self.__hdata[ticker].copy()
+        h_data = group_hdata[ticker].copy()
         curr_price = price_data['preMarketPrice']
 
         one_day_max = h_data[-1:].max()  # Last day, since the last day is the previous close
@@ -533,7 +486,7 @@ class StocksManager:
       # Check you are in pre-market hours (between 4:00 AM and 9:30 AM Pacific Time)
 
       # Download historical data
-      self.__get_hist_data_from_s3(self.cfg['s3_historical_data_csv_name'])
+      self.__get_hist_data_from_s3()
 
       # Get stocks, and their financial data, from screeners
       stocks_and_info = self.__get_stocks_list_from_screeners()
@@ -547,7 +500,11 @@ class StocksManager:
       # Process each group separately
       for group_name, group_stocks in grouped_stocks.items():
         print(f"Processing pre-market data for group '{group_name}' with {len(group_stocks)} stocks.")
-        data_as_dicts = self.__process_pre_market_data(group_stocks)
+        # Full history, but only for this group's columns
+        group_symbols = [symbol for symbol in group_stocks if symbol in self.__hdata.columns]
+        group_hdata = self.hd_store.read_history(symbols=group_symbols)
+        data_as_dicts = self.__process_pre_market_data(group_stocks, group_hdata)
+        del group_hdata
         data_as_df = self.__dataframize_processed_data(data_as_dicts)
         self.__log_processed_symbols(group_name, data_as_df)
 
@@ -1,14 +1,37 @@
+from concurrent.futures import ThreadPoolExecutor
 import io
 
 import boto3
+from boto3.s3.transfer import TransferConfig
 import botocore
+from botocore.config import Config
 import pandas as pd
+import pyarrow as pa
 
 from StorageProviderInterface import StorageProviderInterface as ProviderInterface
+import StorageCodecs as codecs
+import StorageSerialization as serialization
+
+MULTIPART_CHUNK_SIZE = 8 * 1024 * 1024
+# Objects larger than one part are downloaded as concurrent ranged GETs of this size
+DOWNLOAD_PART_SIZE = 8 * 1024 * 1024
+# Smallest ranged GET issued by history queries; the first one, taken from the end of the object, normally covers the whole Parquet footer
+RANGE_READ_MIN_BYTES = 256 * 1024
 
 class StorageAwsS3Provider(ProviderInterface):
-  def __init__(self):
-    self.s3_client = boto3.client("s3")
+  def __init__(self, compression: str = None, compression_level: int = None, max_concurrency: int = 8, download_part_size: int = DOWNLOAD_PART_SIZE):
+    codecs.validate_codec(compression)
+    if max_concurrency < 1 or download_part_size < 1:
+      raise ValueError("The 'max_concurrency' and 'download_part_size' must be positive integers.")
+
+    # One pooled connection per concurrent part, shared by ranged downloads and multipart uploads
+    self.s3_client = boto3.client("s3", config=Config(max_pool_connections=max_concurrency))
+    # Default codec for keys without a codec suffix ('.gz', '.zst'); None keeps writing them raw
+    self.compression = compression
+    self.compression_level = compression_level
+    self.max_concurrency = max_concurrency
+    self.download_part_size = download_part_size
+    self.transfer_config = TransferConfig(multipart_threshold=MULTIPART_CHUNK_SIZE, multipart_chunksize=MULTIPART_CHUNK_SIZE, max_concurrency=max_concurrency)
 
   def check_existence(self, bucket_name: str, bucket_key: str) -> bool:
     try:
@@ -21,61 +44,220 @@ class StorageAwsS3Provider(ProviderInterface):
         print(f"Unexpected error occurred while checking S3 object existence: {e}")
         raise e
 
+  def check_existence_many(self, bucket_name: str, bucket_keys: list[str]) -> dict[str, bool]:
+    """
+    One HEAD per key, run concurrently. A list_objects_v2 over the keys' common prefix is not used: the keys checked together
+    live at the bucket root, where that listing would paginate through the whole bucket.
+    """
+    if not bucket_keys:
+      return {}
+
+    with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(bucket_keys))) as executor:
+      return dict(zip(bucket_keys, executor.map(lambda key: self.check_existence(bucket_name, key), bucket_keys)))
+
+  def list_keys(self, bucket_name: str, prefix: str = '') -> list[str]:
+    keys = []
+    paginator = self.s3_client.get_paginator('list_objects_v2')
+    try:
+      for page in paginator.paginate(Bucket=bucket_name, Prefix=prefix):
+        keys.extend(obj['Key'] for obj in page.get('Contents', []))
+    except botocore.exceptions.ClientError as e:
+      print(f"Unexpected error occurred while listing S3 objects: {e}")
+      raise e
+
+    return keys
+
   def create(self, bucket_name: str, bucket_key: str, data: pd.DataFrame | list) -> None:
     if not bucket_key or not bucket_name:
       raise ValueError("The 'bucket_key' and 'bucket_name' must be non-empty strings.")
     
-    if bucket_key.endswith('.csv'):
-      if not isinstance(data, pd.DataFrame):
-        raise ValueError("Data must be a DataFrame to create a CSV file in S3.")
-      
-      self.__create_csv_file_in_s3(bucket_name, bucket_key, data)
-    else:
-      raise NotImplementedError(f"Creating files of type other than CSV is not implemented. Provided key (filename): {bucket_key}")
+    buffer = io.BytesIO()
+    content_encoding = serialization.write_object(bucket_key, data, buffer, self.compression, self.compression_level)
+    self.__upload_buffer(bucket_name, bucket_key, buffer, content_encoding=content_encoding)
 
   def read(self, bucket_name: str, bucket_key: str) -> pd.DataFrame | list[str]:
-    if not self.check_existence(bucket_name, bucket_key):
-      raise FileNotFoundError(f"The object {bucket_key} does not exist in bucket {bucket_name}.")
-    
+    # A missing key surfaces as NoSuchKey on the GET itself, so there is no HEAD round trip before it
+    data, _ = self.read_with_etag(bucket_name, bucket_key)
+    return data
+
+  def read_with_etag(self, bucket_name: str, bucket_key: str, if_none_match: str = None) -> tuple[pd.DataFrame | list[str] | None, str]:
     if not bucket_key or not bucket_name:
       raise ValueError("The 'bucket_key' and 'bucket_name' must be non-empty strings.")
 
-    
-    if bucket_key.endswith('.csv'):
-      return self.__read_csv_file_from_s3(bucket_name, bucket_key)
-    elif bucket_key.endswith('.txt'):
-      return self.__read_txt_file_from_s3(bucket_name, bucket_key)
+    # The first GET only asks for the first part; it also tells the object's total size
+    get_kwargs = {'Bucket': bucket_name, 'Key': bucket_key, 'Range': f"bytes=0-{self.download_part_size - 1}"}
+    if if_none_match:
+      get_kwargs['IfNoneMatch'] = if_none_match
+
+    try:
+      response = self.s3_client.get_object(**get_kwargs)
+    except botocore.exceptions.ClientError as e:
+      error_code = e.response['Error']['Code']
+      if error_code in ("304", "NotModified"):
+        return None, if_none_match
+      elif error_code in ("404", "NoSuchKey"):
+        raise FileNotFoundError(f"The object {bucket_key} does not exist in bucket {bucket_name}.")
+      elif error_code == "InvalidRange":
+        # Empty object: no byte range can be satisfied, so read it without one
+        get_kwargs.pop('Range')
+        response = self.s3_client.get_object(**get_kwargs)
+      else:
+        print(f"Unexpected error occurred while reading S3 object: {e}")
+        raise e
+
+    total_size = int(response['ContentRange'].rsplit('/', 1)[1]) if response.get('ContentRange') else response['ContentLength']
+    if total_size <= self.download_part_size:
+      # Single part: parsed straight from the StreamingBody bytes; no decoded str or StringIO copy of the object
+      body = response['Body']
     else:
-      raise NotImplementedError(f"Reading files of type other than CSV is not implemented. Provided key (filename): {bucket_key}")
+      body = self.__download_parts(bucket_name, bucket_key, response, total_size)
+
+    data = serialization.read_object(bucket_key, body, response.get('ContentEncoding'))
+    return data, response['ETag']
+
+  def read_history(self, bucket_name: str, bucket_key: str, symbols: list[str] = None, start: str = None, end: str = None) -> pd.DataFrame:
+    if not bucket_key or not bucket_name:
+      raise ValueError("The 'bucket_key' and 'bucket_name' must be non-empty strings.")
+
+    if not bucket_key.endswith('.parquet'):
+      # CSV (or codec-suffixed) objects cannot be read partially, so read them whole and slice
+      return serialization.project_history(self.read(bucket_name, bucket_key), symbols, start, end)
+
+    # Raw Parquet: the footer and then only the selected column chunks are fetched with ranged GETs
+    source = S3RangedFile(self.s3_client, bucket_name, bucket_key)
+    return serialization.read_history(bucket_key, source, source.content_encoding, symbols, start, end)
 
   def update(self) -> None:
     raise NotImplementedError("Update operation is not implemented in AwsS3Provider.")
 
-  def delete(self) -> None:
-    raise NotImplementedError("Delete operation is not implemented in AwsS3Provider.")
+  def delete(self, bucket_name: str, bucket_key: str) -> None:
+    if not bucket_key or not bucket_name:
+      raise ValueError("The 'bucket_key' and 'bucket_name' must be non-empty strings.")
+
+    self.s3_client.delete_object(Bucket=bucket_name, Key=bucket_key)
 
   #region Private methods
-  def __read_csv_file_from_s3(self, bucket: str, csv_file_name: str) -> pd.DataFrame:
-    response = self.s3_client.get_object(Bucket=bucket, Key=csv_file_name)
-    body = response['Body'].read().decode('utf-8')
-    df = pd.read_csv(io.StringIO(body))
-    return df
-  
-  def __read_txt_file_from_s3(self, bucket, txt_file_name) -> list:
-    response = self.s3_client.get_object(Bucket=bucket, Key=txt_file_name)
-    body = response['Body'].read().decode('utf-8')
-    text_lines = body.splitlines()
-
-    # If the last line is empty, remove it
-    if text_lines and text_lines[-1] == '':
-      text_lines.pop()
-
-    return text_lines
-
-  def __create_csv_file_in_s3(self, bucket: str, csv_file_name: str, df: pd.DataFrame) -> None:
-    csv_buffer = io.StringIO()
-    df.to_csv(csv_buffer, index=False)
-    self.s3_client.put_object(Bucket=bucket, Key=csv_file_name, Body=csv_buffer.getvalue())
-    csv_buffer.close()
-
-  #endregion
\ No newline at end of file
+  def __download_parts(self, bucket: str, key: str, first_response: dict, total_size: int) -> pa.BufferReader:
+    """Fetch the rest of the object as concurrent ranged GETs, each written into its slice of one preallocated buffer"""
+    buffer = bytearray(total_size)
+    view = memoryview(buffer)
+    etag = first_response['ETag']
+
+    def download_part(start: int) -> None:
+      end = min(start + self.download_part_size, total_size) - 1
+      try:
+        # IfMatch: every part must come from the same version of the object as the first one
+        response = self.s3_client.get_object(Bucket=bucket, Key=key, Range=f"bytes={start}-{end}", IfMatch=etag)
+      except botocore.exceptions.ClientError as e:
+        if e.response['Error']['Code'] in ("412", "PreconditionFailed"):
+          print(f"S3 object {key} changed while it was being downloaded.")
+        raise e
+      self.__read_body_into(response['Body'], view[start:end + 1])
+
+    self.__read_body_into(first_response['Body'], view[:self.download_part_size])
+    part_starts = range(self.download_part_size, total_size, self.download_part_size)
+    with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+      # list() so the first failing part raises here
+      list(executor.map(download_part, part_starts))
+
+    # Zero-copy, seekable reader over the buffer (Parquet reads it in place)
+    return pa.BufferReader(pa.py_buffer(buffer))
+
+  def __read_body_into(self, body, view: memoryview) -> None:
+    position = 0
+    while position < len(view):
+      chunk = body.read(min(serialization.READ_CHUNK_SIZE, len(view) - position))
+      if not chunk:
+        raise IOError(f"S3 response ended after {position} of {len(view)} expected bytes.")
+      view[position:position + len(chunk)] = chunk
+      position += len(chunk)
+
+  def __upload_buffer(self, bucket: str, key: str, buffer: io.BytesIO, content_encoding: str = None) -> None:
+    # Upload from the buffer itself (no getvalue() copy); objects above the threshold go up as a chunked multipart upload
+    extra_args = {'ContentEncoding': content_encoding} if content_encoding else None
+    buffer.seek(0)
+    self.s3_client.upload_fileobj(buffer, bucket, key, ExtraArgs=extra_args, Config=self.transfer_config)
+    buffer.close()
+
+  #endregion
+
+
+class S3RangedFile(io.RawIOBase):
+  """Read-only, seekable file over an S3 object where every read is served by a ranged GET (or by a range fetched earlier)"""
+
+  def __init__(self, s3_client, bucket_name: str, bucket_key: str):
+    super().__init__()
+    self.s3_client = s3_client
+    self.bucket_name = bucket_name
+    self.bucket_key = bucket_key
+    self.position = 0
+    # (start, bytes) of every range fetched so far
+    self.ranges = []
+
+    # A suffix range learns the object's size and ETag and, for Parquet, fetches the footer in the same request
+    response = self.__get_range(f"bytes=-{RANGE_READ_MIN_BYTES}")
+    self.size = int(response['ContentRange'].rsplit('/', 1)[1])
+    self.etag = response['ETag']
+    self.content_encoding = response.get('ContentEncoding')
+    tail = response['Body'].read()
+    self.ranges.append((self.size - len(tail), tail))
+
+  def readable(self) -> bool:
+    return True
+
+  def seekable(self) -> bool:
+    return True
+
+  def tell(self) -> int:
+    return self.position
+
+  def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+    if whence == io.SEEK_SET:
+      self.position = offset
+    elif whence == io.SEEK_CUR:
+      self.position += offset
+    elif whence == io.SEEK_END:
+      self.position = self.size + offset
+    else:
+      raise ValueError(f"Invalid whence: {whence}")
+    return self.position
+
+  def readinto(self, buffer) -> int:
+    length = min(len(buffer), self.size - self.position)
+    if length <= 0:
+      return 0
+
+    data = self.__read_range(self.position, length)
+    buffer[:length] = data
+    self.position += length
+    return length
+
+  #region Private methods
+  def __read_range(self, start: int, length: int) -> bytes:
+    for range_start, data in self.ranges:
+      if range_start <= start and start + length <= range_start + len(data):
+        offset = start - range_start
+        return data[offset:offset + length]
+
+    # Read ahead a little so many small reads (column chunk headers, page indexes) do not each become a GET
+    end = min(self.size, start + max(length, RANGE_READ_MIN_BYTES)) - 1
+    # IfMatch makes sure every range comes from the same version of the object
+    data = self.__get_range(f"bytes={start}-{end}", if_match=self.etag)['Body'].read()
+    self.ranges.append((start, data))
+    return data[:length]
+
+  def __get_range(self, byte_range: str, if_match: str = None) -> dict:
+    get_kwargs = {'Bucket': self.bucket_name, 'Key': self.bucket_key, 'Range': byte_range}
+    if if_match:
+      get_kwargs['IfMatch'] = if_match
+
+    try:
+      return self.s3_client.get_object(**get_kwargs)
+    except botocore.exceptions.ClientError as e:
+      if e.response['Error']['Code'] in ("404", "NoSuchKey"):
+        raise FileNotFoundError(f"The object {self.bucket_key} does not exist in bucket {self.bucket_name}.")
+      else:
+        print(f"Unexpected error occurred while reading a range of S3 object {self.bucket_key}: {e}")
+        raise e
+
+  #endregion
@@ -0,0 +1,139 @@
+from collections import OrderedDict
+import hashlib
+import os
+import pickle
+import sys
+import threading
+
+import pandas as pd
+
+# Module-level so parsed objects survive across warm Lambda invocations: (bucket, key) -> (etag, data, size in bytes), least recently used first
+_MEMORY_CACHE = OrderedDict()
+_MEMORY_LOCK = threading.Lock()
+
+def copy_cached_data(data: pd.DataFrame | list[str]) -> pd.DataFrame | list[str]:
+  # Callers mutate what they read (drop columns, append rows), so never hand out a cached object itself
+  if isinstance(data, pd.DataFrame):
+    return data.copy()
+  return list(data)
+
+def cached_data_size(data: pd.DataFrame | list[str]) -> int:
+  """Approximate in-memory size of a parsed object, in bytes"""
+  if isinstance(data, pd.DataFrame):
+    return int(data.memory_usage(index=True, deep=True).sum())
+  return sum(sys.getsizeof(line) for line in data)
+
+class StorageCache:
+  """
+  Read-through cache of parsed storage objects, kept in memory and on local disk and validated by ETag.
+  Each tier has its own budget: `max_bytes` for the files in `cache_dir`, `max_memory_bytes` for the parsed objects kept in memory.
+  """
+
+  def __init__(self, cache_dir: str, max_bytes: int, max_memory_bytes: int = 256 * 1024 * 1024):
+    if max_bytes <= 0 or max_memory_bytes <= 0:
+      raise ValueError("The 'max_bytes' and 'max_memory_bytes' of the storage cache must be positive integers.")
+
+    self.cache_dir = cache_dir
+    self.max_bytes = max_bytes
+    self.max_memory_bytes = max_memory_bytes
+    os.makedirs(self.cache_dir, exist_ok=True)
+
+  def get(self, bucket_name: str, bucket_key: str) -> tuple[str, pd.DataFrame | list[str]] | None:
+    """Return (etag, data) for the cached object, or None if it is not cached"""
+    with _MEMORY_LOCK:
+      entry = _MEMORY_CACHE.get((bucket_name, bucket_key))
+      if entry is not None:
+        _MEMORY_CACHE.move_to_end((bucket_name, bucket_key))
+    if entry is not None:
+      self.__touch(bucket_name, bucket_key)
+      return entry[0], copy_cached_data(entry[1])
+
+    file_path = self.__file_path(bucket_name, bucket_key)
+    if not os.path.exists(file_path):
+      return None
+
+    try:
+      with open(file_path, 'rb') as f:
+        entry = pickle.load(f)
+    except Exception as e:
+      print(f"Warning: Could not load cached copy of {bucket_key} from {file_path}, ignoring it: {repr(e)}")
+      self.invalidate(bucket_name, bucket_key)
+      return None
+
+    self.__remember(bucket_name, bucket_key, entry['etag'], entry['data'])
+    self.__touch(bucket_name, bucket_key)
+    return entry['etag'], copy_cached_data(entry['data'])
+
+  def put(self, bucket_name: str, bucket_key: str, etag: str, data: pd.DataFrame | list[str]) -> None:
+    data = copy_cached_data(data)
+    self.__remember(bucket_name, bucket_key, etag, data)
+
+    try:
+      with open(self.__file_path(bucket_name, bucket_key), 'wb') as f:
+        pickle.dump({'bucket': bucket_name, 'key': bucket_key, 'etag': etag, 'data': data}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError as e:
+      # A full or read-only /tmp should never fail a scenario, the object is still cached in memory (if it fits there)
+      print(f"Warning: Could not write cached copy of {bucket_key} to {self.cache_dir}: {repr(e)}")
+      return
+
+    self.__evict()
+
+  def invalidate(self, bucket_name: str, bucket_key: str) -> None:
+    with _MEMORY_LOCK:
+      _MEMORY_CACHE.pop((bucket_name, bucket_key), None)
+    file_path = self.__file_path(bucket_name, bucket_key)
+    if os.path.exists(file_path):
+      os.remove(file_path)
+
+  #region Private methods
+  def __remember(self, bucket_name: str, bucket_key: str, etag: str, data: pd.DataFrame | list[str]) -> None:
+    """Keep `data` in memory, evicting the least recently used objects beyond max_memory_bytes; a larger object is only cached on disk"""
+    size = cached_data_size(data)
+    with _MEMORY_LOCK:
+      _MEMORY_CACHE.pop((bucket_name, bucket_key), None)
+      if size > self.max_memory_bytes:
+        return
+
+      _MEMORY_CACHE[(bucket_name, bucket_key)] = (etag, data, size)
+      total_bytes = sum(entry[2] for entry in _MEMORY_CACHE.values())
+      while total_bytes > self.max_memory_bytes:
+        _, (_, _, evicted_size) = _MEMORY_CACHE.popitem(last=False)
+        total_bytes -= evicted_size
+
+  def __file_path(self, bucket_name: str, bucket_key: str) -> str:
+    digest = hashlib.sha1(f"{bucket_name}/{bucket_key}".encode('utf-8')).hexdigest()
+    return os.path.join(self.cache_dir, f"{digest}.pkl")
+
+  def __touch(self, bucket_name: str, bucket_key: str) -> None:
+    # The file's mtime doubles as its "last used" time for eviction
+    file_path = self.__file_path(bucket_name, bucket_key)
+    if os.path.exists(file_path):
+      os.utime(file_path)
+
+  def __evict(self) -> None:
+    """Remove the least recently used entries until the cache directory fits in max_bytes"""
+    entries = []
+    for file_name in os.listdir(self.cache_dir):
+      file_path = os.path.join(self.cache_dir, file_name)
+      if file_name.endswith('.pkl') and os.path.isfile(file_path):
+        stat = os.stat(file_path)
+        entries.append((stat.st_mtime, stat.st_size, file_path))
+
+    total_bytes = sum(size for _, size, _ in entries)
+    if total_bytes <= self.max_bytes:
+      return
+
+    evicted_paths = set()
+    for _, size, file_path in sorted(entries):
+      if total_bytes <= self.max_bytes:
+        break
+      os.remove(file_path)
+      evicted_paths.add(file_path)
+      total_bytes -= size
+
+    with _MEMORY_LOCK:
+      for bucket_name, bucket_key in list(_MEMORY_CACHE.keys()):
+        if self.__file_path(bucket_name, bucket_key) in evicted_paths:
+          del _MEMORY_CACHE[(bucket_name, bucket_key)]
+
+  #endregion
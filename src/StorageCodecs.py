@@ -0,0 +1,77 @@
+import gzip
+import io
+
+try:
+  import zstandard
+except ImportError:
+  zstandard = None # Optional; only needed to read or write zstd objects
+
+CODEC_SUFFIXES = {
+  '.gz': 'gzip',
+  '.zst': 'zstd',
+}
+SUPPORTED_CODECS = set(CODEC_SUFFIXES.values())
+
+def strip_codec_suffix(bucket_key: str) -> str:
+  """'all_stocks.csv.gz' -> 'all_stocks.csv'; keys without a codec suffix are returned as they are"""
+  for suffix in CODEC_SUFFIXES:
+    if bucket_key.endswith(suffix):
+      return bucket_key[:-len(suffix)]
+  return bucket_key
+
+def detect_codec(bucket_key: str, content_encoding: str = None) -> str | None:
+  """The key suffix wins over the object's Content-Encoding metadata; None means the object is stored raw"""
+  for suffix, codec in CODEC_SUFFIXES.items():
+    if bucket_key.endswith(suffix):
+      return codec
+
+  if content_encoding in SUPPORTED_CODECS:
+    return content_encoding
+
+  return None
+
+def validate_codec(codec: str | None) -> None:
+  if codec is None:
+    return
+
+  if codec not in SUPPORTED_CODECS:
+    raise ValueError(f"Unsupported compression codec: {codec}. Supported codecs are: {sorted(SUPPORTED_CODECS)}")
+
+  if codec == 'zstd' and zstandard is None:
+    raise ImportError("The 'zstandard' package is required to use zstd compression (pip install zstandard).")
+
+def decompressing_reader(stream, codec: str | None):
+  """Wrap a binary stream so reads return decompressed bytes, without buffering the whole object"""
+  validate_codec(codec)
+  if codec is None:
+    return stream
+  elif codec == 'gzip':
+    return gzip.GzipFile(fileobj=stream, mode='rb')
+  else:
+    return zstandard.ZstdDecompressor().stream_reader(stream, read_across_frames=True, closefd=False)
+
+def compressing_writer(target, codec: str | None, level: int = None):
+  """Wrap a binary buffer so writes are compressed into it; closing the writer flushes it but leaves `target` open"""
+  validate_codec(codec)
+  if codec is None:
+    return _NonClosingWriter(target)
+  elif codec == 'gzip':
+    return gzip.GzipFile(fileobj=target, mode='wb', compresslevel=level if level is not None else 6)
+  else:
+    return zstandard.ZstdCompressor(level=level if level is not None else 3).stream_writer(target, closefd=False)
+
+class _NonClosingWriter(io.BufferedIOBase):
+  """Pass-through writer so the uncompressed path shares the `with compressing_writer(...)` code path without closing `target`"""
+  def __init__(self, target):
+    super().__init__()
+    self.target = target
+
+  def writable(self) -> bool:
+    return True
+
+  def write(self, data) -> int:
+    return self.target.write(data)
+
+  def flush(self) -> None:
+    if not self.closed:
+      self.target.flush()
@@ -1,13 +1,19 @@
 from StorageProviders import StorageProviders as Providers
 from StorageProviderInterface import StorageProviderInterface as iProvider
 from StorageAwsS3Provider import StorageAwsS3Provider
+from StorageInMemoryProvider import StorageInMemoryProvider
+from StorageLocalFsProvider import StorageLocalFsProvider
 
 class StorageFactory:
   """Factory class to create storage providers"""
   
   @staticmethod
-  def create_provider(provider: Providers) -> iProvider:
+  def create_provider(provider: Providers, **kwargs) -> iProvider:
     if provider == Providers.AWS_S3:
-      return StorageAwsS3Provider()
+      return StorageAwsS3Provider(**kwargs)
+    elif provider == Providers.LOCAL_FS:
+      return StorageLocalFsProvider(**kwargs)
+    elif provider == Providers.IN_MEMORY:
+      return StorageInMemoryProvider(**kwargs)
     else:
       raise ValueError(f"Unsupported provider type: {provider}")
\ No newline at end of file
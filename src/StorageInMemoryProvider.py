@@ -0,0 +1,72 @@
+import hashlib
+import io
+
+import pandas as pd
+
+from StorageProviderInterface import StorageProviderInterface as ProviderInterface
+import StorageCodecs as codecs
+import StorageSerialization as serialization
+
+class StorageInMemoryProvider(ProviderInterface):
+  """Keeps serialized objects in a dict; same formats and compression as S3, without the network"""
+
+  def __init__(self, compression: str = None, compression_level: int = None):
+    codecs.validate_codec(compression)
+    self.compression = compression
+    self.compression_level = compression_level
+    # (bucket, key) -> (payload bytes, content encoding, etag)
+    self.objects = {}
+
+  def check_existence(self, bucket_name: str, bucket_key: str) -> bool:
+    return (bucket_name, bucket_key) in self.objects
+
+  def check_existence_many(self, bucket_name: str, bucket_keys: list[str]) -> dict[str, bool]:
+    return {key: self.check_existence(bucket_name, key) for key in bucket_keys}
+
+  def list_keys(self, bucket_name: str, prefix: str = '') -> list[str]:
+    return sorted(key for bucket, key in self.objects if bucket == bucket_name and key.startswith(prefix))
+
+  def create(self, bucket_name: str, bucket_key: str, data: pd.DataFrame | list) -> None:
+    if not bucket_key or not bucket_name:
+      raise ValueError("The 'bucket_key' and 'bucket_name' must be non-empty strings.")
+
+    buffer = io.BytesIO()
+    content_encoding = serialization.write_object(bucket_key, data, buffer, self.compression, self.compression_level)
+    payload = buffer.getvalue()
+    self.objects[(bucket_name, bucket_key)] = (payload, content_encoding, hashlib.md5(payload).hexdigest())
+
+  def read(self, bucket_name: str, bucket_key: str) -> pd.DataFrame | list[str]:
+    data, _ = self.read_with_etag(bucket_name, bucket_key)
+    return data
+
+  def read_with_etag(self, bucket_name: str, bucket_key: str, if_none_match: str = None) -> tuple[pd.DataFrame | list[str] | None, str]:
+    if not bucket_key or not bucket_name:
+      raise ValueError("The 'bucket_key' and 'bucket_name' must be non-empty strings.")
+
+    if (bucket_name, bucket_key) not in self.objects:
+      raise FileNotFoundError(f"The object {bucket_key} does not exist in bucket {bucket_name}.")
+
+    payload, content_encoding, etag = self.objects[(bucket_name, bucket_key)]
+    if if_none_match == etag:
+      return None, etag
+
+    return serialization.read_object(bucket_key, io.BytesIO(payload), content_encoding), etag
+
+  def read_history(self, bucket_name: str, bucket_key: str, symbols: list[str] = None, start: str = None, end: str = None) -> pd.DataFrame:
+    if not bucket_key or not bucket_name:
+      raise ValueError("The 'bucket_key' and 'bucket_name' must be non-empty strings.")
+
+    if (bucket_name, bucket_key) not in self.objects:
+      raise FileNotFoundError(f"The object {bucket_key} does not exist in bucket {bucket_name}.")
+
+    payload, content_encoding, _ = self.objects[(bucket_name, bucket_key)]
+    return serialization.read_history(bucket_key, io.BytesIO(payload), content_encoding, symbols, start, end)
+
+  def update(self) -> None:
+    raise NotImplementedError("Update operation is not implemented in InMemoryProvider.")
+
+  def delete(self, bucket_name: str, bucket_key: str) -> None:
+    if not bucket_key or not bucket_name:
+      raise ValueError("The 'bucket_key' and 'bucket_name' must be non-empty strings.")
+
+    self.objects.pop((bucket_name, bucket_key), None)
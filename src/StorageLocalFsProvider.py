@@ -0,0 +1,121 @@
+import io
+import os
+import tempfile
+
+import pandas as pd
+import pyarrow as pa
+
+from StorageProviderInterface import StorageProviderInterface as ProviderInterface
+import StorageSerialization as serialization
+
+class StorageLocalFsProvider(ProviderInterface):
+  """Stores every bucket as a directory under `root_dir` and every key as a file inside it"""
+
+  def __init__(self, root_dir: str, mmap_threshold_bytes: int = 1024 * 1024):
+    if not root_dir:
+      raise ValueError("The 'root_dir' must be a non-empty string.")
+
+    self.root_dir = root_dir
+    # Files at or above this size are memory-mapped instead of read through a regular file handle
+    self.mmap_threshold_bytes = mmap_threshold_bytes
+    os.makedirs(self.root_dir, exist_ok=True)
+
+  def check_existence(self, bucket_name: str, bucket_key: str) -> bool:
+    return os.path.isfile(self.__path(bucket_name, bucket_key))
+
+  def check_existence_many(self, bucket_name: str, bucket_keys: list[str]) -> dict[str, bool]:
+    return {key: self.check_existence(bucket_name, key) for key in bucket_keys}
+
+  def list_keys(self, bucket_name: str, prefix: str = '') -> list[str]:
+    bucket_dir = self.__path(bucket_name, '')
+    keys = []
+    for dir_path, _, file_names in os.walk(bucket_dir):
+      for file_name in file_names:
+        key = os.path.relpath(os.path.join(dir_path, file_name), bucket_dir).replace(os.sep, '/')
+        if key.startswith(prefix):
+          keys.append(key)
+
+    return sorted(keys)
+
+  def create(self, bucket_name: str, bucket_key: str, data: pd.DataFrame | list) -> None:
+    if not bucket_key or not bucket_name:
+      raise ValueError("The 'bucket_key' and 'bucket_name' must be non-empty strings.")
+
+    # Files carry no Content-Encoding metadata, so only codec suffixes ('.gz', '.zst') compress CSV here
+    buffer = io.BytesIO()
+    serialization.write_object(bucket_key, data, buffer)
+
+    # Write to a temporary file and rename it so readers never see a half-written object
+    file_path = self.__path(bucket_name, bucket_key)
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(file_path), prefix='.tmp-')
+    try:
+      with os.fdopen(fd, 'wb') as f:
+        f.write(buffer.getbuffer())
+      os.replace(tmp_path, file_path)
+    except Exception as e:
+      if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+      raise e
+    finally:
+      buffer.close()
+
+  def read(self, bucket_name: str, bucket_key: str) -> pd.DataFrame | list[str]:
+    data, _ = self.read_with_etag(bucket_name, bucket_key)
+    return data
+
+  def read_with_etag(self, bucket_name: str, bucket_key: str, if_none_match: str = None) -> tuple[pd.DataFrame | list[str] | None, str]:
+    if not bucket_key or not bucket_name:
+      raise ValueError("The 'bucket_key' and 'bucket_name' must be non-empty strings.")
+
+    file_path = self.__path(bucket_name, bucket_key)
+    try:
+      stat = os.stat(file_path)
+    except FileNotFoundError:
+      raise FileNotFoundError(f"The object {bucket_key} does not exist in bucket {bucket_name}.")
+
+    etag = f"{stat.st_mtime_ns}-{stat.st_size}"
+    if if_none_match == etag:
+      return None, etag
+
+    if stat.st_size >= self.mmap_threshold_bytes:
+      # Memory-mapped: pages are faulted in by the parser as it goes instead of being copied into a Python buffer first
+      with pa.memory_map(file_path, 'r') as source:
+        return serialization.read_object(bucket_key, source), etag
+
+    with open(file_path, 'rb') as source:
+      return serialization.read_object(bucket_key, source), etag
+
+  def read_history(self, bucket_name: str, bucket_key: str, symbols: list[str] = None, start: str = None, end: str = None) -> pd.DataFrame:
+    if not bucket_key or not bucket_name:
+      raise ValueError("The 'bucket_key' and 'bucket_name' must be non-empty strings.")
+
+    file_path = self.__path(bucket_name, bucket_key)
+    if not os.path.isfile(file_path):
+      raise FileNotFoundError(f"The object {bucket_key} does not exist in bucket {bucket_name}.")
+
+    # Memory-mapped regardless of size: only the pages of the selected row groups and columns are ever touched
+    with pa.memory_map(file_path, 'r') as source:
+      return serialization.read_history(bucket_key, source, None, symbols, start, end)
+
+  def update(self) -> None:
+    raise NotImplementedError("Update operation is not implemented in LocalFsProvider.")
+
+  def delete(self, bucket_name: str, bucket_key: str) -> None:
+    if not bucket_key or not bucket_name:
+      raise ValueError("The 'bucket_key' and 'bucket_name' must be non-empty strings.")
+
+    file_path = self.__path(bucket_name, bucket_key)
+    if os.path.exists(file_path):
+      os.remove(file_path)
+
+  #region Private methods
+  def __path(self, bucket_name: str, bucket_key: str) -> str:
+    bucket_dir = os.path.realpath(os.path.join(self.root_dir, bucket_name))
+    file_path = os.path.realpath(os.path.join(bucket_dir, bucket_key))
+    # Keys are S3-style paths; never let one ('../x') escape its bucket directory
+    if file_path != bucket_dir and not file_path.startswith(bucket_dir + os.sep):
+      raise ValueError(f"The key {bucket_key} resolves outside of bucket {bucket_name}.")
+    return file_path
+
+  #endregion
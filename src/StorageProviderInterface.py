@@ -12,6 +12,14 @@ class StorageProviderInterface(ABC):
     def check_existence(self, bucket_name: str, bucket_key: str) -> bool:
         pass
 
+    @abstractmethod
+    def check_existence_many(self, bucket_name: str, bucket_keys: list[str]) -> dict[str, bool]:
+        pass
+
+    @abstractmethod
+    def list_keys(self, bucket_name: str, prefix: str = '') -> list[str]:
+        pass
+
     @abstractmethod
     def create(self, bucket_name: str, bucket_key: str, data: pd.DataFrame | list) -> None:
         pass
@@ -19,11 +27,21 @@ class StorageProviderInterface(ABC):
     @abstractmethod
     def read(self, bucket_name: str, bucket_key: str) -> pd.DataFrame | list[str]:
         pass
+
+    @abstractmethod
+    def read_with_etag(self, bucket_name: str, bucket_key: str, if_none_match: str = None) -> tuple[pd.DataFrame | list[str] | None, str]:
+        """Conditional read: returns (None, etag) when the stored object still matches `if_none_match`, otherwise (data, new_etag)"""
+        pass
     
+    @abstractmethod
+    def read_history(self, bucket_name: str, bucket_key: str, symbols: list[str] = None, start: str = None, end: str = None) -> pd.DataFrame:
+        """Read only the 'date' column plus `symbols` (None for all) for dates in [start, end] ('YYYY-MM-DD', None for open-ended)"""
+        pass
+
     @abstractmethod
     def update(self) -> None:
         pass
 
     @abstractmethod
-    def delete(self) -> None:
+    def delete(self, bucket_name: str, bucket_key: str) -> None:
         pass
\ No newline at end of file
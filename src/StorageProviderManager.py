@@ -1,12 +1,17 @@
 from StorageProviders import StorageProviders as Providers
 import pandas as pd
+from StorageCache import StorageCache, copy_cached_data
 from StorageFactory import StorageFactory
+import StorageSerialization as serialization
 
 class StorageProviderManager:
   """Main class that uses the factory and provides a unified interface"""
   
-  def __init__(self, provider: Providers):
-    self.provider = StorageFactory.create_provider(provider)
+  def __init__(self, provider: Providers, cache: StorageCache = None, invocation_cache: dict = None, **provider_kwargs):
+    self.provider = StorageFactory.create_provider(provider, **provider_kwargs)
+    self.cache = cache
+    # Parsed objects already read during the current invocation, (bucket, key) -> data; shared by every manager holding this instance
+    self.invocation_cache = invocation_cache
 
   def check_existence(
       self,
@@ -23,6 +28,36 @@ class StorageProviderManager:
     except Exception as e:
       raise e
   
+  def check_existence_many(
+      self,
+      bucket_name: str = None,
+      bucket_keys: list[str] = None,
+      **kwargs
+    ) -> dict[str, bool]:
+    try:
+      return self.provider.check_existence_many(
+        bucket_name=bucket_name,
+        bucket_keys=bucket_keys,
+        **kwargs
+      )
+    except Exception as e:
+      raise e
+
+  def list_keys(
+      self,
+      bucket_name: str = None,
+      prefix: str = '',
+      **kwargs
+    ) -> list[str]:
+    try:
+      return self.provider.list_keys(
+        bucket_name=bucket_name,
+        prefix=prefix,
+        **kwargs
+      )
+    except Exception as e:
+      raise e
+
   def create(
       self, 
       bucket_name: str = None, 
@@ -31,6 +66,8 @@ class StorageProviderManager:
       **kwargs
     ) -> None:
     try:
+      self.__forget(bucket_name, bucket_key)
+
       return self.provider.create(
         bucket_name=bucket_name,
         bucket_key=bucket_key,
@@ -47,22 +84,96 @@ class StorageProviderManager:
       **kwargs
     ) -> pd.DataFrame | list[str]:
     try:
-      return self.provider.read(
+      if self.invocation_cache is not None and (bucket_name, bucket_key) in self.invocation_cache:
+        return copy_cached_data(self.invocation_cache[(bucket_name, bucket_key)])
+
+      if self.cache is None:
+        data = self.provider.read(
+          bucket_name=bucket_name,
+          bucket_key=bucket_key,
+          **kwargs
+        )
+      else:
+        data = self.__read_through_cache(bucket_name, bucket_key, **kwargs)
+
+      if self.invocation_cache is not None:
+        self.invocation_cache[(bucket_name, bucket_key)] = copy_cached_data(data)
+
+      return data
+    except Exception as e:
+      raise e
+    
+  def read_history(
+      self,
+      bucket_name: str = None,
+      bucket_key: str = None,
+      symbols: list[str] = None,
+      start: str = None,
+      end: str = None,
+      **kwargs
+    ) -> pd.DataFrame:
+    try:
+      # Already parsed in full during this invocation: slicing it beats any partial read
+      if self.invocation_cache is not None and (bucket_name, bucket_key) in self.invocation_cache:
+        return serialization.project_history(self.invocation_cache[(bucket_name, bucket_key)], symbols, start, end).copy()
+
+      # Partial reads bypass the ETag cache, which only holds whole objects
+      return self.provider.read_history(
         bucket_name=bucket_name,
         bucket_key=bucket_key,
+        symbols=symbols,
+        start=start,
+        end=end,
         **kwargs
       )
     except Exception as e:
       raise e
-    
+
   def update(self, **kwargs) -> None:
     try:
       return self.provider.update(**kwargs)
     except Exception as e:
       raise e
 
-  def delete(self, **kwargs) -> None:
+  def delete(
+      self,
+      bucket_name: str = None,
+      bucket_key: str = None,
+      **kwargs
+    ) -> None:
     try:
-      return self.provider.delete(**kwargs)
+      self.__forget(bucket_name, bucket_key)
+
+      return self.provider.delete(
+        bucket_name=bucket_name,
+        bucket_key=bucket_key,
+        **kwargs
+      )
     except Exception as e:
-      raise e
\ No newline at end of file
+      raise e
+
+  def __read_through_cache(self, bucket_name: str, bucket_key: str, **kwargs) -> pd.DataFrame | list[str]:
+    cached = self.cache.get(bucket_name, bucket_key)
+    cached_etag = cached[0] if cached else None
+
+    data, etag = self.provider.read_with_etag(
+      bucket_name=bucket_name,
+      bucket_key=bucket_key,
+      if_none_match=cached_etag,
+      **kwargs
+    )
+
+    if data is None:
+      print(f"\t{bucket_key} has not changed since it was cached (ETag {etag}); using the cached copy")
+      return cached[1]
+
+    self.cache.put(bucket_name, bucket_key, etag, data)
+    return data
+
+  def __forget(self, bucket_name: str, bucket_key: str) -> None:
+    # The object is about to change (and get a new ETag); drop the stale copies instead of guessing the new ones
+    if self.invocation_cache is not None:
+      self.invocation_cache.pop((bucket_name, bucket_key), None)
+
+    if self.cache is not None:
+      self.cache.invalidate(bucket_name, bucket_key)
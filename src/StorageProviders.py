@@ -2,6 +2,8 @@ from enum import Enum
 
 class StorageProviders(Enum):
   AWS_S3 = "aws_s3"
+  LOCAL_FS = "local_fs"
+  IN_MEMORY = "in_memory"
   REDSHIFT = "redshift" # Not implemented but adding it as placeholder
   POSTGRESQL = "postgresql" # Not implemented but adding it as placeholder
   # GCP, Azure, IBM, etc.
\ No newline at end of file
@@ -0,0 +1,190 @@
+import io
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import StorageCodecs as codecs
+
+DATE_FORMAT = '%Y-%m-%d'
+READ_CHUNK_SIZE = 1024 * 1024
+# Row groups are laid out from the newest row back: the last month of trading days in a group of its own, older rows a year per group.
+# Recent-window reads (the common date-ranged read) skip everything but the newest group through the 'date' column statistics,
+# while full reads stay at a couple of row groups; a wide matrix in monthly groups throughout has ~5x slower full reads
+PARQUET_RECENT_ROW_GROUP_SIZE = 21
+PARQUET_ROW_GROUP_SIZE = 252
+
+def read_object(bucket_key: str, stream, content_encoding: str = None) -> pd.DataFrame | list[str]:
+  """Decompress and parse a stored object according to its key (and Content-Encoding, when the key has no codec suffix)."""
+  # Objects written before compression was enabled have neither a codec suffix nor a Content-Encoding and are read raw
+  codec = codecs.detect_codec(bucket_key, content_encoding)
+  body = codecs.decompressing_reader(stream, codec)
+  base_key = codecs.strip_codec_suffix(bucket_key)
+
+  if base_key.endswith('.csv'):
+    return read_csv(body)
+  elif base_key.endswith('.txt'):
+    return read_txt(body)
+  elif base_key.endswith('.parquet'):
+    # Parquet needs random access to its footer; only buffer the object when the stream cannot seek
+    if codec is None and _is_seekable(body):
+      return read_parquet(body)
+    return read_parquet(io.BytesIO(body.read()))
+  else:
+    raise NotImplementedError(f"Reading files of type other than CSV, TXT or Parquet is not implemented. Provided key (filename): {bucket_key}")
+
+def read_history(bucket_key: str, source, content_encoding: str = None, symbols: list[str] = None, start: str = None, end: str = None) -> pd.DataFrame:
+  """
+  Read only the 'date' column plus `symbols` (all columns when None), for dates between `start` and `end` (inclusive, 'YYYY-MM-DD').
+  Raw Parquet read from a seekable source only touches the matching row groups and column chunks; any other object is read whole and then sliced.
+  """
+  codec = codecs.detect_codec(bucket_key, content_encoding)
+  if codec is None and bucket_key.endswith('.parquet') and _is_seekable(source):
+    return _read_parquet_history(source, symbols, start, end)
+
+  return project_history(read_object(bucket_key, source, content_encoding), symbols, start, end)
+
+def project_history(df: pd.DataFrame, symbols: list[str] = None, start: str = None, end: str = None) -> pd.DataFrame:
+  """In-memory equivalent of read_history for an already parsed frame; symbols that are not in the frame are skipped"""
+  if symbols is not None:
+    df = df[['date'] + [symbol for symbol in symbols if symbol in df.columns and symbol != 'date']]
+
+  start, end = _normalize_date(start), _normalize_date(end)
+  if start is not None:
+    df = df[df['date'] >= start]
+  if end is not None:
+    df = df[df['date'] <= end]
+
+  return df.reset_index(drop=True)
+
+def write_object(bucket_key: str, data: pd.DataFrame | list, target, compression: str = None, compression_level: int = None) -> str | None:
+  """
+  Serialize `data` into the binary buffer `target` according to its key and return the Content-Encoding to store with it.
+  `compression` is the default codec for CSV keys without a codec suffix; Parquet always uses its own snappy column compression.
+  """
+  base_key = codecs.strip_codec_suffix(bucket_key)
+  suffix_codec = codecs.detect_codec(bucket_key)
+
+  if base_key.endswith('.csv'):
+    if not isinstance(data, pd.DataFrame):
+      raise ValueError("Data must be a DataFrame to create a CSV file.")
+
+    codec = suffix_codec or compression
+    with codecs.compressing_writer(target, codec, compression_level) as writer:
+      write_csv(data, writer)
+    return codec
+  elif base_key.endswith('.parquet'):
+    if not isinstance(data, pd.DataFrame):
+      raise ValueError("Data must be a DataFrame to create a Parquet file.")
+
+    if suffix_codec is None:
+      # Parquet compresses each column chunk itself (snappy), which keeps the file splittable; no outer Content-Encoding.
+      # `compression` is left to the text formats: gzip inside Parquet makes the file bigger and slower to decode than a gzip CSV
+      write_parquet(data, target)
+      return None
+
+    with codecs.compressing_writer(target, suffix_codec, compression_level) as writer:
+      write_parquet(data, writer)
+    return suffix_codec
+  else:
+    raise NotImplementedError(f"Creating files of type other than CSV or Parquet is not implemented. Provided key (filename): {bucket_key}")
+
+def read_csv(stream) -> pd.DataFrame:
+  """Parse a CSV straight from a binary stream (a botocore StreamingBody, an open file...), without decoding it to a str first."""
+  return pd.read_csv(stream)
+
+def read_txt(stream) -> list[str]:
+  """Read the lines of a UTF-8 text object from a binary stream, decoding one line at a time."""
+  text_lines = [line.decode('utf-8') for line in _iter_byte_lines(stream)]
+
+  # If the last line is empty, remove it
+  if text_lines and text_lines[-1] == '':
+    text_lines.pop()
+
+  return text_lines
+
+def read_parquet(source) -> pd.DataFrame:
+  """Read a Parquet object back into the shape the CSV path produces: a 'date' string column plus the value columns."""
+  df = pd.read_parquet(source, engine='pyarrow')
+  if 'date' in df.columns:
+    df['date'] = pd.to_datetime(df['date']).dt.strftime(DATE_FORMAT)
+  return df
+
+def write_csv(df: pd.DataFrame, target) -> None:
+  """Write a DataFrame as UTF-8 CSV bytes into a binary buffer or stream."""
+  df.to_csv(target, mode='wb', index=False, encoding='utf-8')
+
+def write_parquet(df: pd.DataFrame, target, compression: str = 'snappy', compression_level: int = None) -> None:
+  """Write a DataFrame as Parquet, storing 'date' as a real date column and numeric columns as float64. Compression is applied per column chunk."""
+  typed_df = df.copy(deep=False)
+  if 'date' in typed_df.columns:
+    typed_df['date'] = pd.to_datetime(typed_df['date']).dt.date
+
+  numeric_cols = typed_df.select_dtypes(include='number').columns
+  if len(numeric_cols) > 0:
+    typed_df[numeric_cols] = typed_df[numeric_cols].astype('float64')
+
+  table = pa.Table.from_pandas(typed_df, preserve_index=False)
+  # Only the 'date' statistics are used (to prune row groups); per-column statistics of thousands of symbols would only bloat the footer
+  write_statistics = ['date'] if 'date' in typed_df.columns else True
+  with pq.ParquetWriter(target, table.schema, compression=compression, compression_level=compression_level, write_statistics=write_statistics) as writer:
+    for start, stop in _row_group_bounds(table.num_rows):
+      writer.write_table(table.slice(start, stop - start))
+
+def _read_parquet_history(source, symbols: list[str] | None, start: str | None, end: str | None) -> pd.DataFrame:
+  # pre_buffer coalesces the selected column chunks into a few large reads, which matters when every read is an S3 ranged GET
+  parquet_file = pq.ParquetFile(source, pre_buffer=True)
+  column_names = parquet_file.schema_arrow.names
+  if 'date' not in column_names:
+    return project_history(read_parquet(source), symbols, start, end)
+
+  columns = None
+  if symbols is not None:
+    columns = ['date'] + [symbol for symbol in symbols if symbol in column_names and symbol != 'date']
+
+  # Keep only the row groups whose [min, max] date statistics overlap the requested range
+  start_date = pd.Timestamp(start).date() if start is not None else None
+  end_date = pd.Timestamp(end).date() if end is not None else None
+  date_index = column_names.index('date')
+  row_groups = []
+  for i in range(parquet_file.num_row_groups):
+    stats = parquet_file.metadata.row_group(i).column(date_index).statistics
+    if stats is not None and stats.has_min_max:
+      if (end_date is not None and stats.min > end_date) or (start_date is not None and stats.max < start_date):
+        continue
+    row_groups.append(i)
+
+  df = parquet_file.read_row_groups(row_groups, columns=columns).to_pandas()
+  df['date'] = pd.to_datetime(df['date']).dt.strftime(DATE_FORMAT)
+  # Row groups are coarse; trim the rows outside the range
+  return project_history(df, None, start, end)
+
+def _row_group_bounds(n_rows: int) -> list[tuple[int, int]]:
+  """[start, stop) of each row group: the newest PARQUET_RECENT_ROW_GROUP_SIZE rows, then PARQUET_ROW_GROUP_SIZE rows at a time going back"""
+  recent_start = max(n_rows - PARQUET_RECENT_ROW_GROUP_SIZE, 0)
+  starts = sorted({0, *range(recent_start, 0, -PARQUET_ROW_GROUP_SIZE)})
+  return list(zip(starts, [*starts[1:], n_rows]))
+
+def _normalize_date(value) -> str | None:
+  if value is None:
+    return None
+  return pd.Timestamp(value).strftime(DATE_FORMAT)
+
+def _is_seekable(stream) -> bool:
+  seekable = getattr(stream, 'seekable', None)
+  return bool(seekable()) if callable(seekable) else False
+
+def _iter_byte_lines(stream):
+  pending = b''
+  while True:
+    chunk = stream.read(READ_CHUNK_SIZE)
+    if not chunk:
+      break
+
+    lines = (pending + chunk).splitlines(keepends=True)
+    pending = lines.pop() if lines else b''
+    for line in lines:
+      yield line.splitlines()[0]
+
+  if pending:
+    yield pending.splitlines()[0]
@@ -0,0 +1,130 @@
+import threading
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from HistDataGapDetector import TRADING_DAY, last_completed_trading_day
+from StorageSerialization import DATE_FORMAT
+
+# Trading days per period unit, for the providers' 'period' strings ('5d', '1mo', '1y', ...)
+PERIOD_UNIT_DAYS = {'d': 1, 'wk': 5, 'mo': 21, 'y': 252}
+
+# Module-level so the synthetic stock data and screener providers of a run (and of warm invocations) share one market
+_MARKETS = {}
+_LOCK = threading.Lock()
+
+class SyntheticMarket:
+  """
+  A seeded, reproducible market of `n_symbols` random-walk price histories over the `history_days` trading days ending on `end_date`.
+  Defects are injected to exercise the validation paths: NaN cells (some in the last row), trading days missing from every history,
+  and delisted symbols whose prices stop mid-history and that have no quote anymore.
+  Prices are generated per symbol on demand, so a market of any size costs only what is requested from it.
+  """
+
+  def __init__(self, n_symbols: int, history_days: int, seed: int = 7, end_date: str = None, nan_rate: float = 0.01, missing_date_rate: float = 0.002, delisted_rate: float = 0.005):
+    if n_symbols < 1 or history_days < 2:
+      raise ValueError("A synthetic market needs at least 1 symbol and 2 trading days of history.")
+
+    self.seed = seed
+    end_date = end_date or last_completed_trading_day()
+    self.calendar = pd.date_range(end=end_date, periods=history_days, freq=TRADING_DAY).strftime(DATE_FORMAT).tolist()
+    self.symbols = [f"SYN{i:05d}" for i in range(n_symbols)]
+    self.positions = {symbol: i for i, symbol in enumerate(self.symbols)}
+
+    rng = np.random.default_rng(seed)
+    self.start_prices = rng.uniform(5, 500, size=n_symbols)
+    self.shares_outstanding = rng.uniform(1e7, 5e9, size=n_symbols)
+    # The last day is never missing, so the latest close always exists
+    n_missing = int(missing_date_rate * (history_days - 1))
+    self.missing_dates = set(rng.choice(self.calendar[:-1], size=n_missing, replace=False).tolist()) if n_missing else set()
+    delisted = np.flatnonzero(rng.random(n_symbols) < delisted_rate)
+    self.delisted_at = {int(i): int(rng.integers(history_days // 2, history_days - 1)) for i in delisted}
+    # One to three NaN cells per affected symbol; a third of them in the last row, which the historical data checks try to repair
+    self.nan_cells = {}
+    for i in np.flatnonzero(rng.random(n_symbols) < nan_rate):
+      cells = rng.choice(history_days, size=int(rng.integers(1, 4)), replace=False).tolist()
+      if rng.random() < 1 / 3:
+        cells = [history_days - 1]
+      self.nan_cells[int(i)] = cells
+
+  @staticmethod
+  def get(**params) -> 'SyntheticMarket':
+    """The shared market for these parameters, created on first use"""
+    key = tuple(sorted(params.items()))
+    with _LOCK:
+      if key not in _MARKETS:
+        _MARKETS[key] = SyntheticMarket(**params)
+      return _MARKETS[key]
+
+  def listed_symbols(self) -> list[str]:
+    return [symbol for i, symbol in enumerate(self.symbols) if i not in self.delisted_at]
+
+  def history(self, symbols: list, period: str = None, start: str = None, end: str = None) -> pd.DataFrame:
+    """'date' plus one column per known symbol, for [start, end) or the last `period`; unknown symbols are left out, like the real providers do"""
+    days = self.calendar
+    if period is not None:
+      days = days[-self.__period_days(period):]
+    if start is not None:
+      days = [day for day in days if day >= start]
+    if end is not None:
+      days = [day for day in days if day < end]
+
+    rows = [self.calendar.index(days[0]) + i for i in range(len(days))] if days else []
+    keep = [i for i, day in enumerate(days) if day not in self.missing_dates]
+    known = [symbol for symbol in dict.fromkeys(symbols) if symbol in self.positions]
+
+    columns = {}
+    for symbol in known:
+      prices = self.__price_path(self.positions[symbol])[rows]
+      columns[symbol] = prices[keep]
+    df = pd.DataFrame(columns, index=range(len(keep)))
+    df.insert(0, 'date', pd.Series([days[i] for i in keep], dtype=object))
+    return df
+
+  def quote(self, symbol: str) -> dict:
+    """Latest quote fields of a listed symbol; unknown and delisted symbols get an empty dict, like a failed lookup"""
+    position = self.positions.get(symbol)
+    if position is None or position in self.delisted_at:
+      return {}
+
+    # Quotes never have NaNs: they are what repairs the last-row NaNs of the histories
+    price = float(np.round(self.__walk(position)[-1], 2))
+    rng = np.random.default_rng([self.seed, position, 1])
+    return {
+      'symbol': symbol,
+      'regularMarketPrice': price,
+      'preMarketPrice': float(np.round(price * (1 + rng.normal(0, 0.01)), 2)),
+      'marketCap': float(np.round(price * self.shares_outstanding[position])),
+    }
+
+  def screener(self, screener_name: str, count: int) -> list[dict]:
+    """`count` listed symbols picked by the screener's name, so each screener returns the same quotes on every call"""
+    listed = self.listed_symbols()
+    rng = np.random.default_rng([self.seed, zlib.crc32(screener_name.encode('utf-8'))])
+    picked = rng.choice(len(listed), size=min(count, len(listed)), replace=False)
+    return [self.quote(listed[i]) for i in sorted(picked)]
+
+  #region Private methods
+  def __walk(self, position: int) -> np.ndarray:
+    rng = np.random.default_rng([self.seed, position])
+    returns = rng.normal(0.0003, 0.02, size=len(self.calendar))
+    return self.start_prices[position] * np.exp(np.cumsum(returns))
+
+  def __price_path(self, position: int) -> np.ndarray:
+    prices = np.round(self.__walk(position), 2)
+    if position in self.delisted_at:
+      prices[self.delisted_at[position] + 1:] = np.nan
+    for cell in self.nan_cells.get(position, []):
+      prices[cell] = np.nan
+    return prices
+
+  def __period_days(self, period: str) -> int:
+    for unit, unit_days in PERIOD_UNIT_DAYS.items():
+      if period.endswith(unit) and period[:-len(unit)].isdigit():
+        return int(period[:-len(unit)]) * unit_days
+    if period == 'max':
+      return len(self.calendar)
+    raise ValueError(f"Unsupported period: {period}")
+
+  #endregion
@@ -0,0 +1,47 @@
+import threading
+import time
+
+class TokenBucket:
+  """Thread-safe token bucket: holds up to `capacity` tokens and refills at `rate_per_second`"""
+
+  def __init__(self, rate_per_second: float, capacity: float):
+    if rate_per_second <= 0 or capacity <= 0:
+      raise ValueError("The 'rate_per_second' and 'capacity' of a token bucket must be positive numbers.")
+
+    self.rate_per_second = rate_per_second
+    self.capacity = capacity
+    # Start full so the first requests of an invocation go out right away
+    self.tokens = capacity
+    self.last_refill = time.monotonic()
+    self.lock = threading.Lock()
+
+  def available(self) -> float:
+    with self.lock:
+      self.__refill()
+      return self.tokens
+
+  def seconds_until(self, cost: float = 1) -> float:
+    """Seconds until `cost` tokens will have been added, without taking any; the cost may exceed the capacity when it is paid one token at a time"""
+    with self.lock:
+      self.__refill()
+      return max(cost - self.tokens, 0) / self.rate_per_second
+
+  def try_acquire(self, cost: float = 1) -> float:
+    """Take `cost` tokens and return 0 if there are enough, otherwise take nothing and return the seconds until there will be"""
+    if cost > self.capacity:
+      raise ValueError(f"A cost of {cost} tokens can never be satisfied by a bucket with a capacity of {self.capacity}.")
+
+    with self.lock:
+      self.__refill()
+      if self.tokens >= cost:
+        self.tokens -= cost
+        return 0.0
+      return (cost - self.tokens) / self.rate_per_second
+
+  #region Private methods
+  def __refill(self) -> None:
+    now = time.monotonic()
+    self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate_per_second)
+    self.last_refill = now
+
+  #endregion
@@ -11,9 +11,51 @@ C = {
    "s3_all_stocks_csv_name": 'all_stocks.csv', # Sample available in src/s3_files_samples
    "s3_otc_stocks_txt_name": 'otc_stocks.txt', # Sample available in src/s3_files_samples
    "s3_currently_invested_stocks_txt_name": 'currently_invested_stocks.txt', # Sample available in src/s3_files_samples
-   "s3_historical_data_csv_name": 'stocks_historical_data.csv', # Sample available in src/s3_files_samples
+   "s3_historical_data_csv_name": 'stocks_historical_data.csv', # Legacy format, only read by the 'migrate_historical_data_to_parquet' scenario
+   "s3_historical_data_file_name": 'stocks_historical_data.parquet', # Typed columnar copy of the CSV above
+   "s3_historical_data_deltas_prefix": 'stocks_historical_data_deltas/', # One object per closing day, folded into the file above by 'upsert_historical_data'
    "s3_screeners_file_name": 'ms_screeners.txt', # Sample available in src/s3_files_samples
 
+  # Storage compression: applied as Content-Encoding to CSV keys without a '.gz'/'.zst' suffix; Parquet keeps its own snappy column compression
+  # 'zstd' level 3 matches gzip level 6's ratio with faster encoding (see benchmarks/compression_benchmark.py) but needs the optional 'zstandard' package
+  "storage_compression": 'gzip',
+  "storage_compression_level": 6,
+  # Concurrent ranged GETs / multipart upload parts (and pooled S3 connections) per transfer
+  "storage_max_concurrency": 8,
+
+  # Stock data providers' request quotas, one token bucket per provider (see StockDataProviderPool); 'burst' is how many requests may go out back to back
+  # These defaults keep the previous fixed schedule's budget (about 6 requests per minute across both providers); raise them up to the providers' real quotas
+  "stock_data_rate_limits": {
+    'yfinance': {'requests_per_minute': 3, 'burst': 3},
+    'yahooquery': {'requests_per_minute': 3, 'burst': 3},
+    'synthetic': {'requests_per_minute': 600_000, 'burst': 10_000}, # Generated locally, only used by 'data_mode': 'synthetic'
+  },
+
+  # Historical data batches that fail, come back empty or run past their provider's latency percentile are also sent to the other provider (None disables it)
+  # No latency hedging until a provider has 'min_samples' timings; 'max_workers' bounds the requests (hedges included) in flight
+  "stock_data_hedging": {'percentile': 95, 'min_samples': 5, 'max_workers': 8},
+
+  # Concurrent requests / pooled keep-alive connections per stock data provider session (sessions are reused across warm invocations)
+  "stock_data_http_pool_size": 8,
+  # Quote/info cache: an entry is reused for its market phase's TTL (pre, regular, post, closed; US Eastern hours) and never across a phase change
+  "quote_cache_ttl_seconds": {'pre': 120, 'regular': 60, 'post': 300, 'closed': 6 * 3600},
+  "quote_cache_max_entries": 20_000,
+  "quote_cache_dir": '/tmp/quote_cache', # None keeps the cache in memory only
+  # Symbols per historical data request; formatting is a single reshape, so larger batches mean fewer requests against the rate limits
+  "hist_data_batch_size": 20,
+  # Historical data batches fetched concurrently by 'upsert_historical_data' (the rate limits above still apply)
+  "hist_data_fetch_workers": 4,
+  # Failed batches: transient errors are retried with exponential backoff and jitter, other errors split the batch until the bad symbols are isolated
+  # The budget caps the extra requests of a whole run (retries plus halves), so a bad day cannot blow through the rate limits above
+  "hist_data_retry_budget": 40,
+  "hist_data_retry_max_attempts": 3,
+  "hist_data_retry_base_delay_seconds": 2,
+
+  # Storage cache configuration (/tmp survives across warm Lambda invocations)
+  "storage_cache_dir": '/tmp/storage_cache',
+  "storage_cache_max_bytes": 256 * 1024 * 1024,
+  "storage_cache_memory_max_bytes": 256 * 1024 * 1024, # Parsed objects kept in memory, bounded separately from the files on disk
+
   # Excel configuration
   "excel_temp_file_path": '/tmp/stocks_analysis.xlsx',
   "excel_email_file_name": 'stocks_analysis.xlsx',
@@ -21,4 +63,21 @@ C = {
   # Screeners configuration
   'symbols_per_screener': 250,
   'market_cap_threshold': 5_000_000_000,
+  'stats_market_cap_threshold': 2_000_000_000, # Daily scenarios (closing prices, pre-market stats) also cover stocks between $2B and the threshold above
+  'screener_cache_ttl_seconds': 300, # Screener results are reused for this long, also across warm invocations
+
+  # Offline runs (see ScenarioBuilder and benchmarks/scenario_replay_benchmark.py)
+  # 'live' calls the providers; 'record' calls them and saves every response under 'recordings_dir'; 'replay' serves the saved responses instead, no network needed
+  "data_mode": 'live',
+  "recordings_dir": '/tmp/recordings',
+  "replay_latency_seconds": 0.0, # Simulated network time per replayed call
+  "recorded_stock_data_provider": 'yahooquery', # Recording and replaying go through this provider only, so every run makes the same calls
+  # 'data_mode': 'synthetic' generates prices, quotes and screeners instead (see SyntheticMarket for the defects it injects)
+  "synthetic_market": {'n_symbols': 2_000, 'history_days': 252, 'seed': 7, 'nan_rate': 0.01, 'missing_date_rate': 0.002, 'delisted_rate': 0.005},
+  # 'aws_s3' or 'local_fs' (every bucket is a directory under 'storage_local_root_dir')
+  "storage_provider": 'aws_s3',
+  "storage_local_root_dir": '/tmp/storage',
+  "email_dry_run": False, # Print emails instead of sending them
+  "skip_schedule_checks": False, # Run the scenarios outside their market hours windows
+  "hist_data_as_of_date": None, # 'YYYY-MM-DD' pins the last trading day the upsert fills up to (None: the last completed session)
 }
\ No newline at end of file
@@ -1,18 +1,10 @@
 # Python packages (in alphabetical order)
-import boto3
 import json
 
 # Third party packages (in alphabetical order)
 import config as cfg
 from Emailer import Emailer
-from HistDataManager import HistDataManager
-from ListManager import ListManager
-from ScenarioHandler import ScenarioHandler
-from StockDataProviders import StockDataProviders
-from StockDataProviderManager import StockDataProviderManager
-from StocksManager import StocksManager
-from StorageProviders import StorageProviders
-from StorageProviderManager import StorageProviderManager
+from ScenarioBuilder import ScenarioBuilder
 
 # If for some reason I need to roll back to the PDF logging version, the commit to look for is: 7bd697332aa017d230f2bae1a94e7fd8527b2a68
 
@@ -30,7 +22,7 @@ def validate_event(event: dict) -> None:
       raise ValueError("The 'scenario' value cannot be empty or falsy.")
 
 def send_email_error(event: dict, E: Exception) -> None:
-  emailer = Emailer(cfg.C['email_user'], cfg.C['email_pwd'])
+  emailer = Emailer(cfg.C['email_user'], cfg.C['email_pwd'], dry_run=cfg.C['email_dry_run'])
   emailer.set_email_params(
     to=cfg.C['email_to'], 
     subject=f"Error in stocksStats Lambda: {event.get('scenario', 'No scenario provided')}", 
@@ -42,20 +34,8 @@ def lambda_handler(event, context):
   try:
     validate_event(event)
 
-    storage_manager = StorageProviderManager(StorageProviders.AWS_S3)
-    yahoo_finance_data_manager = StockDataProviderManager(StockDataProviders.YAHOO_FINANCE)
-    yahoo_query_data_manager = StockDataProviderManager(StockDataProviders.YAHOO_QUERY)
-    emailer = Emailer(cfg.C['email_user'], cfg.C['email_pwd'])
-    scenario = event['scenario']
-    s3 = boto3.client('s3')
-
-    list_manager = ListManager(storage_manager, emailer, yahoo_finance_data_manager, yahoo_query_data_manager, cfg.C)
-    hist_data_manager = HistDataManager(storage_manager, emailer, yahoo_finance_data_manager, yahoo_query_data_manager, cfg.C)
-    # TODO update StocksManager to use `storage_manager` instead of `s3` directly
-    # TODO refactor StocksManager logic; OOP; break it into multiple classes; rename maybe to StatsManager or MetricsManager (created issue: https://github.com/muelitas/stocksStats/issues/8)
-    stocks_manager = StocksManager(s3, emailer, cfg.C)
-
-    scenario_handler = ScenarioHandler(scenario, list_manager, hist_data_manager, stocks_manager)
+    # Live providers and S3 by default; 'data_mode' and 'storage_provider' switch to recorded/replayed data and local storage
+    scenario_handler = ScenarioBuilder(cfg.C).build(event['scenario'])
     scenario_handler.handle_scenario()
 
   except Exception as E:
@@ -0,0 +1,92 @@
+import contextlib
+import io
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from BatchRetryEngine import BatchRetryEngine, is_transient_error
+
+class FakeFetch:
+  """Fails every request containing BAD, and the first `transient_failures` requests with a rate limit error"""
+
+  def __init__(self, transient_failures: int = 0):
+    self.transient_failures = transient_failures
+    self.requests = []
+
+  def __call__(self, batch: list) -> list:
+    self.requests.append(list(batch))
+    if self.transient_failures:
+      self.transient_failures -= 1
+      raise RuntimeError("429 Too Many Requests")
+    if 'BAD' in batch:
+      raise KeyError('BAD')
+    return list(batch)
+
+def batch_with_bad_symbol(size: int = 16, bad_index: int = 13) -> list:
+  batch = [f"S{i}" for i in range(size)]
+  batch[bad_index] = 'BAD'
+  return batch
+
+class BatchRetryEngineTest(unittest.TestCase):
+  def run_engine(self, engine: BatchRetryEngine, batch: list, fetch: FakeFetch) -> list:
+    with contextlib.redirect_stdout(io.StringIO()):
+      return engine.run(batch, fetch)
+
+  def test_bisects_down_to_the_bad_symbol(self):
+    batch, fetch = batch_with_bad_symbol(), FakeFetch()
+    engine = BatchRetryEngine(retry_budget=100, base_delay_seconds=0)
+
+    pieces = self.run_engine(engine, batch, fetch)
+
+    self.assertEqual([symbol for sub_batch, _, _ in pieces for symbol in sub_batch], batch)
+    self.assertEqual([sub_batch for sub_batch, _, error in pieces if error is not None], [['BAD']])
+    self.assertEqual(sum(len(result) for _, result, error in pieces if error is None), 15)
+    # 4 splits of 2 requests each on the way down from 16 symbols to 1
+    self.assertEqual(engine.retries_used, 8)
+    self.assertEqual(len(fetch.requests), 9)
+
+  def test_limited_budget_stops_bisecting_and_fails_the_remaining_half(self):
+    batch, fetch = batch_with_bad_symbol(), FakeFetch()
+    engine = BatchRetryEngine(retry_budget=5, base_delay_seconds=0)
+
+    pieces = self.run_engine(engine, batch, fetch)
+
+    self.assertEqual([(len(sub_batch), error is None) for sub_batch, _, error in pieces], [(8, True), (4, True), (4, False)])
+    self.assertIsInstance(pieces[-1][2], KeyError)
+    self.assertIn('BAD', pieces[-1][0])
+    self.assertEqual(engine.retries_used, 4)
+    self.assertEqual(len(fetch.requests), 1 + engine.retries_used)
+
+  def test_no_budget_fails_the_whole_batch_with_a_single_request(self):
+    batch, fetch = batch_with_bad_symbol(), FakeFetch()
+    engine = BatchRetryEngine(retry_budget=0, base_delay_seconds=0)
+
+    pieces = self.run_engine(engine, batch, fetch)
+
+    self.assertEqual([(sub_batch, result) for sub_batch, result, _ in pieces], [(batch, None)])
+    self.assertEqual(len(fetch.requests), 1)
+
+  def test_transient_errors_are_retried_without_splitting(self):
+    batch, fetch = [f"S{i}" for i in range(8)], FakeFetch(transient_failures=2)
+    engine = BatchRetryEngine(retry_budget=10, max_attempts=3, base_delay_seconds=0)
+
+    pieces = self.run_engine(engine, batch, fetch)
+
+    self.assertEqual(pieces, [(batch, batch, None)])
+    self.assertEqual(engine.retries_used, 2)
+    self.assertEqual(fetch.requests, [batch] * 3)
+
+  def test_exhausted_transient_errors_are_not_bisected(self):
+    batch, fetch = [f"S{i}" for i in range(8)], FakeFetch(transient_failures=5)
+    engine = BatchRetryEngine(retry_budget=10, max_attempts=2, base_delay_seconds=0)
+
+    pieces = self.run_engine(engine, batch, fetch)
+
+    self.assertEqual(len(pieces), 1)
+    self.assertTrue(is_transient_error(pieces[0][2]))
+    self.assertEqual(len(fetch.requests), 2)
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,89 @@
+import contextlib
+import io
+import os
+import sys
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from HistDataGapDetector import trading_days
+from HistDataManager import HistDataManager
+
+class NyseHolidayCalendarTest(unittest.TestCase):
+  def test_saturday_new_years_day_keeps_dec_31_as_a_trading_day(self):
+    # 2022-01-01 was a Saturday: NYSE traded on Friday 2021-12-31 and did not close on Monday 2022-01-03
+    self.assertEqual(trading_days('2021-12-30', '2022-01-04'), ['2021-12-30', '2021-12-31', '2022-01-03', '2022-01-04'])
+
+  def test_sunday_new_years_day_is_observed_on_monday(self):
+    self.assertEqual(trading_days('2022-12-30', '2023-01-04'), ['2022-12-30', '2023-01-03', '2023-01-04'])
+
+  def test_saturday_christmas_is_observed_on_friday(self):
+    self.assertEqual(trading_days('2021-12-23', '2021-12-27'), ['2021-12-23', '2021-12-27'])
+
+class FillGapsTest(unittest.TestCase):
+  CFG = {
+    'skip_schedule_checks': True,
+    's3_bucket': 'bucket',
+    's3_all_stocks_csv_name': 'all_stocks.csv',
+    's3_historical_data_file_name': 'stocks_historical_data.parquet',
+    'email_to': 'someone@example.com',
+    'hist_data_batch_size': 20,
+    'hist_data_fetch_workers': 4,
+    'hist_data_retry_budget': 0,
+    'hist_data_retry_max_attempts': 1,
+    'hist_data_retry_base_delay_seconds': 0,
+    'hist_data_as_of_date': '2026-10-16',
+  }
+
+  def setUp(self):
+    self.days = trading_days('2026-08-03', '2026-10-16')
+    self.listed = [f"S{i}" for i in range(30)]
+    # Three trading days behind, with a symbol that has since been removed from the stocks list
+    stored_days = self.days[:-3]
+    self.stored_df = pd.DataFrame({'date': stored_days, **{symbol: np.arange(len(stored_days), dtype=float) for symbol in [*self.listed, 'DELISTED']}})
+
+    self.pool = mock.Mock()
+    self.pool.get_historical_data.side_effect = self.history
+    self.s3_mgr = mock.Mock()
+    self.s3_mgr.read.return_value = pd.DataFrame({'symbol': self.listed})
+
+  def history(self, batch: list, start: str = None, end: str = None, **kwargs) -> pd.DataFrame:
+    dates = [day for day in self.days if start <= day < end]
+    return pd.DataFrame({'date': dates, **{symbol: [100.0] * len(dates) for symbol in batch}})
+
+  def update(self, stored_df: pd.DataFrame) -> tuple[HistDataManager, pd.DataFrame]:
+    hd_store = mock.Mock()
+    hd_store.read.return_value = stored_df.copy()
+    hd_store.write.return_value = 0
+    manager = HistDataManager(self.s3_mgr, hd_store, mock.Mock(), self.pool, self.CFG)
+    with contextlib.redirect_stdout(io.StringIO()):
+      manager._HistDataManager__update()
+    return manager, hd_store.write.call_args.args[0]
+
+  def test_unlisted_symbols_are_dropped_when_new_days_are_added(self):
+    manager, updated_df = self.update(self.stored_df)
+
+    self.assertEqual(updated_df['date'].iloc[-1], '2026-10-16')
+    self.assertEqual(len(updated_df), len(self.stored_df))
+    self.assertNotIn('DELISTED', updated_df.columns)
+    self.assertFalse(updated_df.isna().any().any())
+    self.assertEqual(manager.nan_reports[-1]['unlisted'], ['DELISTED'])
+    self.assertIn('DELISTED', manager._HistDataManager__merged_nan_report()['dropped'])
+
+  def test_next_update_keeps_every_symbol(self):
+    _, updated_df = self.update(self.stored_df)
+    self.days.append('2026-10-19')
+    self.CFG = {**self.CFG, 'hist_data_as_of_date': '2026-10-19'}
+
+    manager, next_df = self.update(updated_df)
+
+    self.assertEqual(next_df['date'].iloc[-1], '2026-10-19')
+    self.assertEqual(list(next_df.columns), list(updated_df.columns))
+    self.assertEqual(manager._HistDataManager__merged_nan_report()['dropped'], [])
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,101 @@
+import contextlib
+import io
+import os
+import sys
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from HistDataManager import HistDataManager
+
+CFG = {
+  'skip_schedule_checks': True,
+  's3_bucket': 'bucket',
+  's3_all_stocks_csv_name': 'all_stocks.csv',
+  's3_historical_data_file_name': 'stocks_historical_data.parquet',
+  'email_to': 'someone@example.com',
+  'hist_data_batch_size': 100,
+  'hist_data_fetch_workers': 4,
+  'hist_data_retry_budget': 0,
+  'hist_data_retry_max_attempts': 1,
+  'hist_data_retry_base_delay_seconds': 0,
+  'hist_data_as_of_date': None,
+}
+
+def wide_frame(n_days: int = 30, n_symbols: int = 300) -> pd.DataFrame:
+  rng = np.random.default_rng(3)
+  df = pd.DataFrame(rng.uniform(5, 500, size=(n_days, n_symbols)), columns=[f"S{i}" for i in range(n_symbols)])
+  df.insert(0, 'date', pd.bdate_range('2026-08-03', periods=n_days).strftime('%Y-%m-%d'))
+  return df
+
+class NanValidationTest(unittest.TestCase):
+  def setUp(self):
+    self.df = wide_frame()
+    # Multiple NaNs, including one in the last row
+    for symbol in ('S1', 'S50', 'S299'):
+      self.df.loc[[3, 17, 29], symbol] = np.nan
+    # A single NaN before the last row
+    for symbol in ('S2', 'S120'):
+      self.df.loc[0, symbol] = np.nan
+    # A single NaN in the last row: repaired with regularMarketPrice, unless the lookup has no usable price for it
+    for symbol in ('S3', 'S4', 'S200', 'S201', 'S202'):
+      self.df.loc[29, symbol] = np.nan
+
+    infos = {'S3': {'regularMarketPrice': 12.5}, 'S4': {'regularMarketPrice': '13.25'}, 'S200': {'regularMarketPrice': None}, 'S201': "HTTPError('404')"}
+    self.pool = mock.Mock()
+    self.pool.get_stocks_info.return_value = infos
+    self.manager = HistDataManager(mock.Mock(), mock.Mock(), mock.Mock(), self.pool, CFG)
+
+  def validate(self, df: pd.DataFrame) -> tuple[pd.DataFrame, dict]:
+    with contextlib.redirect_stdout(io.StringIO()):
+      return self.manager._HistDataManager__validate_nans(df, 'the wide frame')
+
+  def test_classifies_every_nan_pattern(self):
+    validated, report = self.validate(self.df.copy())
+
+    self.assertEqual(report['multiple_nans'], ['S1', 'S50', 'S299'])
+    self.assertEqual(report['non_last_row_nans'], ['S2', 'S120'])
+    self.assertEqual(report['repaired'], {'S3': 12.5, 'S4': 13.25})
+    self.assertEqual(sorted(report['unrepaired']), ['S200', 'S201', 'S202'])
+    self.assertEqual(sorted(self.pool.get_stocks_info.call_args.args[0]), ['S200', 'S201', 'S202', 'S3', 'S4'])
+
+    dropped = ['S1', 'S50', 'S299', 'S2', 'S120', 'S200', 'S201', 'S202']
+    self.assertEqual(list(validated.columns), [column for column in self.df.columns if column not in dropped])
+    self.assertFalse(validated.isna().any().any())
+    self.assertEqual(validated['S4'].iloc[-1], 13.25)
+    self.assertEqual(len(self.manager.warnings), 1)
+
+  def test_clean_frame_gets_an_empty_report_and_no_warning(self):
+    validated, report = self.validate(wide_frame())
+
+    self.assertEqual((report['multiple_nans'], report['non_last_row_nans'], report['repaired'], report['unrepaired']), ([], [], {}, {}))
+    self.assertEqual(validated.shape, (30, 301))
+    self.assertEqual(self.manager.warnings, [])
+    self.pool.get_stocks_info.assert_not_called()
+
+  def test_upsert_returns_the_report_of_every_batch(self):
+    symbols = [column for column in self.df.columns if column != 'date']
+    s3_mgr = mock.Mock()
+    s3_mgr.check_existence_many.return_value = {CFG['s3_all_stocks_csv_name']: True, CFG['s3_historical_data_file_name']: False}
+    s3_mgr.read.return_value = pd.DataFrame({'symbol': symbols})
+    self.pool.get_historical_data.side_effect = lambda batch, **kwargs: self.df[['date', *batch]].copy()
+    hd_store = mock.Mock()
+    manager = HistDataManager(s3_mgr, hd_store, mock.Mock(), self.pool, CFG)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+      report = manager.upsert()
+
+    self.assertEqual(sorted(report['multiple_nans']), ['S1', 'S299', 'S50'])
+    self.assertEqual(sorted(report['non_last_row_nans']), ['S120', 'S2'])
+    self.assertEqual(report['repaired'], {'S3': 12.5, 'S4': 13.25})
+    self.assertEqual(sorted(report['dropped']), sorted(['S1', 'S50', 'S299', 'S2', 'S120', 'S200', 'S201', 'S202']))
+    # Three batches of 100 symbols, all validated
+    self.assertEqual(len(manager.nan_reports), 3)
+    self.assertEqual(hd_store.write.call_args.args[0].shape[1], 301 - 8)
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,101 @@
+from datetime import datetime
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+import zoneinfo
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import QuoteCache
+from QuoteCache import QuoteCache as Cache, market_phase
+
+TTL_SECONDS_BY_PHASE = {'pre': 300, 'regular': 60, 'post': 300, 'closed': 3600}
+
+def new_york(*args) -> datetime:
+  return datetime(*args, tzinfo=zoneinfo.ZoneInfo("America/New_York"))
+
+class MarketPhaseTest(unittest.TestCase):
+  def test_weekday_sessions(self):
+    self.assertEqual(market_phase(new_york(2026, 10, 15, 3, 59)), 'closed')
+    self.assertEqual(market_phase(new_york(2026, 10, 15, 4, 0)), 'pre')
+    self.assertEqual(market_phase(new_york(2026, 10, 15, 9, 30)), 'regular')
+    self.assertEqual(market_phase(new_york(2026, 10, 15, 16, 0)), 'post')
+    self.assertEqual(market_phase(new_york(2026, 10, 15, 20, 0)), 'closed')
+
+  def test_weekends_are_closed(self):
+    self.assertEqual(market_phase(new_york(2026, 10, 17, 12, 0)), 'closed')
+
+  def test_converts_other_timezones(self):
+    self.assertEqual(market_phase(datetime(2026, 10, 15, 14, 0, tzinfo=zoneinfo.ZoneInfo("UTC"))), 'regular')
+
+class QuoteCacheTtlTest(unittest.TestCase):
+  def setUp(self):
+    QuoteCache._MEMORY_CACHE.clear()
+    self.phase, self.now = 'regular', 1_000_000.0
+    patches = [mock.patch('QuoteCache.market_phase', lambda: self.phase), mock.patch('QuoteCache.time.time', lambda: self.now)]
+    for patch in patches:
+      patch.start()
+      self.addCleanup(patch.stop)
+    self.cache = Cache(TTL_SECONDS_BY_PHASE)
+
+  def tearDown(self):
+    QuoteCache._MEMORY_CACHE.clear()
+
+  def at(self, phase: str, seconds_later: float) -> dict:
+    self.phase, self.now = phase, 1_000_000.0 + seconds_later
+    return self.cache.get_many('yahooquery', 'price', ['AAA'])
+
+  def test_regular_session_entries_expire_after_the_regular_ttl(self):
+    self.cache.put_many('yahooquery', 'price', {'AAA': 10.0})
+
+    self.assertEqual(self.at('regular', 59), {'AAA': 10.0})
+    self.assertEqual(self.at('regular', 60), {})
+    # Expired entries are evicted, not just skipped
+    self.assertEqual(len(QuoteCache._MEMORY_CACHE), 0)
+
+  def test_closed_market_entries_live_for_the_closed_ttl(self):
+    self.phase = 'closed'
+    self.cache.put_many('yahooquery', 'price', {'AAA': 10.0})
+
+    self.assertEqual(self.at('closed', 3599), {'AAA': 10.0})
+    self.assertEqual(self.at('closed', 3600), {})
+
+  def test_entries_are_not_served_once_the_phase_changes(self):
+    self.phase = 'post'
+    self.cache.put_many('yahooquery', 'price', {'AAA': 10.0})
+
+    # Within the TTL of either phase, but last night's after-hours quote is no pre-market quote
+    self.assertEqual(self.at('pre', 10), {})
+
+  def test_entries_are_per_provider_and_field_set(self):
+    self.cache.put_many('yahooquery', 'info', {'AAA': {'regularMarketPrice': 10.0}})
+
+    self.assertEqual(self.cache.get_many('yahooquery', 'price', ['AAA']), {})
+    self.assertEqual(self.cache.get_many('yfinance', 'info', ['AAA']), {})
+    self.assertEqual(self.cache.get_many('yahooquery', 'info', ['AAA']), {'AAA': {'regularMarketPrice': 10.0}})
+
+  def test_least_recently_used_entries_are_evicted_beyond_max_entries(self):
+    cache = Cache(TTL_SECONDS_BY_PHASE, max_entries=2)
+    cache.put_many('yahooquery', 'price', {'AAA': 1.0, 'BBB': 2.0})
+    cache.get_many('yahooquery', 'price', ['AAA'])
+    cache.put_many('yahooquery', 'price', {'CCC': 3.0})
+
+    self.assertEqual(cache.get_many('yahooquery', 'price', ['AAA', 'BBB', 'CCC']), {'AAA': 1.0, 'CCC': 3.0})
+
+  def test_entries_survive_a_cold_start_through_the_cache_dir(self):
+    cache_dir = tempfile.mkdtemp(prefix='quote_cache_test_')
+    self.addCleanup(shutil.rmtree, cache_dir, ignore_errors=True)
+    Cache(TTL_SECONDS_BY_PHASE, cache_dir=cache_dir).put_many('yahooquery', 'price', {'AAA': 10.0})
+    QuoteCache._MEMORY_CACHE.clear()
+
+    self.assertEqual(Cache(TTL_SECONDS_BY_PHASE, cache_dir=cache_dir).get_many('yahooquery', 'price', ['AAA']), {'AAA': 10.0})
+
+  def test_missing_phase_ttl_is_rejected(self):
+    with self.assertRaises(ValueError):
+      Cache({'regular': 60})
+
+if __name__ == '__main__':
+  unittest.main()
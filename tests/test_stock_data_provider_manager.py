@@ -0,0 +1,67 @@
+import os
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from StockDataProviderManager import StockDataProviderManager
+from StockDataProviders import StockDataProviders
+
+class SlowProvider:
+  """Takes 150 symbols per request and records the chunks and how many of them were in flight at once"""
+
+  max_symbols_per_request = 150
+  max_concurrent_requests = 4
+
+  def __init__(self):
+    self.requests = []
+    self.in_flight = 0
+    self.max_in_flight = 0
+    self.lock = threading.Lock()
+
+  def get_stocks_info(self, symbols: list) -> dict:
+    with self.lock:
+      self.requests.append(list(symbols))
+      self.in_flight += 1
+      self.max_in_flight = max(self.max_in_flight, self.in_flight)
+    time.sleep(0.05)
+    with self.lock:
+      self.in_flight -= 1
+    return {symbol: {'symbol': symbol} for symbol in symbols}
+
+class ChunkDispatchTest(unittest.TestCase):
+  def setUp(self):
+    self.manager = StockDataProviderManager(StockDataProviders.SYNTHETIC, n_symbols=1, history_days=2)
+    self.provider = SlowProvider()
+    self.manager.provider = self.provider
+
+  def test_chunks_are_deduplicated_and_keep_the_order(self):
+    symbols = [f"S{i}" for i in range(400)]
+    chunks = self.manager.chunk_symbols([*symbols, 'S0', 'S399'])
+
+    self.assertEqual([len(chunk) for chunk in chunks], [150, 150, 100])
+    self.assertEqual([symbol for chunk in chunks for symbol in chunk], symbols)
+
+  def test_large_lookup_is_fetched_in_parallel_chunks_with_one_before_request_each(self):
+    symbols = [f"S{i}" for i in range(1000)]
+    charged = []
+
+    infos = self.manager.get_stocks_info(symbols, before_request=lambda: charged.append(1))
+
+    self.assertEqual(set(infos), set(symbols))
+    self.assertEqual(len(self.provider.requests), 7)
+    self.assertEqual(len(charged), 7)
+    self.assertGreater(self.provider.max_in_flight, 1)
+    self.assertLessEqual(self.provider.max_in_flight, self.provider.max_concurrent_requests)
+
+  def test_single_chunk_runs_on_the_calling_thread(self):
+    threads = []
+    self.manager.get_stocks_info(['AAA', 'BBB'], before_request=lambda: threads.append(threading.current_thread()))
+
+    self.assertEqual(threads, [threading.current_thread()])
+    self.assertEqual(self.provider.requests, [['AAA', 'BBB']])
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,109 @@
+import os
+import sys
+import threading
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from StockDataProviderManager import StockDataProviderManager
+from StockDataProviderPool import StockDataProviderPool
+from StockDataProviders import StockDataProviders
+from TokenBucket import TokenBucket
+
+class FakeProvider:
+  """Answers info/price lookups and records the chunk of symbols of every request"""
+
+  max_concurrent_requests = 4
+
+  def __init__(self, max_symbols_per_request: int):
+    self.max_symbols_per_request = max_symbols_per_request
+    self.requests = []
+    self.lock = threading.Lock()
+
+  def get_stocks_info(self, symbols: list) -> dict:
+    with self.lock:
+      self.requests.append(list(symbols))
+    return {symbol: {'symbol': symbol} for symbol in symbols}
+
+  get_current_prices = get_stocks_info
+
+def manager(max_symbols_per_request: int) -> StockDataProviderManager:
+  stock_data_manager = StockDataProviderManager(StockDataProviders.SYNTHETIC, n_symbols=1, history_days=2)
+  stock_data_manager.provider = FakeProvider(max_symbols_per_request)
+  return stock_data_manager
+
+class TokenBucketTest(unittest.TestCase):
+  def test_takes_tokens_until_empty_then_reports_the_wait(self):
+    bucket = TokenBucket(rate_per_second=0.05, capacity=3)
+    self.assertEqual([bucket.try_acquire() for _ in range(3)], [0, 0, 0])
+    self.assertAlmostEqual(bucket.try_acquire(), 20, delta=0.1)
+    self.assertLess(bucket.available(), 1)
+
+  def test_seconds_until_takes_nothing_and_covers_costs_above_capacity(self):
+    bucket = TokenBucket(rate_per_second=0.05, capacity=3)
+    self.assertEqual(bucket.seconds_until(2), 0)
+    self.assertAlmostEqual(bucket.seconds_until(4), 20, delta=0.1)
+    self.assertAlmostEqual(bucket.seconds_until(500), 9940, delta=0.1)
+    self.assertEqual(bucket.available(), 3)
+
+  def test_cost_above_capacity_can_never_be_acquired(self):
+    with self.assertRaises(ValueError):
+      TokenBucket(rate_per_second=1, capacity=3).try_acquire(4)
+
+class StockDataProviderPoolDispatchTest(unittest.TestCase):
+  def setUp(self):
+    # Per-symbol provider first, like the live sources in ScenarioBuilder, so ties would go to it
+    self.managers = {StockDataProviders.YAHOO_FINANCE: manager(1), StockDataProviders.YAHOO_QUERY: manager(150)}
+    rate_limits = {provider.value: {'requests_per_minute': 3, 'burst': 5} for provider in self.managers}
+    self.pool = StockDataProviderPool(self.managers, rate_limits)
+    self.tokens = {provider: 0 for provider in self.managers}
+    for provider, bucket in self.pool.buckets.items():
+      bucket.try_acquire = mock.Mock(side_effect=self.counting(provider, bucket.try_acquire))
+
+  def counting(self, provider: StockDataProviders, try_acquire):
+    def count(cost: float = 1) -> float:
+      wait = try_acquire(cost)
+      if wait == 0:
+        self.tokens[provider] += cost
+      return wait
+    return count
+
+  def requests(self, provider: StockDataProviders) -> list[list]:
+    return self.managers[provider].provider.requests
+
+  def test_large_info_lookup_goes_to_the_provider_needing_the_fewest_tokens(self):
+    symbols = [f"S{i}" for i in range(500)]
+
+    infos = self.pool.get_stocks_info(symbols)
+
+    self.assertEqual(set(infos), set(symbols))
+    self.assertEqual(len(self.requests(StockDataProviders.YAHOO_QUERY)), 4)
+    self.assertEqual(self.tokens, {StockDataProviders.YAHOO_FINANCE: 0, StockDataProviders.YAHOO_QUERY: 4})
+    self.assertEqual(self.requests(StockDataProviders.YAHOO_FINANCE), [])
+
+  def test_single_symbol_lookups_spread_across_providers(self):
+    for symbol in ('AAA', 'BBB'):
+      self.pool.get_stock_info(symbol)
+
+    self.assertEqual(self.tokens, {StockDataProviders.YAHOO_FINANCE: 1, StockDataProviders.YAHOO_QUERY: 1})
+
+  def test_prices_follow_the_cheapest_provider_too(self):
+    self.pool.get_current_prices(['AAA', 'BBB', 'CCC'])
+
+    self.assertEqual(self.requests(StockDataProviders.YAHOO_QUERY), [['AAA', 'BBB', 'CCC']])
+    self.assertEqual(self.tokens[StockDataProviders.YAHOO_FINANCE], 0)
+
+  def test_providers_outside_the_pool_are_rejected(self):
+    with self.assertRaises(ValueError):
+      self.pool.get_stocks_info(['AAA'], providers=[StockDataProviders.SYNTHETIC])
+
+  def test_hedged_pools_share_one_executor_instead_of_leaking_threads(self):
+    rate_limits = {provider.value: {'requests_per_minute': 3, 'burst': 5} for provider in self.managers}
+    pools = [StockDataProviderPool(self.managers, rate_limits, hedging={'max_workers': 2}) for _ in range(3)]
+
+    self.assertIs(pools[0].executor, pools[2].executor)
+    self.assertIsNone(self.pool.executor)
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,51 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from StockDataProviderManager import StockDataProviderManager
+from StockDataProviders import StockDataProviders
+
+MARKET = {'n_symbols': 1200, 'history_days': 60, 'end_date': '2026-10-16'}
+
+class RecordAndReplayTest(unittest.TestCase):
+  def setUp(self):
+    self.recordings_dir = tempfile.mkdtemp(prefix='stock_data_recordings_test_')
+    self.addCleanup(shutil.rmtree, self.recordings_dir, ignore_errors=True)
+    self.recorder = StockDataProviderManager(StockDataProviders.RECORDING, source=StockDataProviders.SYNTHETIC, recordings_dir=self.recordings_dir, **MARKET)
+    self.symbols = self.recorder.provider.source_provider.market.symbols
+
+  def replayer(self) -> StockDataProviderManager:
+    return StockDataProviderManager(StockDataProviders.REPLAY, source=StockDataProviders.SYNTHETIC, recordings_dir=self.recordings_dir)
+
+  def test_replay_serves_back_exactly_what_was_recorded(self):
+    recorded_history = self.recorder.get_historical_data(self.symbols[:20], start='2026-09-01', end='2026-10-01')
+    recorded_infos = self.recorder.get_stocks_info(self.symbols)
+    recorded_prices = self.recorder.get_current_prices(self.symbols[:3])
+
+    replayer = self.replayer()
+
+    pd.testing.assert_frame_equal(replayer.get_historical_data(self.symbols[:20], start='2026-09-01', end='2026-10-01'), recorded_history)
+    self.assertEqual(replayer.get_stocks_info(self.symbols), recorded_infos)
+    self.assertEqual(replayer.get_current_prices(self.symbols[:3]), recorded_prices)
+
+  def test_replay_chunks_like_the_recorded_provider(self):
+    self.recorder.get_stocks_info(self.symbols)
+    replayer = self.replayer()
+
+    self.assertEqual(replayer.provider.max_symbols_per_request, 500)
+    self.assertEqual(replayer.chunk_symbols(self.symbols), self.recorder.chunk_symbols(self.symbols))
+
+  def test_calls_that_were_not_recorded_fail_instead_of_going_online(self):
+    self.recorder.get_historical_data(self.symbols[:20], period='1mo')
+
+    with self.assertRaises(LookupError):
+      self.replayer().get_historical_data(self.symbols[:20], period='1y')
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,56 @@
+import os
+import sys
+import unittest
+from unittest import mock
+
+import botocore
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from StorageAwsS3Provider import StorageAwsS3Provider
+
+def not_found() -> botocore.exceptions.ClientError:
+  return botocore.exceptions.ClientError({'Error': {'Code': '404'}}, 'HeadObject')
+
+class CheckExistenceManyTest(unittest.TestCase):
+  def setUp(self):
+    with mock.patch('StorageAwsS3Provider.boto3.client') as client:
+      self.provider = StorageAwsS3Provider()
+    self.s3_client = client.return_value
+
+  def test_root_keys_use_one_head_each_instead_of_listing_the_bucket(self):
+    def head_object(Bucket, Key):
+      if Key != 'all_stocks.csv':
+        raise not_found()
+      return {}
+    self.s3_client.head_object.side_effect = head_object
+
+    existence = self.provider.check_existence_many('bucket', ['all_stocks.csv', 'stocks_historical_data.parquet'])
+
+    self.assertEqual(existence, {'all_stocks.csv': True, 'stocks_historical_data.parquet': False})
+    self.assertEqual(self.s3_client.head_object.call_count, 2)
+    self.s3_client.get_paginator.assert_not_called()
+
+  def test_keys_in_different_directories_use_heads(self):
+    self.s3_client.head_object.return_value = {}
+
+    existence = self.provider.check_existence_many('bucket', ['deltas/2026-10-15.csv', 'other/2026-10-15.csv'])
+
+    self.assertEqual(existence, {'deltas/2026-10-15.csv': True, 'other/2026-10-15.csv': True})
+    self.s3_client.get_paginator.assert_not_called()
+
+  def test_keys_in_one_directory_also_use_heads(self):
+    self.s3_client.head_object.return_value = {}
+
+    existence = self.provider.check_existence_many('bucket', ['deltas/2026-10-15.csv', 'deltas/2026-10-16.csv'])
+
+    self.assertEqual(existence, {'deltas/2026-10-15.csv': True, 'deltas/2026-10-16.csv': True})
+    self.assertEqual(self.s3_client.head_object.call_count, 2)
+    self.s3_client.get_paginator.assert_not_called()
+
+  def test_no_keys_make_no_requests(self):
+    self.assertEqual(self.provider.check_existence_many('bucket', []), {})
+    self.s3_client.head_object.assert_not_called()
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,71 @@
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import StorageCache
+from StorageCache import StorageCache as Cache, cached_data_size
+
+def frame(n_rows: int) -> pd.DataFrame:
+  return pd.DataFrame({'date': [f"2026-01-{i % 28 + 1:02d}" for i in range(n_rows)], 'S0': np.arange(n_rows, dtype=float)})
+
+class StorageCacheTest(unittest.TestCase):
+  def setUp(self):
+    StorageCache._MEMORY_CACHE.clear()
+    self.cache_dir = tempfile.mkdtemp(prefix='storage_cache_test_')
+
+  def tearDown(self):
+    StorageCache._MEMORY_CACHE.clear()
+    shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+  def test_get_returns_a_copy_of_what_was_put(self):
+    cache = Cache(self.cache_dir, max_bytes=10 * 1024 ** 2)
+    df = frame(10)
+    cache.put('bucket', 'history.parquet', 'etag-1', df)
+
+    etag, cached = cache.get('bucket', 'history.parquet')
+    cached.drop(columns=['S0'], inplace=True)
+
+    self.assertEqual(etag, 'etag-1')
+    pd.testing.assert_frame_equal(cache.get('bucket', 'history.parquet')[1], df)
+
+  def test_memory_tier_evicts_least_recently_used_beyond_its_budget(self):
+    size = cached_data_size(frame(100))
+    cache = Cache(self.cache_dir, max_bytes=10 * 1024 ** 2, max_memory_bytes=int(size * 2.5))
+    for key in ('a', 'b'):
+      cache.put('bucket', key, 'etag', frame(100))
+    cache.get('bucket', 'a')
+    cache.put('bucket', 'c', 'etag', frame(100))
+
+    self.assertEqual(list(StorageCache._MEMORY_CACHE), [('bucket', 'a'), ('bucket', 'c')])
+    # Still served from disk
+    self.assertIsNotNone(cache.get('bucket', 'b'))
+
+  def test_memory_tier_stays_bounded_when_disk_writes_fail(self):
+    size = cached_data_size(frame(100))
+    cache = Cache(self.cache_dir, max_bytes=10 * 1024 ** 2, max_memory_bytes=int(size * 3.5))
+    with mock.patch('builtins.open', side_effect=OSError('read-only file system')), contextlib.redirect_stdout(io.StringIO()):
+      for i in range(20):
+        cache.put('bucket', f"key-{i}", 'etag', frame(100))
+
+    self.assertEqual(len(StorageCache._MEMORY_CACHE), 3)
+    self.assertLessEqual(sum(entry[2] for entry in StorageCache._MEMORY_CACHE.values()), cache.max_memory_bytes)
+
+  def test_objects_larger_than_the_memory_budget_are_only_cached_on_disk(self):
+    cache = Cache(self.cache_dir, max_bytes=10 * 1024 ** 2, max_memory_bytes=1024)
+    cache.put('bucket', 'big', 'etag', frame(1000))
+
+    self.assertEqual(len(StorageCache._MEMORY_CACHE), 0)
+    self.assertEqual(cache.get('bucket', 'big')[0], 'etag')
+
+if __name__ == '__main__':
+  unittest.main()
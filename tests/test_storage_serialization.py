@@ -0,0 +1,75 @@
+import io
+import os
+import sys
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import StorageSerialization as serialization
+
+class CountingBytesIO(io.BytesIO):
+  """BytesIO that counts the bytes read from it"""
+
+  def __init__(self, data: bytes):
+    super().__init__(data)
+    self.bytes_read = 0
+
+  def read(self, size=-1):
+    data = super().read(size)
+    self.bytes_read += len(data)
+    return data
+
+  def readinto(self, buffer):
+    n = super().readinto(buffer)
+    self.bytes_read += n
+    return n
+
+def price_matrix(n_days: int = 504, n_symbols: int = 200) -> pd.DataFrame:
+  rng = np.random.default_rng(7)
+  df = pd.DataFrame(rng.uniform(5, 500, size=(n_days, n_symbols)).round(2), columns=[f"S{i}" for i in range(n_symbols)])
+  df.insert(0, 'date', pd.bdate_range('2024-01-01', periods=n_days).strftime('%Y-%m-%d'))
+  return df
+
+class ParquetHistoryReadTest(unittest.TestCase):
+  def setUp(self):
+    self.df = price_matrix()
+    buffer = io.BytesIO()
+    serialization.write_object('history.parquet', self.df, buffer)
+    self.data = buffer.getvalue()
+
+  def read_history(self, **kwargs) -> tuple[pd.DataFrame, list[int], int]:
+    source = CountingBytesIO(self.data)
+    read_row_groups = pq.ParquetFile.read_row_groups
+    with mock.patch.object(pq.ParquetFile, 'read_row_groups', autospec=True, side_effect=read_row_groups) as spy:
+      df = serialization.read_history('history.parquet', source, **kwargs)
+    return df, spy.call_args.args[1], source.bytes_read
+
+  def test_recent_rows_have_their_own_row_group(self):
+    parquet_file = pq.ParquetFile(io.BytesIO(self.data))
+    sizes = [parquet_file.metadata.row_group(i).num_rows for i in range(parquet_file.num_row_groups)]
+    self.assertEqual(sum(sizes), len(self.df))
+    self.assertEqual(sizes[-1], serialization.PARQUET_RECENT_ROW_GROUP_SIZE)
+
+  def test_date_ranged_read_touches_fewer_row_groups_and_bytes(self):
+    full_df, full_row_groups, full_bytes = self.read_history()
+    start = self.df['date'].iloc[-10]
+    recent_df, recent_row_groups, recent_bytes = self.read_history(start=start)
+
+    pd.testing.assert_frame_equal(full_df, self.df)
+    pd.testing.assert_frame_equal(recent_df, self.df.iloc[-10:].reset_index(drop=True))
+    self.assertLess(len(recent_row_groups), len(full_row_groups))
+    # The footer is read either way; the data pages are only those of the newest row group
+    self.assertLess(recent_bytes, full_bytes / 2)
+
+  def test_date_ranged_read_in_the_middle_returns_only_that_range(self):
+    df, _, _ = self.read_history(symbols=['S3'], start='2024-06-03', end='2024-06-28')
+    expected = self.df.loc[(self.df['date'] >= '2024-06-03') & (self.df['date'] <= '2024-06-28'), ['date', 'S3']].reset_index(drop=True)
+    pd.testing.assert_frame_equal(df, expected)
+
+if __name__ == '__main__':
+  unittest.main()